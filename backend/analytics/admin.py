@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import InsightSnapshot
 
-# Register your models here.
+@admin.register(InsightSnapshot)
+class InsightSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['user', 'computed_on', 'data_version', 'updated_at']
+    list_filter = ['computed_on']
+    search_fields = ['user__email']
+    ordering = ['-updated_at']
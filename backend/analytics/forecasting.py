@@ -0,0 +1,216 @@
+"""
+Per-category spending forecasts.
+
+Monthly expense totals for every (user, category) pair are pulled from the
+monthly rollups in one query and laid out as a months x series matrix, so
+every model below runs as NumPy array operations over all series at once -
+whether that's one user's categories or every user's.
+
+Candidate models: historical average, simple exponential smoothing (a few
+smoothing factors), linear trend and seasonal naive. Each series picks the
+model with the lowest one-step-ahead error over the last few months
+(rolling-origin backtest), and the spread of those errors gives the
+prediction interval.
+"""
+import warnings
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.db.models import Sum
+
+from transactions.models import MonthlyRollup
+
+HISTORY_MONTHS = 24
+BACKTEST_MONTHS = 6
+SEASON = 12
+ALPHAS = (0.2, 0.4, 0.6, 0.8)
+MODEL_NAMES = (
+    ('average',)
+    + tuple(f'exponential_smoothing_{alpha}' for alpha in ALPHAS)
+    + ('linear_trend', 'seasonal_naive')
+)
+# Two-sided 80% interval
+INTERVAL = 0.8
+Z_SCORE = 1.2816
+UNCATEGORISED_ID = 0
+
+
+def load_monthly_series(user_ids, forecast_month, history=HISTORY_MONTHS):
+    """
+    Return (months, matrix, columns) where matrix[t, k] is the expense
+    total of series k (a (user_id, category_id, category_name) tuple in
+    `columns`) in months[t]. Missing months are filled with zero.
+    """
+    months = pd.date_range(end=pd.Timestamp(forecast_month), periods=history + 1, freq='MS')[:-1]
+    rows = MonthlyRollup.objects.filter(
+        type='expense',
+        month__gte=months[0].date(),
+        month__lt=forecast_month,
+    )
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    rows = rows.order_by().values_list(
+        'user_id', 'category_id', 'category__name', 'month'
+    ).annotate(total=Sum('total'))
+
+    frame = pd.DataFrame(
+        list(rows), columns=['user_id', 'category_id', 'category', 'month', 'total']
+    )
+    if frame.empty:
+        return months, np.zeros((len(months), 0)), []
+
+    frame['month'] = pd.to_datetime(frame['month'])
+    frame['total'] = frame['total'].astype(float)
+    # pivot_table drops NaN keys, so uncategorised spending gets a placeholder
+    frame['category_id'] = frame['category_id'].fillna(UNCATEGORISED_ID).astype(int)
+    frame['category'] = frame['category'].fillna('Uncategorized')
+    wide = frame.pivot_table(
+        index='month', columns=['user_id', 'category_id', 'category'],
+        values='total', aggfunc='sum',
+    ).reindex(months).fillna(0.0)
+    columns = [
+        (int(user_id), None if category_id == UNCATEGORISED_ID else int(category_id), name)
+        for user_id, category_id, name in wide.columns
+    ]
+    return months, wide.to_numpy(), columns
+
+
+def first_active_month(matrix, columns):
+    """
+    Index of each series' user's first month with any spending. Months
+    before it are "no history yet" rather than genuine zero-spend months.
+    """
+    months = matrix.shape[0]
+    if not columns:
+        return np.zeros(0, dtype=int)
+    spent = matrix > 0
+    first = np.where(spent.any(axis=0), spent.argmax(axis=0), months)
+    users = pd.Series(first).groupby([column[0] for column in columns]).transform('min')
+    return users.to_numpy()
+
+
+def predict_next(history, first):
+    """
+    One-step-ahead prediction of every candidate model for every series.
+    `history` is (t, k); returns an (len(MODEL_NAMES), k) array, NaN where
+    a model has too little data.
+    """
+    t, k = history.shape
+    index = np.arange(t)[:, None]
+    valid = index >= first[None, :]
+    count = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.where(count > 0, (history * valid).sum(axis=0) / count, np.nan)
+
+        alphas = np.array(ALPHAS)[:, None]
+        level = np.full((len(ALPHAS), k), np.nan)
+        for step in range(t):
+            observed = history[step][None, :]
+            active = valid[step][None, :]
+            smoothed = np.where(np.isnan(level), observed, alphas * observed + (1 - alphas) * level)
+            level = np.where(active, smoothed, level)
+
+        centred_t = np.where(valid, index - (index * valid).sum(axis=0) / count, 0.0)
+        sxx = (centred_t ** 2).sum(axis=0)
+        sxy = (centred_t * (history - average)).sum(axis=0)
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        mean_t = (index * valid).sum(axis=0) / count
+        trend = np.where(count >= 3, np.maximum(average + slope * (t - mean_t), 0.0), np.nan)
+
+    if t >= SEASON:
+        seasonal = np.where(t - SEASON >= first, history[t - SEASON], np.nan)
+    else:
+        seasonal = np.full(k, np.nan)
+
+    return np.vstack([average[None, :], level, trend[None, :], seasonal[None, :]])
+
+
+def fit_and_forecast(matrix, first, backtest=BACKTEST_MONTHS):
+    """
+    Pick a model per series by rolling-origin backtest and forecast the
+    next month. Returns (forecast, lower, upper, model_index, rmse) arrays.
+    """
+    t, k = matrix.shape
+    origins = range(max(1, t - backtest), t)
+    errors = np.stack([
+        predict_next(matrix[:origin], first) - matrix[origin][None, :]
+        for origin in origins
+    ]) if t > 1 else np.full((0, len(MODEL_NAMES), k), np.nan)
+
+    # Only score origins where the series already had history
+    origin_index = np.array(list(origins))[:, None, None] if t > 1 else np.zeros((0, 1, 1))
+    errors = np.where(origin_index > first[None, None, :], errors, np.nan)
+
+    with warnings.catch_warnings():
+        # nanmean/nanstd warn on all-NaN slices, which are handled below
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mae = np.nanmean(np.abs(errors), axis=0) if len(errors) else np.full((len(MODEL_NAMES), k), np.nan)
+        mae = np.where(np.isnan(mae), np.inf, mae)
+        best = mae.argmin(axis=0)
+        # With no backtest at all, fall back to the historical average
+        best = np.where(np.isinf(mae.min(axis=0)), 0, best)
+
+        predictions = predict_next(matrix, first)
+        forecast = np.nan_to_num(predictions[best, np.arange(k)], nan=0.0)
+
+        chosen_errors = errors[:, best, np.arange(k)] if len(errors) else np.full((0, k), np.nan)
+        rmse = np.sqrt(np.nanmean(chosen_errors ** 2, axis=0)) if len(errors) else np.full(k, np.nan)
+        valid = np.arange(t)[:, None] >= first[None, :]
+        spread = np.nanstd(np.where(valid, matrix, np.nan), axis=0) if t else np.zeros(k)
+        rmse = np.where(np.isnan(rmse), np.nan_to_num(spread), rmse)
+
+    lower = np.maximum(forecast - Z_SCORE * rmse, 0.0)
+    upper = forecast + Z_SCORE * rmse
+    return forecast, lower, upper, best, rmse
+
+
+def forecast_users(user_ids=None, forecast_month=None, history=HISTORY_MONTHS):
+    """
+    Forecast next month's spending per category for several users (all
+    users when user_ids is None) in one batched run.
+    Returns {user_id: forecast dict}.
+    """
+    forecast_month = forecast_month or date.today().replace(day=1)
+    months, matrix, columns = load_monthly_series(user_ids, forecast_month, history)
+    if not columns:
+        return {}
+
+    first = first_active_month(matrix, columns)
+    forecast, lower, upper, best, rmse = fit_and_forecast(matrix, first)
+
+    results = {}
+    for index, (user_id, category_id, name) in enumerate(columns):
+        if first[index] >= len(months):
+            continue
+        result = results.setdefault(user_id, {
+            'month': forecast_month.strftime('%Y-%m'),
+            'interval': INTERVAL,
+            'history_months': int(len(months) - first[index]),
+            'categories': [],
+            '_variance': 0.0,
+        })
+        result['categories'].append({
+            'category_id': category_id,
+            'category': name,
+            'predicted_amount': round(float(forecast[index]), 2),
+            'lower': round(float(lower[index]), 2),
+            'upper': round(float(upper[index]), 2),
+            'model': MODEL_NAMES[best[index]],
+        })
+        result['_variance'] += float(rmse[index]) ** 2
+
+    for result in results.values():
+        total = sum(item['predicted_amount'] for item in result['categories'])
+        margin = Z_SCORE * result.pop('_variance') ** 0.5
+        result['total'] = {
+            'predicted_amount': round(total, 2),
+            'lower': round(max(total - margin, 0.0), 2),
+            'upper': round(total + margin, 2),
+        }
+        result['categories'].sort(key=lambda item: item['predicted_amount'], reverse=True)
+    return results
+
+
+def forecast_user(user, forecast_month=None):
+    return forecast_users([user.pk], forecast_month).get(user.pk)
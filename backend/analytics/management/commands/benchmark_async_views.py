@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import path
+from rest_framework_simplejwt.tokens import AccessToken
+
+from analytics import views as analytics_views
+from transactions import synthetic
+from transactions import views as transaction_views
+from transactions.models import Transaction
+
+# (benchmark name, sync view, async view)
+ENDPOINTS = [
+    ('transactions.summary', transaction_views.TransactionViewSet.as_view({'get': 'summary'}),
+     transaction_views.AsyncTransactionSummaryView.as_view()),
+    ('analytics.insights', analytics_views.AnalyticsInsightsView.as_view(),
+     analytics_views.AsyncAnalyticsInsightsView.as_view()),
+    ('analytics.prediction', analytics_views.SpendingPredictionView.as_view(),
+     analytics_views.AsyncSpendingPredictionView.as_view()),
+    ('analytics.comparison', analytics_views.SpendingComparisonView.as_view(),
+     analytics_views.AsyncSpendingComparisonView.as_view()),
+]
+
+# Both variants side by side, whatever ASYNC_VIEWS['ENABLED'] says
+# (installed as ROOT_URLCONF while the benchmark runs)
+urlpatterns = [
+    pattern
+    for name, sync_view, async_view in ENDPOINTS
+    for pattern in (
+        path(f'sync/{name}/', sync_view),
+        path(f'async/{name}/', async_view),
+    )
+]
+
+
+def percentile(samples, percent):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Compare p50/p95/p99 latency of the sync and async summary/analytics views under concurrent load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=10000, help='Transactions per benchmark user')
+        parser.add_argument('--users', type=int, default=4, help='Benchmark users the requests are spread over')
+        parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once')
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per endpoint and variant')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated data')
+        parser.add_argument('--only', type=str, help='Only endpoints whose name starts with this')
+        parser.add_argument('--output', type=str, help='Write results to this JSON file')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark users afterwards')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1 or options['users'] < 1:
+            raise CommandError('--concurrency, --requests and --users must be positive')
+        endpoints = [
+            name for name, sync_view, async_view in ENDPOINTS
+            if not options['only'] or name.startswith(options['only'])
+        ]
+
+        users = synthetic.create_users(options['users'], options['seed'], prefix=f'async{options["transactions"]}')
+        try:
+            missing = [user for user in users if not Transaction.objects.filter(user=user).exists()]
+            if missing:
+                synthetic.generate(missing, options['transactions'], seed=options['seed'])
+            tokens = [str(AccessToken.for_user(user)) for user in users]
+
+            # Every request is computed, not served from the response cache
+            with override_settings(
+                ROOT_URLCONF=__name__,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                RESPONSE_CACHE=dict(settings.RESPONSE_CACHE, ENABLED=False),
+            ):
+                results = asyncio.run(self.run(endpoints, tokens, options))
+        finally:
+            if not options['keep']:
+                synthetic.delete_synthetic_users(users)
+
+        report = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'transactions': options['transactions'],
+                'users': options['users'],
+                'concurrency': options['concurrency'],
+                'requests': options['requests'],
+                'query_workers': settings.ASYNC_VIEWS['QUERY_WORKERS'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Benchmarked {len(endpoints)} endpoints, sync against async!'))
+
+    async def run(self, endpoints, tokens, options):
+        client = AsyncClient()
+
+        self.stdout.write(
+            f'{"endpoint":<24} {"variant":<6} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"req/s":>8} {"errors":>7}'
+        )
+        results = {}
+        for name in endpoints:
+            results[name] = {}
+            for variant in ('sync', 'async'):
+                url = f'/{variant}/{name}/'
+                await self.load(client, url, tokens, len(tokens), len(tokens))  # Warm-up
+
+                started = time.perf_counter()
+                samples, errors = await self.load(client, url, tokens, options['requests'], options['concurrency'])
+                elapsed = time.perf_counter() - started
+
+                result = {
+                    'p50_ms': round(percentile(samples, 50), 3),
+                    'p95_ms': round(percentile(samples, 95), 3),
+                    'p99_ms': round(percentile(samples, 99), 3),
+                    'requests_per_second': round(len(samples) / elapsed, 1),
+                    'errors': errors,
+                }
+                results[name][variant] = result
+                self.stdout.write(
+                    f"{name:<24} {variant:<6} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['requests_per_second']:>8} {errors:>7}"
+                )
+        return results
+
+    async def load(self, client, url, tokens, total, concurrency):
+        """
+        Send `total` GETs with at most `concurrency` in flight, cycling
+        through the users. Returns the latencies (ms) and the non-200 count.
+        """
+        samples = []
+        errors = 0
+        pending = iter(range(total))
+
+        async def worker():
+            nonlocal errors
+            for index in pending:
+                headers = {'Authorization': f'Bearer {tokens[index % len(tokens)]}'}
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                samples.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+        return samples, errors
@@ -0,0 +1,40 @@
+import json
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from analytics.forecasting import forecast_users
+
+class Command(BaseCommand):
+    help = 'Forecast per-category spending for all users in one batched run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only forecast this user id (can be repeated)'
+        )
+        parser.add_argument(
+            '--month', type=str,
+            help='Month to forecast as YYYY-MM (defaults to the current month)'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print the forecasts as JSON'
+        )
+
+    def handle(self, *args, **options):
+        month = None
+        if options['month']:
+            month = datetime.strptime(options['month'], '%Y-%m').date()
+        
+        started = time.perf_counter()
+        forecasts = forecast_users(options['user_ids'], month)
+        elapsed = time.perf_counter() - started
+        
+        if options['json']:
+            self.stdout.write(json.dumps(forecasts, indent=2))
+        
+        series = sum(len(forecast['categories']) for forecast in forecasts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Forecast {series} category series for {len(forecasts)} user(s) in {elapsed:.2f}s!'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InsightSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_version', models.PositiveIntegerField()),
+                ('computed_on', models.DateField()),
+                ('insights', models.JSONField()),
+                ('prediction', models.JSONField()),
+                ('comparison', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='insight_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -1,3 +1,20 @@
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+class InsightSnapshot(models.Model):
+    """
+    Precomputed analytics payloads for one user, written in bulk by the
+    snapshot_insights command. A snapshot is only served while it matches
+    the user's current data version and was computed today.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='insight_snapshot')
+    data_version = models.PositiveIntegerField()
+    computed_on = models.DateField()
+    insights = models.JSONField()
+    prediction = models.JSONField()
+    comparison = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Insights for {self.user.email} ({self.computed_on})"
@@ -0,0 +1,214 @@
+"""
+Builders for the analytics payloads (insights, prediction, comparison).
+
+Shared by the API views, which compute them live, and by the
+snapshot_insights command, which precomputes them for every user. The
+abuild_* variants serve the async views: same payloads, with the
+independent reads of each run concurrently.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from finance_tracker.concurrency import run_concurrently
+from transactions import rollups
+from transactions.stats import aperiod_stats, period_stats
+from .forecasting import forecast_user
+
+NO_FORECAST = object()
+
+
+def build_insights(user, today):
+    return insights_payload(period_stats(user, today - timedelta(days=90)), today)
+
+
+async def abuild_insights(user, today):
+    return insights_payload(await aperiod_stats(user, today - timedelta(days=90)), today)
+
+
+def insights_payload(stats, today):
+    """
+    Insights from the last 90 days of stats.
+    """
+    if not stats.has_data:
+        return {
+            'insights': [],
+            'message': 'Not enough data for insights'
+        }
+    
+    insights = []
+    
+    # Average spending analysis
+    avg_monthly_expense = stats.average_monthly_expense
+    current_month_expense = stats.month_totals(today).expenses
+    
+    if current_month_expense > avg_monthly_expense * Decimal('1.2'):
+        insights.append({
+            'type': 'warning',
+            'title': 'Higher Spending This Month',
+            'message': f'Your spending is ${current_month_expense - avg_monthly_expense:.2f} above your 3-month average.',
+            'icon': '⚠️'
+        })
+    elif current_month_expense < avg_monthly_expense * Decimal('0.8'):
+        insights.append({
+            'type': 'success',
+            'title': 'Great Savings!',
+            'message': f'You\'re spending ${avg_monthly_expense - current_month_expense:.2f} less than usual this month.',
+            'icon': '🎉'
+        })
+    
+    # Top spending category
+    top_category = stats.top_category
+    
+    if top_category:
+        total_expense = stats.total_expenses
+        percentage = (top_category.total / total_expense * 100) if total_expense > 0 else 0
+        
+        insights.append({
+            'type': 'info',
+            'title': 'Biggest Spending Category',
+            'message': f'{top_category.name} accounts for {percentage:.1f}% of your expenses (${top_category.total:.2f}).',
+            'icon': '📊'
+        })
+    
+    # Savings rate
+    if stats.total_income > 0:
+        savings_rate = stats.savings_rate
+        
+        if savings_rate >= 20:
+            insights.append({
+                'type': 'success',
+                'title': 'Excellent Savings Rate',
+                'message': f'You\'re saving {savings_rate:.1f}% of your income. Keep it up!',
+                'icon': '💰'
+            })
+        elif savings_rate < 10:
+            insights.append({
+                'type': 'warning',
+                'title': 'Low Savings Rate',
+                'message': f'You\'re only saving {savings_rate:.1f}% of your income. Consider reducing expenses.',
+                'icon': '💡'
+            })
+    
+    return {
+        'insights': insights,
+        'generated_at': today.isoformat()
+    }
+
+
+def build_prediction(user, today, forecast=NO_FORECAST):
+    """
+    `forecast` can be passed in when it was computed in a batch for many users.
+    """
+    monthly_expenses = rollups.period_totals(
+        user, today - timedelta(days=180), None,
+        group_by=('month',), type='expense'
+    )
+    
+    # Per-category forecast for the current month, from complete months only
+    if forecast is NO_FORECAST:
+        forecast = forecast_user(user, today.replace(day=1))
+    
+    return prediction_payload(monthly_expenses, forecast)
+
+
+async def abuild_prediction(user, today):
+    queries = rollups.period_totals_queries(
+        user, today - timedelta(days=180), None,
+        group_by=('month',), type='expense'
+    )
+    # The forecast is independent of the monthly totals - fetch them together
+    *results, forecast = await run_concurrently(
+        *queries, lambda: forecast_user(user, today.replace(day=1))
+    )
+    return prediction_payload(rollups.merge_period_totals(results, ('month',)), forecast)
+
+
+def prediction_payload(monthly_expenses, forecast):
+    """
+    Next month's predicted spending from per-month expense totals
+    (period_totals rows grouped by month).
+    """
+    monthly_expenses = sorted(monthly_expenses, key=lambda item: item['month'])
+    
+    if len(monthly_expenses) < 2:
+        return {
+            'prediction': None,
+            'message': 'Need at least 2 months of data for prediction',
+            'forecast': forecast
+        }
+    
+    amounts = [float(m['total']) for m in monthly_expenses]
+    avg_expense = sum(amounts) / len(amounts)
+    
+    if len(amounts) >= 3:
+        recent_avg = sum(amounts[-3:]) / 3
+        trend_percentage = ((recent_avg / avg_expense) - 1) * 100
+    else:
+        recent_avg = avg_expense
+        trend_percentage = 0
+    
+    predicted_amount = recent_avg * (1 + (trend_percentage / 100))
+    
+    return {
+        'prediction': {
+            'predicted_amount': round(predicted_amount, 2),
+            'confidence': 'medium' if len(amounts) >= 4 else 'low',
+            'trend': 'increasing' if trend_percentage > 5 else 'decreasing' if trend_percentage < -5 else 'stable',
+            'trend_percentage': round(trend_percentage, 1)
+        },
+        'historical_average': round(avg_expense, 2),
+        'data_points': len(amounts),
+        'forecast': forecast
+    }
+
+
+def previous_month_start(today):
+    if today.month == 1:
+        return today.replace(year=today.year - 1, month=12, day=1)
+    return today.replace(month=today.month - 1, day=1)
+
+
+def build_comparison(user, today):
+    # Both months come from one stats read, split by month afterwards
+    return comparison_payload(period_stats(user, previous_month_start(today)), today)
+
+
+async def abuild_comparison(user, today):
+    return comparison_payload(await aperiod_stats(user, previous_month_start(today)), today)
+
+
+def comparison_payload(stats, today):
+    """
+    This month against last month, from stats starting last month.
+    """
+    current_month_start = today.replace(day=1)
+    prev_month_start = previous_month_start(today)
+    
+    current_month_data = stats.totals_since(current_month_start)
+    prev_month_data = stats.month_totals(prev_month_start)
+    
+    current_income = float(current_month_data.income)
+    current_expenses = float(current_month_data.expenses)
+    prev_income = float(prev_month_data.income)
+    prev_expenses = float(prev_month_data.expenses)
+    
+    income_change = ((current_income - prev_income) / prev_income * 100) if prev_income > 0 else 0
+    expense_change = ((current_expenses - prev_expenses) / prev_expenses * 100) if prev_expenses > 0 else 0
+    
+    return {
+        'current_month': {
+            'income': current_income,
+            'expenses': current_expenses,
+            'savings': current_income - current_expenses
+        },
+        'previous_month': {
+            'income': prev_income,
+            'expenses': prev_expenses,
+            'savings': prev_income - prev_expenses
+        },
+        'changes': {
+            'income_change_percentage': round(income_change, 2),
+            'expense_change_percentage': round(expense_change, 2),
+            'income_direction': 'up' if income_change > 0 else 'down' if income_change < 0 else 'same',
+            'expense_direction': 'up' if expense_change > 0 else 'down' if expense_change < 0 else 'same'
+        }
+    }
@@ -1,3 +1,269 @@
-from django.test import TestCase
+"""
+Analytics app tests.
+"""
+import importlib
+import json
+from contextlib import contextmanager
+from datetime import date, timedelta
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from django.urls import clear_url_caches, resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+import finance_tracker.urls
+import transactions.urls
+from finance_tracker.async_views import AsyncAPIView
+from transactions.models import Category, Transaction
+from users.models import CustomUser
+from . import forecasting
+from . import urls as analytics_urls
+from .forecasting import MODEL_NAMES, first_active_month, fit_and_forecast, predict_next
+from .models import InsightSnapshot
+from .reports import build_comparison, build_insights, build_prediction
+from .snapshots import snapshot_chunk
+
+MONTHS = 24
+
+
+def forecast(*series, first=None):
+    matrix = np.column_stack(series).astype(float)
+    first = np.zeros(matrix.shape[1], dtype=int) if first is None else np.array(first)
+    predicted, lower, upper, best, rmse = fit_and_forecast(matrix, first)
+    return predicted, lower, upper, [MODEL_NAMES[index] for index in best]
+
+
+class ForecastModelTests(SimpleTestCase):
+    def test_constant_series(self):
+        predicted, lower, upper, models = forecast(np.full(MONTHS, 100))
+        self.assertEqual((predicted[0], lower[0], upper[0]), (100, 100, 100))
+
+    def test_linear_series_picks_the_trend(self):
+        predicted, lower, upper, models = forecast(np.arange(1, MONTHS + 1) * 10)
+        self.assertEqual(models, ['linear_trend'])
+        self.assertAlmostEqual(predicted[0], 250)
+
+    def test_seasonal_series_picks_seasonal_naive(self):
+        year = np.array([50, 80, 120, 60, 200, 90, 40, 70, 150, 110, 30, 300])
+        predicted, lower, upper, models = forecast(np.tile(year, 2))
+        self.assertEqual(models, ['seasonal_naive'])
+        self.assertEqual(predicted[0], 50)
+
+    def test_declining_trend_never_goes_negative(self):
+        predicted, lower, upper, models = forecast(np.maximum(300 - np.arange(MONTHS) * 20, 0))
+        self.assertEqual(predicted[0], 0)
+        self.assertEqual(lower[0], 0)
+
+    def test_short_history(self):
+        two_months = np.zeros(MONTHS)
+        two_months[-2:] = [40, 60]
+        predicted, lower, upper, models = forecast(two_months, np.zeros(MONTHS), first=[MONTHS - 2, MONTHS])
+        # Too short for the trend or the season; the average still works
+        self.assertEqual(models[0], 'average')
+        self.assertEqual(predicted[0], 50)
+        self.assertLess(lower[0], 50)
+        self.assertGreater(upper[0], 50)
+        # No history at all predicts nothing
+        self.assertEqual((predicted[1], lower[1], upper[1]), (0, 0, 0))
+
+        models = predict_next(two_months[:, None], np.array([MONTHS - 2]))
+        self.assertTrue(np.isnan(models[MODEL_NAMES.index('linear_trend'), 0]))
+        self.assertTrue(np.isnan(models[MODEL_NAMES.index('seasonal_naive'), 0]))
+
+    def test_intervals_are_ordered(self):
+        rng = np.random.default_rng(3)
+        noisy = rng.gamma(2.0, 50.0, size=(MONTHS, 40))
+        # Gaps: months with no spending at all
+        noisy[rng.random((MONTHS, 40)) < 0.3] = 0
+        first = rng.integers(0, MONTHS, size=40)
+        predicted, lower, upper, best, rmse = fit_and_forecast(noisy, first)
+        self.assertTrue(np.isfinite(predicted).all())
+        self.assertTrue((lower >= 0).all())
+        self.assertTrue((lower <= predicted).all())
+        self.assertTrue((predicted <= upper).all())
+
+    def test_first_active_month_is_per_user(self):
+        matrix = np.array([[0, 0, 5], [3, 0, 0], [0, 0, 1], [0, 0, 0]], dtype=float)
+        columns = [(1, 10, 'Food'), (1, 11, 'Rent'), (2, 10, 'Food')]
+        # User 1's Rent has no spending yet, but user 1 started in month 1
+        self.assertEqual(list(first_active_month(matrix, columns)), [1, 1, 0])
+
+
+class ForecastUsersTests(TestCase):
+    def test_forecast_from_rollups(self):
+        user = CustomUser.objects.create_user(
+            email='forecast@example.com', username='forecast', password='forecast-password'
+        )
+        food = Category.objects.create(name='Food', type='expense', is_default=True)
+        for month in range(1, 7):
+            Transaction.objects.create(user=user, amount=100, type='expense', category=food, date=date(2026, month, 3))
+            Transaction.objects.create(user=user, amount=20, type='expense', date=date(2026, month, 4))
+        Transaction.objects.create(user=user, amount=999, type='income', date=date(2026, 6, 5))
+
+        result = forecasting.forecast_user(user, forecast_month=date(2026, 7, 1))
+        self.assertEqual(result['month'], '2026-07')
+        self.assertEqual(result['history_months'], 6)
+        predicted = {item['category']: item['predicted_amount'] for item in result['categories']}
+        self.assertEqual(predicted, {'Food': 100, 'Uncategorized': 20})
+        self.assertEqual(result['total']['predicted_amount'], 120)
+        self.assertLessEqual(result['total']['lower'], 120)
+        self.assertGreaterEqual(result['total']['upper'], 120)
+
+
+# Replica reads go to the test primary (see transactions/tests.py)
+@override_settings(
+    REPLICA=dict(settings.REPLICA, ALIAS='default'),
+    RESPONSE_CACHE=dict(settings.RESPONSE_CACHE, ENABLED=False),
+)
+class InsightSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='snapshot@example.com', username='snapshot', password='snapshot-password'
+        )
+        cls.other = CustomUser.objects.create_user(
+            email='snapshot-other@example.com', username='snapshot-other', password='other-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.today = timezone.localdate()
+        for days in range(0, 400, 9):
+            for user in (cls.user, cls.other):
+                Transaction.objects.create(
+                    user=user, amount=10 + days % 40, type='expense', category=cls.food,
+                    date=cls.today - timedelta(days=days),
+                )
+        Transaction.objects.create(user=cls.user, amount=2500, type='income', date=cls.today.replace(day=1))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def snapshot(self):
+        return InsightSnapshot.objects.get(user=self.user)
+
+    def test_snapshot_matches_the_live_payloads(self):
+        self.assertEqual(snapshot_chunk([self.user.pk, self.other.pk], self.today), 2)
+        self.user.refresh_from_db()
+        snapshot = self.snapshot()
+        for field, build in (
+            ('insights', build_insights), ('prediction', build_prediction), ('comparison', build_comparison),
+        ):
+            with self.subTest(field=field):
+                live = json.loads(json.dumps(build(self.user, self.today), cls=DjangoJSONEncoder))
+                self.assertEqual(getattr(snapshot, field), live)
+                self.assertEqual(self.client.get(f'/api/analytics/{field}/').json(), live)
+
+    def test_snapshot_chunk_upserts(self):
+        snapshot_chunk([self.user.pk], self.today - timedelta(days=1))
+        InsightSnapshot.objects.filter(user=self.user).update(insights={'stale': True}, data_version=999)
+
+        snapshot_chunk([self.user.pk, self.other.pk], self.today)
+        self.assertEqual(InsightSnapshot.objects.count(), 2)
+        snapshot = self.snapshot()
+        self.user.refresh_from_db()
+        self.assertEqual((snapshot.data_version, snapshot.computed_on), (self.user.data_version, self.today))
+        self.assertNotIn('stale', snapshot.insights)
+
+    def test_served_only_while_current(self):
+        snapshot_chunk([self.user.pk], self.today)
+        marker = {'from_snapshot': True}
+        InsightSnapshot.objects.filter(user=self.user).update(insights=marker)
+        self.assertEqual(self.client.get('/api/analytics/insights/').json(), marker)
+
+        # Computed yesterday
+        InsightSnapshot.objects.filter(user=self.user).update(computed_on=self.today - timedelta(days=1))
+        self.assertNotEqual(self.client.get('/api/analytics/insights/').json(), marker)
+
+        # The user's data changed since
+        InsightSnapshot.objects.filter(user=self.user).update(computed_on=self.today)
+        self.assertEqual(self.client.get('/api/analytics/insights/').json(), marker)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, amount=5, type='expense', category=self.food, date=self.today)
+        self.assertNotEqual(self.client.get('/api/analytics/insights/').json(), marker)
+
+
+def reload_urls():
+    for module in (transactions.urls, analytics_urls, finance_tracker.urls):
+        importlib.reload(module)
+    clear_url_caches()
+
+
+@contextmanager
+def async_views_enabled():
+    """
+    Route requests as a deployment with ASYNC_VIEWS_ENABLED does (the URL
+    modules pick their views when imported).
+    """
+    with override_settings(ASYNC_VIEWS=dict(settings.ASYNC_VIEWS, ENABLED=True)):
+        reload_urls()
+    try:
+        yield
+    finally:
+        reload_urls()
+
+
+@override_settings(
+    REPLICA=dict(settings.REPLICA, ALIAS='default'),
+    RESPONSE_CACHE=dict(settings.RESPONSE_CACHE, ENABLED=False),
+)
+class AsyncViewTests(TestCase):
+    urls = [
+        '/api/analytics/insights/',
+        '/api/analytics/prediction/',
+        '/api/analytics/comparison/',
+        '/api/transactions/transactions/summary/?type=expense',
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='async@example.com', username='async', password='async-password'
+        )
+        food = Category.objects.create(name='Food', type='expense', is_default=True)
+        today = timezone.localdate()
+        for days in range(0, 200, 6):
+            Transaction.objects.create(
+                user=cls.user, amount=15 + days % 30, type='expense', category=food,
+                date=today - timedelta(days=days),
+            )
+        Transaction.objects.create(user=cls.user, amount=2500, type='income', date=today.replace(day=1))
+
+    def setUp(self):
+        self.authorization = f'Bearer {AccessToken.for_user(self.user)}'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+    def async_get(self, url, **headers):
+        return async_to_sync(self.async_client.get)(url, headers={'Authorization': self.authorization, **headers})
+
+    def test_async_views_match_the_sync_views(self):
+        sync_responses = {url: self.client.get(url) for url in self.urls}
+
+        with async_views_enabled():
+            for url in self.urls:
+                with self.subTest(url=url):
+                    self.assertTrue(issubclass(resolve(url.split('?')[0]).func.view_class, AsyncAPIView))
+                    expected = sync_responses[url]
+                    self.assertEqual(expected.status_code, 200)
+
+                    response = self.async_get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json(), expected.json())
+                    self.assertEqual(response['ETag'], expected['ETag'])
+                    self.assertEqual(response['Cache-Control'], expected['Cache-Control'])
+
+                    revalidated = self.async_get(url, **{'If-None-Match': expected['ETag']})
+                    self.assertEqual(revalidated.status_code, 304)
+                    self.assertEqual(revalidated.content, b'')
+
+            self.assertEqual(self.async_get('/api/transactions/transactions/summary/?start_date=nope&end_date=2026-01-31').status_code, 400)
+            self.assertEqual(async_to_sync(self.async_client.get)('/api/analytics/insights/').status_code, 401)
+
+        # Back to the sync views
+        self.assertFalse(issubclass(resolve('/api/analytics/insights/').func.view_class, AsyncAPIView))
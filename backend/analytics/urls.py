@@ -1,8 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from .views import AnalyticsInsightsView, SpendingPredictionView, SpendingComparisonView
+from . import views
+
+if settings.ASYNC_VIEWS['ENABLED']:
+    insights_view = views.AsyncAnalyticsInsightsView
+    prediction_view = views.AsyncSpendingPredictionView
+    comparison_view = views.AsyncSpendingComparisonView
+else:
+    insights_view = views.AnalyticsInsightsView
+    prediction_view = views.SpendingPredictionView
+    comparison_view = views.SpendingComparisonView
 
 urlpatterns = [
-    path('insights/', AnalyticsInsightsView.as_view(), name='analytics-insights'),
-    path('prediction/', SpendingPredictionView.as_view(), name='spending-prediction'),
-    path('comparison/', SpendingComparisonView.as_view(), name='spending-comparison'),
+    path('insights/', insights_view.as_view(), name='analytics-insights'),
+    path('prediction/', prediction_view.as_view(), name='spending-prediction'),
+    path('comparison/', comparison_view.as_view(), name='spending-comparison'),
 ]
\ No newline at end of file
@@ -3,7 +3,7 @@ from .models import Budget
 
 @admin.register(Budget)
 class BudgetAdmin(admin.ModelAdmin):
-    list_display = ['user', 'category', 'amount', 'period', 'start_date', 'end_date', 'is_active']
+    list_display = ['user', 'category', 'amount', 'spent_amount', 'period', 'start_date', 'end_date', 'is_active']
     list_filter = ['period', 'is_active']
     search_fields = ['user__email', 'category__name']
     date_hierarchy = 'start_date'
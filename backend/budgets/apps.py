@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BudgetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'budgets'
+
+    def ready(self):
+        # Invalidate cached responses when budgets change
+        from . import signals  # noqa: F401
@@ -0,0 +1,223 @@
+"""
+Maintenance of the denormalized Budget.spent_amount counter.
+
+Every expense Transaction write is turned into per-(user, category, date)
+spend deltas and added to the budgets whose window contains that date with
+F() expressions, so budget reads never aggregate transactions. The per-row
+signal handlers and the bulk paths of TransactionQuerySet both go through
+apply_deltas(); find_drift()/repair() (the reconcile_budgets command)
+compare the counters with the raw transactions and fix any that drifted.
+
+Because spend changes on write, alert thresholds are evaluated there too:
+apply_deltas() reports the budgets whose spend an increase pushed to a
+new alert level and, once the write commits, sends threshold_crossed.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils.dateparse import parse_date
+
+from transactions.models import Transaction
+from .models import Budget
+
+ZERO = Decimal('0')
+CENT = Decimal('0.01')
+
+# Sent after commit with crossings=[(budget pk, alert level)]
+threshold_crossed = Signal()
+
+
+def _to_date(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def transaction_deltas(objs, sign=1):
+    """
+    {(user_id, category_id, date): amount} for the expenses among a batch
+    of in-memory Transaction objects.
+    """
+    deltas = defaultdict(Decimal)
+    for obj in objs:
+        if obj.type == 'expense' and obj.category_id is not None:
+            deltas[(obj.user_id, obj.category_id, _to_date(obj.date))] += sign * Decimal(str(obj.amount))
+    return deltas
+
+
+def grouped_deltas(queryset, sign=1):
+    """
+    Spend deltas for every expense in a Transaction queryset, from one
+    grouped query.
+    """
+    rows = queryset.filter(type='expense', category__isnull=False).order_by().values(
+        'user_id', 'category_id', 'date'
+    ).annotate(total=Sum('amount'))
+    return {
+        (row['user_id'], row['category_id'], row['date']): sign * row['total']
+        for row in rows
+    }
+
+
+def merge(*deltas):
+    merged = defaultdict(Decimal)
+    for mapping in deltas:
+        for key, amount in mapping.items():
+            merged[key] += amount
+    return merged
+
+
+def alert_level(spent, amount, alert_threshold):
+    """
+    'danger' once spending reaches the budget, 'warning' once it reaches
+    the alert threshold (a percentage), else None; the levels the budget
+    overview reports.
+    """
+    if amount <= 0:
+        return None
+    percentage = spent * 100 / amount
+    if percentage >= 100:
+        return 'danger'
+    if percentage >= alert_threshold:
+        return 'warning'
+    return None
+
+
+def find_crossings(increases):
+    """
+    [(budget pk, alert level)] for the budgets that {pk: increase} moved
+    to a new alert level, judged on their counters after the update.
+    """
+    crossings = []
+    budgets = Budget.objects.filter(pk__in=increases).values_list('pk', 'spent_amount', 'amount', 'alert_threshold')
+    for pk, spent, amount, alert_threshold in budgets:
+        level = alert_level(spent, amount, alert_threshold)
+        if level and level != alert_level(spent - increases[pk], amount, alert_threshold):
+            crossings.append((pk, level))
+    if crossings:
+        db_transaction.on_commit(lambda: threshold_crossed.send(sender=Budget, crossings=crossings))
+    return crossings
+
+
+def apply_deltas(deltas):
+    """
+    Add spend deltas to every budget (any period) covering their dates.
+    A single delta is one UPDATE; a batch resolves the affected budgets
+    with one query and then issues one UPDATE per budget. Budgets that
+    went up are read back once to find alert threshold crossings, which
+    are returned (see find_crossings()).
+    """
+    deltas = {key: amount for key, amount in deltas.items() if amount}
+    if not deltas:
+        return []
+
+    if len(deltas) == 1:
+        (user_id, category_id, day), amount = deltas.popitem()
+        budgets = Budget.objects.filter(
+            user_id=user_id, category_id=category_id, start_date__lte=day, end_date__gte=day
+        )
+        if not budgets.update(spent_amount=F('spent_amount') + amount) or amount < 0:
+            return []
+        return find_crossings({pk: amount for pk in budgets.values_list('pk', flat=True)})
+
+    by_pair = defaultdict(list)
+    for (user_id, category_id, day), amount in deltas.items():
+        by_pair[(user_id, category_id)].append((day, amount))
+
+    filters = Q()
+    for user_id, category_id in by_pair:
+        filters |= Q(user_id=user_id, category_id=category_id)
+    days = [day for user_id, category_id, day in deltas]
+    budgets = Budget.objects.filter(
+        filters, start_date__lte=max(days), end_date__gte=min(days)
+    ).values_list('pk', 'user_id', 'category_id', 'start_date', 'end_date')
+
+    increases = {}
+    for pk, user_id, category_id, start_date, end_date in budgets:
+        amount = sum(
+            (amount for day, amount in by_pair[(user_id, category_id)] if start_date <= day <= end_date),
+            ZERO
+        )
+        if amount:
+            Budget.objects.filter(pk=pk).update(spent_amount=F('spent_amount') + amount)
+        if amount > 0:
+            increases[pk] = amount
+    return find_crossings(increases) if increases else []
+
+
+def actual_spent():
+    """
+    Expression for a budget's spend computed from the raw transactions
+    (a correlated subquery on the user/category/type/date index).
+    """
+    spent = Transaction.objects.filter(
+        user_id=OuterRef('user_id'),
+        category_id=OuterRef('category_id'),
+        type='expense',
+        date__gte=OuterRef('start_date'),
+        date__lte=OuterRef('end_date'),
+    ).order_by().values('user_id').annotate(total=Sum('amount')).values('total')
+    output_field = DecimalField(max_digits=12, decimal_places=2)
+    return Coalesce(Subquery(spent, output_field=output_field), Value(ZERO), output_field=output_field)
+
+
+def spent_for(budget):
+    """
+    Recompute one (possibly unsaved) budget's spend from raw transactions.
+    """
+    total = Transaction.objects.filter(
+        user_id=budget.user_id,
+        category_id=budget.category_id,
+        type='expense',
+        date__gte=budget.start_date,
+        date__lte=budget.end_date,
+    ).aggregate(total=Sum('amount'))['total']
+    return total or ZERO
+
+
+def find_drift(queryset):
+    """
+    [(budget pk, stored, actual)] for the budgets in `queryset` whose
+    counter disagrees with their transactions.
+    """
+    rows = queryset.order_by().annotate(actual=actual_spent()).values_list('pk', 'spent_amount', 'actual')
+    drift = []
+    for pk, stored, actual in rows:
+        actual = Decimal(actual).quantize(CENT)
+        if stored != actual:
+            drift.append((pk, stored, actual))
+    return drift
+
+
+def repair(drift):
+    """
+    Correct drifted counters by the measured difference (rather than
+    overwriting them), so increments that land meanwhile are kept.
+    """
+    for pk, stored, actual in drift:
+        Budget.objects.filter(pk=pk).update(spent_amount=F('spent_amount') + (actual - stored))
+    return len(drift)
+
+
+def recount(queryset):
+    """
+    Set the counters of every budget in `queryset` from the raw transactions
+    in one statement. For bulk writers that bypassed the deltas.
+    """
+    return queryset.order_by().update(spent_amount=actual_spent())
+
+
+def recount_covering(objs):
+    """
+    Recount the budgets that could contain any of these transactions.
+    """
+    expenses = [obj for obj in objs if obj.type == 'expense' and obj.category_id is not None]
+    if not expenses:
+        return 0
+    filters = Q()
+    for user_id, category_id in {(obj.user_id, obj.category_id) for obj in expenses}:
+        filters |= Q(user_id=user_id, category_id=category_id)
+    days = [_to_date(obj.date) for obj in expenses]
+    return recount(Budget.objects.filter(filters, start_date__lte=max(days), end_date__gte=min(days)))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from budgets import counters
+from budgets.models import Budget
+
+class Command(BaseCommand):
+    help = 'Compare every budget\'s spent_amount counter with its transactions and optionally repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only check this user id\'s budgets (can be repeated)'
+        )
+        parser.add_argument('--fix', action='store_true', help='Repair the drifted counters')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Budgets checked per query')
+
+    def handle(self, *args, **options):
+        budgets = Budget.objects.all()
+        if options['user_ids']:
+            budgets = budgets.filter(user_id__in=options['user_ids'])
+        
+        pks = list(budgets.order_by('pk').values_list('pk', flat=True))
+        drifted = 0
+        for offset in range(0, len(pks), options['chunk_size']):
+            drift = counters.find_drift(Budget.objects.filter(pk__in=pks[offset:offset + options['chunk_size']]))
+            for pk, stored, actual in drift:
+                self.stdout.write(f'Budget {pk}: counter {stored}, transactions {actual} ({actual - stored:+})')
+            if options['fix']:
+                counters.repair(drift)
+            drifted += len(drift)
+        
+        if drifted and not options['fix']:
+            self.stdout.write(self.style.WARNING(f'{drifted} of {len(pks)} budgets drifted; rerun with --fix to repair'))
+            return
+        action = 'repaired' if options['fix'] else 'drifted'
+        self.stdout.write(self.style.SUCCESS(f'✅ Checked {len(pks)} budgets, {drifted} {action}!'))
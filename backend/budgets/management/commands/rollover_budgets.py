@@ -0,0 +1,29 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from budgets.rollover import rollover, CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = 'Create the current period\'s budget for every budget whose period has ended'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='Treat this day as today (YYYY-MM-DD)')
+        parser.add_argument('--carry-over', action='store_true', help='Add unspent amounts to the next period')
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only roll over this user id\'s budgets (can be repeated)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Users processed per batch')
+
+    def handle(self, *args, **options):
+        stats = rollover(
+            today=options['date'],
+            carry_over=options['carry_over'],
+            user_ids=options['user_ids'],
+            chunk_size=options['chunk_size'],
+        )
+        
+        rate = stats['budgets'] / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rolled over {stats['budgets']} budgets for {stats['users']} users, created {stats['created']} "
+            f"in {stats['seconds']}s ({rate:.0f} budgets/s)"
+        ))
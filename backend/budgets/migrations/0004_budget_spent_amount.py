@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:49
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def count_spent(apps, schema_editor):
+    Budget = apps.get_model('budgets', 'Budget')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    spent = Transaction.objects.filter(
+        user_id=OuterRef('user_id'),
+        category_id=OuterRef('category_id'),
+        type='expense',
+        date__gte=OuterRef('start_date'),
+        date__lte=OuterRef('end_date'),
+    ).order_by().values('user_id').annotate(total=Sum('amount')).values('total')
+    output_field = models.DecimalField(max_digits=12, decimal_places=2)
+    Budget.objects.update(spent_amount=Coalesce(
+        Subquery(spent, output_field=output_field), Value(Decimal('0')), output_field=output_field
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0003_initial'),
+        ('transactions', '0003_monthly_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='spent_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Expenses in this category during the period, kept current by transaction writes', max_digits=12),
+        ),
+        migrations.RunPython(count_spent, migrations.RunPython.noop),
+    ]
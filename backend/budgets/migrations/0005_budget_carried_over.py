@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0004_budget_spent_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='carried_over',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, help_text='Part of the amount carried over unspent from the previous period', max_digits=10),
+        ),
+    ]
@@ -23,6 +23,20 @@ class Budget(models.Model):
         related_name='budgets'
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    spent_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        help_text="Expenses in this category during the period, kept current by transaction writes"
+    )
+    carried_over = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        help_text="Part of the amount carried over unspent from the previous period"
+    )
     period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
     start_date = models.DateField()
     end_date = models.DateField()
@@ -0,0 +1,145 @@
+"""
+Rolling budgets over into their next period.
+
+A budget is due when it is active, its period has ended, and no later
+budget exists for the same (user, category, period) series. Due budgets
+are processed in chunks of users: the next period's budgets (stepped
+forward to the one containing today, if runs were missed) that don't
+exist yet are inserted with one bulk_create(ignore_conflicts=True), so a
+budget that appears meanwhile under the unique (user, category, period,
+start_date) constraint is skipped and concurrent or repeated runs are
+harmless. The keys of the inserted budgets are returned, so callers can
+load exactly those rows.
+
+With carry_over, a budget's unspent amount (its spent_amount counter,
+i.e. what the user was shown) is added to the next period's amount and
+recorded in carried_over.
+"""
+import time
+from datetime import date, timedelta
+
+from django.db.models import Exists, OuterRef
+
+from transactions.recurring import add_months
+from users.versioning import bump_data_version
+from . import counters
+from .models import Budget
+
+CHUNK_SIZE = 500
+ZERO = counters.ZERO
+
+
+def next_window(period, start_date, end_date):
+    """
+    The (start, end) of the period following [start_date, end_date].
+    Monthly and yearly budgets keep their start day (clamped to the
+    length of the month), so custom windows like the 15th-14th roll too.
+    """
+    start = end_date + timedelta(days=1)
+    if period == 'weekly':
+        return start, start + timedelta(days=6)
+    if period == 'monthly':
+        return start, add_months(start, 1, start_date.day) - timedelta(days=1)
+    if period == 'yearly':
+        return start, add_months(start, 12, start_date.day) - timedelta(days=1)
+    raise ValueError(f'Unknown period "{period}"')
+
+
+def current_window(budget, today):
+    """
+    The first window after the budget's own that reaches today.
+    """
+    start, end = next_window(budget.period, budget.start_date, budget.end_date)
+    while end < today:
+        start, end = next_window(budget.period, start, end)
+    return start, end
+
+
+def due_budgets(today, user_ids=None):
+    later = Budget.objects.filter(
+        user=OuterRef('user'),
+        category=OuterRef('category'),
+        period=OuterRef('period'),
+        start_date__gt=OuterRef('start_date'),
+    )
+    queryset = Budget.objects.filter(is_active=True, end_date__lt=today).filter(~Exists(later))
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    return queryset
+
+
+def next_budget(budget, today, carry_over=False):
+    start, end = current_window(budget, today)
+    base = budget.amount - budget.carried_over
+    carried = max(budget.amount - budget.spent_amount, ZERO) if carry_over else ZERO
+    return Budget(
+        user_id=budget.user_id,
+        category_id=budget.category_id,
+        period=budget.period,
+        amount=base + carried,
+        carried_over=carried,
+        start_date=start,
+        end_date=end,
+        is_active=True,
+        alert_threshold=budget.alert_threshold,
+    )
+
+
+def budget_key(budget):
+    """
+    The budget's unique (user_id, category_id, period, start_date).
+    """
+    return budget.user_id, budget.category_id, budget.period, budget.start_date
+
+
+def bulk_create_budgets(budgets, batch_size=1000):
+    """
+    Insert budgets, skipping any that already exist, then fill in their
+    spend counters (bulk_create bypasses the save signal) and bump their
+    users' data versions.
+    """
+    if not budgets:
+        return
+    Budget.objects.bulk_create(budgets, batch_size=batch_size, ignore_conflicts=True)
+    user_ids = {budget.user_id for budget in budgets}
+    # A superset of the new rows (same users and start dates); recounting
+    # an existing budget is harmless
+    counters.recount(Budget.objects.filter(
+        user_id__in=user_ids,
+        start_date__in={budget.start_date for budget in budgets},
+    ))
+    bump_data_version(*user_ids)
+
+
+def rollover(today=None, carry_over=False, user_ids=None, chunk_size=CHUNK_SIZE):
+    """
+    Create the current period's budget for every due budget series.
+    Returns stats: users and budgets processed, budgets created, the
+    budget_key() of each created budget, seconds.
+    """
+    today = today or date.today()
+    started = time.perf_counter()
+    stats = {'users': 0, 'budgets': 0, 'created': 0, 'created_keys': []}
+
+    due_users = list(
+        due_budgets(today, user_ids).order_by('user_id').values_list('user_id', flat=True).distinct()
+    )
+    for offset in range(0, len(due_users), chunk_size):
+        chunk = due_users[offset:offset + chunk_size]
+        budgets = list(due_budgets(today, chunk))
+        candidates = [next_budget(budget, today, carry_over) for budget in budgets]
+        # Left out here (and skipped by ignore_conflicts if one lands
+        # meanwhile): next periods that already exist
+        existing = set(Budget.objects.filter(
+            user_id__in=chunk, start_date__in={budget.start_date for budget in candidates},
+        ).values_list('user_id', 'category_id', 'period', 'start_date'))
+        new = [budget for budget in candidates if budget_key(budget) not in existing]
+        bulk_create_budgets(new)
+
+        stats['users'] += len(chunk)
+        stats['budgets'] += len(budgets)
+        stats['created'] += len(new)
+        stats['created_keys'] += [budget_key(budget) for budget in new]
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
@@ -1,18 +1,17 @@
 from rest_framework import serializers
 from .models import Budget
-from transactions.models import Transaction
-from django.db.models import Sum
-from datetime import datetime
+from transactions.serializers import CategoryFieldsMixin
 
-class BudgetSerializer(serializers.ModelSerializer):
+
+class BudgetSerializer(CategoryFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Budget model.
     Includes calculated fields that show how much of the budget has been spent.
     """
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_name = serializers.SerializerMethodField()
     
-    # These are calculated fields that don't exist in the database
-    # They're computed on-the-fly when the data is serialized
+    # spent_amount is a counter kept current by transaction writes;
+    # the other two are computed from it when the data is serialized
     spent_amount = serializers.SerializerMethodField()
     remaining_amount = serializers.SerializerMethodField()
     percentage_used = serializers.SerializerMethodField()
@@ -20,26 +19,19 @@ class BudgetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Budget
         fields = (
-            'id', 'category', 'category_name', 'amount', 'period', 
+            'id', 'category', 'category_name', 'amount', 'carried_over', 'period', 
             'start_date', 'end_date', 'is_active', 'alert_threshold',
             'spent_amount', 'remaining_amount', 'percentage_used',
             'created_at', 'updated_at'
         )
-        read_only_fields = ('id', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'carried_over', 'created_at', 'updated_at')
     
     def get_spent_amount(self, obj):
         """
-        Calculate how much money has been spent in this budget's category
-        during the budget period.
+        How much money has been spent in this budget's category during the
+        budget period (the maintained Budget.spent_amount counter).
         """
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            category=obj.category,
-            type='expense',
-            date__range=[obj.start_date, obj.end_date]
-        ).aggregate(total=Sum('amount'))['total']
-        
-        return float(spent or 0)
+        return float(obj.spent_amount)
     
     def get_remaining_amount(self, obj):
         """
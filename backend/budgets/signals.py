@@ -0,0 +1,49 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from transactions import rollups
+from transactions.models import Transaction
+from users.versioning import bump_data_version
+from . import counters
+from .models import Budget
+
+
+@receiver(pre_save, sender=Budget)
+def count_spent_on_budget_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    A saved budget starts from its actual spend (its category or window may
+    have changed, and the in-memory counter may be stale); from then on
+    transaction writes keep it current.
+    """
+    if raw or (update_fields is not None and 'spent_amount' not in update_fields):
+        return
+    instance.spent_amount = counters.spent_for(instance)
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def bump_version_on_budget_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=Transaction)
+def update_spent_on_transaction_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the transaction's amount between budgets. The stored values from
+    before an update are stashed by the rollup pre_save handler.
+    """
+    if raw or rollups.is_suspended():
+        return
+    deltas = counters.transaction_deltas([instance])
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous and not created:
+        deltas = counters.merge(deltas, counters.transaction_deltas([Transaction(**previous)], sign=-1))
+    counters.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_spent_on_transaction_delete(sender, instance, **kwargs):
+    if rollups.is_suspended():
+        return
+    counters.apply_deltas(counters.transaction_deltas([instance], sign=-1))
@@ -1,3 +1,413 @@
+"""
+Budget.spent_amount maintenance, alert thresholds, rollover and the budget actions.
+
+After every transaction write path each budget's counter must equal its
+spend recomputed from the raw transactions; reconcile_budgets finds and
+repairs counters that drifted anyway.
+"""
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import transaction
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from transactions.models import Category, Transaction
+from users.models import CustomUser
+from . import counters, rollover as rollover_module
+from .models import Budget
+from .rollover import bulk_create_budgets, rollover
+
+
+class SpentCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='budgets@example.com', username='budgets', password='budgets-password'
+        )
+        cls.other = CustomUser.objects.create_user(
+            email='budgets-other@example.com', username='budgets-other', password='other-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.rent = Category.objects.create(name='Rent', type='expense', is_default=True)
+        cls.salary = Category.objects.create(name='Salary', type='income', is_default=True)
+
+        for user in (cls.user, cls.other):
+            for category in (cls.food, cls.rent):
+                for month in (1, 2):
+                    Budget.objects.create(
+                        user=user, category=category, amount=500, period='monthly',
+                        start_date=date(2026, month, 1), end_date=date(2026, month, 28 if month == 2 else 31),
+                    )
+            # Overlaps both monthly food budgets
+            Budget.objects.create(
+                user=user, category=cls.food, amount=5000, period='yearly',
+                start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+            )
+
+    def add(self, amount, day, category='food', type='expense', user=None):
+        return Transaction.objects.create(
+            user=user or self.user, amount=amount, type=type,
+            category=self.food if category == 'food' else category, date=day,
+        )
+
+    def spent(self, category, month):
+        return Budget.objects.get(
+            user=self.user, category=category, period='monthly', start_date=date(2026, month, 1)
+        ).spent_amount
+
+    def assertCountersFresh(self):
+        for budget in Budget.objects.all():
+            self.assertEqual(budget.spent_amount, counters.spent_for(budget), budget)
+
+    def test_create_counts_categorised_expenses_only(self):
+        self.add('12.50', date(2026, 1, 5))
+        self.add(30, date(2026, 1, 6), category=self.rent)
+        self.add(3000, date(2026, 1, 7), category=self.salary, type='income')
+        self.add(7, date(2026, 1, 8), category=None)
+        self.add(99, date(2026, 3, 1))
+        self.assertCountersFresh()
+        self.assertEqual(self.spent(self.food, 1), 12.5)
+        self.assertEqual(Budget.objects.get(user=self.user, period='yearly').spent_amount, 111.5)
+
+    def test_edits_move_spend_between_budgets(self):
+        txn = self.add(40, date(2026, 1, 10))
+        self.add(5, date(2026, 2, 10))
+        for changes in (
+            {'amount': 45},
+            {'date': date(2026, 2, 3)},
+            {'category': self.rent},
+            {'category': None},
+            {'type': 'income', 'category': self.salary},
+            {'type': 'expense', 'category': self.food},
+        ):
+            with self.subTest(changes=changes):
+                for field, value in changes.items():
+                    setattr(txn, field, value)
+                txn.save()
+                self.assertCountersFresh()
+        self.assertEqual(self.spent(self.food, 2), 50)
+
+    def test_delete(self):
+        txn = self.add(40, date(2026, 1, 10))
+        self.add(5, date(2026, 1, 11))
+        txn.delete()
+        self.assertCountersFresh()
+        self.assertEqual(self.spent(self.food, 1), 5)
+
+    def test_bulk_create(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, amount=day, type='expense', category=self.food, date=date(2026, 1, day))
+            for day in range(1, 29)
+        ] + [
+            Transaction(user=self.other, amount=10, type='expense', category=self.rent, date=date(2026, 2, 1)),
+        ])
+        self.assertCountersFresh()
+
+    def test_bulk_create_ignore_conflicts(self):
+        existing = self.add(10, date(2026, 1, 5))
+        Transaction.objects.bulk_create([
+            Transaction(pk=existing.pk, user=self.user, amount=99, type='expense', category=self.food, date=date(2026, 1, 5)),
+            Transaction(user=self.user, amount=4, type='expense', category=self.rent, date=date(2026, 2, 9)),
+        ], ignore_conflicts=True)
+        self.assertCountersFresh()
+        self.assertEqual(self.spent(self.food, 1), 10)
+
+    def test_queryset_update(self):
+        for day in range(1, 11):
+            self.add(day, date(2026, 1, day), category=self.food if day % 2 else self.rent)
+        self.add(20, date(2026, 1, 3), user=self.other)
+        pks = list(Transaction.objects.filter(user=self.user, date__day__lte=5).values_list('pk', flat=True))
+        queryset = Transaction.objects.filter(pk__in=pks)
+        for changes in (
+            {'amount': 8},
+            {'date': date(2026, 2, 15)},
+            {'category': self.rent},
+            {'type': 'income'},
+            {'type': 'expense'},
+            {'description': 'not a counter field'},
+        ):
+            with self.subTest(changes=changes):
+                self.assertEqual(queryset.update(**changes), 5)
+                self.assertCountersFresh()
+
+    def test_queryset_delete(self):
+        for day in range(1, 11):
+            self.add(day, date(2026, 1 + day % 2, day))
+        self.add(20, date(2026, 1, 3), user=self.other)
+        Transaction.objects.filter(user=self.user, date__month=1).delete()
+        self.assertCountersFresh()
+        Transaction.objects.filter(user=self.user).delete()
+        self.assertCountersFresh()
+        self.assertEqual(self.spent(self.food, 2), 0)
+
+    def test_budget_save_recounts(self):
+        self.add(40, date(2026, 1, 10))
+        self.add(15, date(2026, 2, 10))
+        budget = Budget.objects.get(user=self.user, category=self.food, period='monthly', start_date=date(2026, 1, 1))
+        budget.end_date = date(2026, 2, 27)
+        budget.save()
+        self.assertEqual(budget.spent_amount, 55)
+        self.assertCountersFresh()
+
+
+class AlertThresholdTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='alerts@example.com', username='alerts', password='alerts-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.monthly = Budget.objects.create(
+            user=cls.user, category=cls.food, amount=500, period='monthly', alert_threshold=80,
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+        )
+        cls.yearly = Budget.objects.create(
+            user=cls.user, category=cls.food, amount=5000, period='yearly',
+            start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+        )
+
+    def setUp(self):
+        self.sent = []
+        receiver = lambda sender, crossings, **kwargs: self.sent.extend(crossings)
+        counters.threshold_crossed.connect(receiver, weak=False)
+        self.addCleanup(counters.threshold_crossed.disconnect, receiver)
+
+    def add(self, amount, day=date(2026, 1, 10)):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                user=self.user, amount=amount, type='expense', category=self.food, date=day
+            )
+
+    def test_alert_level(self):
+        for spent, amount, level in ((0, 500, None), (399, 500, None), (400, 500, 'warning'),
+                                     (500, 500, 'danger'), (10, 0, None)):
+            with self.subTest(spent=spent, amount=amount):
+                self.assertEqual(counters.alert_level(Decimal(spent), Decimal(amount), 80), level)
+
+    def test_crossings_are_sent_once_per_level(self):
+        self.add(300)
+        self.assertEqual(self.sent, [])
+        self.add(150)
+        self.assertEqual(self.sent, [(self.monthly.pk, 'warning')])
+        self.add(10)
+        self.add(60)
+        self.assertEqual(self.sent[1:], [(self.monthly.pk, 'danger')])
+
+        # Back under and over again is a new crossing; going down isn't one
+        txn = self.add(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(pk=txn.pk).delete()
+            Transaction.objects.filter(amount=60).update(amount=20)
+        self.assertEqual(len(self.sent), 2)
+        self.add(30)
+        self.assertEqual(self.sent[2:], [(self.monthly.pk, 'danger')])
+
+    def test_bulk_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.bulk_create([
+                Transaction(user=self.user, amount=300, type='expense', category=self.food, date=date(2026, month, 2))
+                for month in range(1, 13)
+            ] + [
+                Transaction(user=self.user, amount=450, type='expense', category=self.food, date=date(2026, 1, 3)),
+            ])
+        self.assertEqual(sorted(self.sent), sorted([(self.monthly.pk, 'danger'), (self.yearly.pk, 'warning')]))
+
+    def test_nothing_sent_when_rolled_back(self):
+        try:
+            with transaction.atomic():
+                Transaction.objects.create(
+                    user=self.user, amount=900, type='expense', category=self.food, date=date(2026, 1, 10)
+                )
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.sent, [])
+        self.assertEqual(Budget.objects.get(pk=self.monthly.pk).spent_amount, 0)
+
+
+class ReconcileBudgetsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='reconcile@example.com', username='reconcile', password='reconcile-password'
+        )
+        cls.other = CustomUser.objects.create_user(
+            email='reconcile-other@example.com', username='reconcile-other', password='other-password'
+        )
+        food = Category.objects.create(name='Food', type='expense', is_default=True)
+        for user in (cls.user, cls.other):
+            Budget.objects.create(
+                user=user, category=food, amount=500, period='monthly',
+                start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+            )
+            Transaction.objects.create(user=user, amount=25, type='expense', category=food, date=date(2026, 1, 4))
+
+    def reconcile(self, *args):
+        out = io.StringIO()
+        call_command('reconcile_budgets', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_and_repairs_drift(self):
+        self.assertIn('0 drifted', self.reconcile())
+
+        Budget.objects.update(spent_amount=3)
+        output = self.reconcile()
+        self.assertIn('2 of 2 budgets drifted', output)
+        self.assertEqual(set(Budget.objects.values_list('spent_amount', flat=True)), {3})
+
+        output = self.reconcile('--fix', '--user', str(self.user.pk))
+        self.assertIn('1 repaired', output)
+        self.assertEqual(Budget.objects.get(user=self.user).spent_amount, 25)
+        self.assertEqual(Budget.objects.get(user=self.other).spent_amount, 3)
+
+        self.reconcile('--fix', '--chunk-size', '1')
+        self.assertEqual(counters.find_drift(Budget.objects.all()), [])
+
+
+class RolloverTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='rollover@example.com', username='rollover', password='rollover-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.rent = Category.objects.create(name='Rent', type='expense', is_default=True)
+        cls.january = Budget.objects.create(
+            user=cls.user, category=cls.food, amount=500, period='monthly', alert_threshold=70,
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+        )
+        Transaction.objects.create(user=cls.user, amount=200, type='expense', category=cls.food, date=date(2026, 1, 4))
+
+    def test_creates_next_period_once(self):
+        stats = rollover(today=date(2026, 2, 10))
+        self.assertEqual((stats['budgets'], stats['created']), (1, 1))
+        self.assertEqual(stats['created_keys'], [(self.user.pk, self.food.pk, 'monthly', date(2026, 2, 1))])
+        february = Budget.objects.get(start_date=date(2026, 2, 1))
+        self.assertEqual((february.end_date, february.amount, february.carried_over), (date(2026, 2, 28), 500, 0))
+        self.assertEqual(february.alert_threshold, 70)
+
+        # February isn't over, and January now has a later budget
+        self.assertEqual(rollover(today=date(2026, 2, 10))['created'], 0)
+        self.assertEqual(Budget.objects.count(), 2)
+
+    def test_catches_up_missed_periods(self):
+        rollover(today=date(2026, 4, 15))
+        self.assertEqual(
+            Budget.objects.latest('start_date').start_date, date(2026, 4, 1)
+        )
+        self.assertEqual(Budget.objects.count(), 2)
+
+    def test_carry_over(self):
+        rollover(today=date(2026, 2, 10), carry_over=True)
+        february = Budget.objects.get(start_date=date(2026, 2, 1))
+        self.assertEqual((february.amount, february.carried_over), (800, 300))
+
+        # The carried amount isn't carried again: March starts from the base
+        rollover(today=date(2026, 3, 10), carry_over=True)
+        march = Budget.objects.get(start_date=date(2026, 3, 1))
+        self.assertEqual((march.amount, march.carried_over), (1300, 800))
+
+    def test_concurrent_run_wins(self):
+        # Another run inserts February between reading the due budgets and
+        # inserting: it isn't created twice, counted or returned here
+        real_due_budgets = rollover_module.due_budgets
+
+        def racing(today, user_ids=None):
+            queryset = real_due_budgets(today, user_ids)
+            if isinstance(user_ids, list):
+                queryset = list(queryset)
+                Budget.objects.create(
+                    user=self.user, category=self.food, amount=99, period='monthly',
+                    start_date=date(2026, 2, 1), end_date=date(2026, 2, 28),
+                )
+            return queryset
+
+        with mock.patch.object(rollover_module, 'due_budgets', racing):
+            stats = rollover(today=date(2026, 2, 10))
+        self.assertEqual((stats['budgets'], stats['created'], stats['created_keys']), (1, 0, []))
+        self.assertEqual(Budget.objects.get(start_date=date(2026, 2, 1)).amount, 99)
+
+    def test_bulk_create_ignores_conflicts(self):
+        bulk_create_budgets([Budget(
+            user=self.user, category=self.food, amount=1, period='monthly',
+            start_date=date(2026, 1, 1), end_date=date(2026, 1, 31),
+        )])
+        self.assertEqual(Budget.objects.get().amount, 500)
+
+
+class BudgetActionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='budget-actions@example.com', username='budget-actions', password='actions-password'
+        )
+        cls.other = CustomUser.objects.create_user(
+            email='budget-actions-other@example.com', username='budget-actions-other', password='other-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.rent = Category.objects.create(name='Rent', type='expense', is_default=True)
+        cls.private = Category.objects.create(name='Hobby', type='expense', user=cls.other)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_rollover_returns_only_its_own_budgets(self):
+        today = date.today()
+        ended = today.replace(day=1) - timedelta(days=1)
+        Budget.objects.create(
+            user=self.user, category=self.food, amount=500, period='monthly',
+            start_date=ended.replace(day=1), end_date=ended,
+        )
+        # Created by someone else while the rollover runs
+        concurrent = Budget.objects.create(
+            user=self.user, category=self.rent, amount=100, period='monthly',
+            start_date=today.replace(day=1), end_date=today,
+        )
+        Budget.objects.filter(pk=concurrent.pk).update(created_at=timezone.now() + timedelta(minutes=1))
+
+        response = self.client.post('/api/budgets/rollover/', {}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([budget['category'] for budget in response.data['budgets']], [self.food.pk])
+        self.assertEqual(response.data['message'], '1 budgets created')
+
+        response = self.client.post('/api/budgets/rollover/', {}, format='json')
+        self.assertEqual((response.data['budgets'], response.data['message']), ([], '0 budgets created'))
+
+    def test_create_monthly_budgets(self):
+        response = self.client.post('/api/budgets/create_monthly_budgets/', {'categories': [
+            {'category_id': self.food.pk, 'amount': '300.00'},
+            {'category_id': str(self.rent.pk), 'amount': 900},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['message'], '2 budgets created')
+
+        response = self.client.post('/api/budgets/create_monthly_budgets/', {'categories': [
+            {'category_id': self.food.pk, 'amount': '1.00'},
+        ]}, format='json')
+        self.assertEqual(response.data['message'], '0 budgets created')
+        self.assertEqual(Budget.objects.get(category=self.food).amount, 300)
 
-# Create your tests here.
+    def test_create_monthly_budgets_rejects_bad_items(self):
+        for categories in (
+            [{'amount': 10}],
+            [{'category_id': 'food', 'amount': 10}],
+            [{'category_id': self.food.pk}],
+            [{'category_id': self.food.pk, 'amount': 'lots'}],
+            [{'category_id': self.private.pk, 'amount': 10}],
+            [{'category_id': 999999, 'amount': 10}],
+            ['food'],
+            {'category_id': self.food.pk, 'amount': 10},
+        ):
+            with self.subTest(categories=categories):
+                response = self.client.post(
+                    '/api/budgets/create_monthly_budgets/', {'categories': categories}, format='json'
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('categories', response.data)
+        self.assertFalse(Budget.objects.exists())
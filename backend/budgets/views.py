@@ -1,12 +1,45 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum
+from django.db.models import Q
 from datetime import datetime, timedelta
+from functools import reduce
+from operator import or_
+from transactions.models import Category
 from .models import Budget
+from .rollover import bulk_create_budgets, rollover
 from .serializers import BudgetSerializer
-from transactions.models import Transaction
+
+def overview_payload(budget_data):
+    """
+    The body of /budgets/overview/ (also the dashboard's budgets section):
+    the serialized active budgets plus an alert for each one that is over
+    budget or past its alert threshold.
+    """
+    alerts = []
+    
+    for data in budget_data:
+        percentage_used = data['percentage_used']
+        if percentage_used >= 100:
+            alerts.append({
+                'type': 'danger',
+                'category': data['category_name'],
+                'message': f"Budget exceeded by ${abs(data['remaining_amount']):.2f}"
+            })
+        elif percentage_used >= data['alert_threshold']:
+            alerts.append({
+                'type': 'warning',
+                'category': data['category_name'],
+                'message': f"{percentage_used:.0f}% of budget used"
+            })
+    
+    return {
+        'budgets': budget_data,
+        'alerts': alerts,
+        'total_budgets': len(budget_data)
+    }
+
 
 class BudgetViewSet(viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
@@ -37,34 +70,9 @@ class BudgetViewSet(viewsets.ModelViewSet):
             end_date__gte=today
         )
         
-        budget_data = []
-        alerts = []
-        
-        for budget in active_budgets:
-            serializer = self.get_serializer(budget)
-            data = serializer.data
-            
-            percentage_used = data['percentage_used']
-            if percentage_used >= 100:
-                alerts.append({
-                    'type': 'danger',
-                    'category': data['category_name'],
-                    'message': f"Budget exceeded by ${abs(data['remaining_amount']):.2f}"
-                })
-            elif percentage_used >= budget.alert_threshold:
-                alerts.append({
-                    'type': 'warning',
-                    'category': data['category_name'],
-                    'message': f"{percentage_used:.0f}% of budget used"
-                })
-            
-            budget_data.append(data)
-        
-        return Response({
-            'budgets': budget_data,
-            'alerts': alerts,
-            'total_budgets': len(budget_data)
-        })
+        # Serialize the whole set at once so spend is resolved in one query
+        budget_data = self.get_serializer(active_budgets, many=True).data
+        return Response(overview_payload(budget_data))
     
     @action(detail=False, methods=['post'])
     def create_monthly_budgets(self, request):
@@ -76,26 +84,100 @@ class BudgetViewSet(viewsets.ModelViewSet):
         else:
             end_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
         
-        categories_data = request.data.get('categories', [])
-        created_budgets = []
+        categories_data = self.monthly_budget_items(request)
+        existing = set(Budget.objects.filter(
+            user=request.user, period='monthly', start_date=start_date
+        ).values_list('category_id', flat=True))
         
-        for cat_data in categories_data:
-            budget, created = Budget.objects.get_or_create(
+        # One insert for the whole request; categories that already have
+        # this month's budget are left alone
+        new_budgets = {}
+        for category_id, amount in categories_data:
+            if category_id in existing or category_id in new_budgets:
+                continue
+            new_budgets[category_id] = Budget(
                 user=request.user,
-                category_id=cat_data['category_id'],
+                category_id=category_id,
                 period='monthly',
                 start_date=start_date,
-                defaults={
-                    'amount': cat_data['amount'],
-                    'end_date': end_date,
-                    'is_active': True
-                }
+                amount=amount,
+                end_date=end_date,
+                is_active=True
             )
-            if created:
-                created_budgets.append(budget)
+        bulk_create_budgets(list(new_budgets.values()))
+        created_budgets = Budget.objects.filter(
+            user=request.user, period='monthly', start_date=start_date,
+            category_id__in=new_budgets
+        )
+        
+        serializer = self.get_serializer(created_budgets, many=True)
+        return Response({
+            'message': f'{len(serializer.data)} budgets created',
+            'budgets': serializer.data
+        }, status=status.HTTP_201_CREATED)
+    
+    def monthly_budget_items(self, request):
+        """
+        The (category_id, amount) pairs of a create_monthly_budgets request.
+        Raises ValidationError (a 400) for a malformed item or a category
+        the user can't budget for.
+        """
+        categories_data = request.data.get('categories', [])
+        if not isinstance(categories_data, list):
+            raise serializers.ValidationError({'categories': ['Expected a list of {"category_id", "amount"} items.']})
+        
+        category_field = serializers.IntegerField(min_value=1)
+        amount_field = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+        items, errors = {}, {}
+        for position, cat_data in enumerate(categories_data):
+            if not isinstance(cat_data, dict):
+                errors[position] = ['Expected an object with "category_id" and "amount".']
+                continue
+            item_errors = {}
+            values = []
+            for name, field in (('category_id', category_field), ('amount', amount_field)):
+                if name not in cat_data:
+                    item_errors[name] = ['This field is required.']
+                    continue
+                try:
+                    values.append(field.to_internal_value(cat_data[name]))
+                except serializers.ValidationError as exc:
+                    item_errors[name] = exc.detail
+            if item_errors:
+                errors[position] = item_errors
+            else:
+                items[position] = tuple(values)
+        
+        usable = set(Category.objects.for_user(request.user).filter(
+            pk__in={category_id for category_id, amount in items.values()}
+        ).values_list('pk', flat=True))
+        for position, (category_id, amount) in items.items():
+            if category_id not in usable:
+                errors[position] = {'category_id': ['Unknown category.']}
+        if errors:
+            raise serializers.ValidationError({'categories': errors})
+        return list(items.values())
+    
+    @action(detail=False, methods=['post'])
+    def rollover(self, request):
+        """
+        Roll the user's ended budgets over into the current period,
+        optionally carrying unspent amounts over ({"carry_over": true}).
+        """
+        try:
+            carry_over = serializers.BooleanField().to_internal_value(request.data.get('carry_over', False))
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({'carry_over': exc.detail})
+        stats = rollover(carry_over=carry_over, user_ids=[request.user.pk])
+        created_budgets = Budget.objects.none()
+        if stats['created_keys']:
+            created_budgets = Budget.objects.filter(user=request.user).filter(reduce(or_, (
+                Q(category_id=category_id, period=period, start_date=start_date)
+                for user_id, category_id, period, start_date in stats['created_keys']
+            )))
         
         serializer = self.get_serializer(created_budgets, many=True)
         return Response({
-            'message': f'{len(created_budgets)} budgets created',
+            'message': f"{stats['created']} budgets created",
             'budgets': serializer.data
         }, status=status.HTTP_201_CREATED)
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+Bulkheads and load shedding for the expensive read endpoints.
+
+Each heavy view belongs to an endpoint class from ADMISSION['CLASSES']
+('analytics', 'reports'), and a class runs at most CONCURRENCY of its
+requests at once per process. Up to QUEUE more wait for a slot, for at
+most QUEUE_TIMEOUT seconds; anything beyond that is shed straight away
+instead of tying up a worker, so a burst of dashboard loads can't leave
+the cheap CRUD endpoints (which no class limits) queued behind it.
+
+A shed request gets the last good response for the same user, endpoint
+and query when one was kept (for up to STALE_TIMEOUT seconds, in the
+STALE_ALIAS cache rather than the response cache, so they don't crowd
+out fresh responses and are kept whether or not that is enabled), marked
+X-Load-Shed: stale; otherwise it gets STATUS (503 by default) with
+Retry-After. Neither is cached or given validators, so the client gets
+the fresh data on its next request. Response cache hits and 304s are
+answered before admission and never queue.
+
+Limits and counts are per process (exported at /api/metrics/), and a
+limit only bites when a process serves several requests at once: with
+gunicorn's default single-threaded sync workers one request is ever in
+flight, so nothing queues or is shed. Run threaded workers (gthread with
+--threads above CONCURRENCY) or an ASGI server. A queued sync request
+holds its worker thread while it waits; an async one only holds a pool
+thread, and if it is cancelled meanwhile (the client went away) a slot
+the thread still gets is handed straight back.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .response_cache import query_digest
+
+SHED_HEADER = 'X-Load-Shed'
+
+
+class Bulkhead:
+    """
+    A counting semaphore with a bounded, timed wait queue.
+    """
+    def __init__(self, concurrency, queue, queue_timeout):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, blocking=True):
+        """
+        Take a slot, waiting in the queue if `blocking` and it has room.
+        Returns False when the request should be shed.
+        """
+        with self._condition:
+            if self.active < self.concurrency:
+                self.active += 1
+                return True
+            if not blocking or self.waiting >= self.queue or self.queue_timeout <= 0:
+                return False
+
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self.active < self.concurrency, self.queue_timeout
+                )
+            finally:
+                self.waiting -= 1
+            if admitted:
+                self.active += 1
+            return admitted
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+
+async def acquire_async(bulkhead):
+    """
+    Bulkhead.acquire() for async views: only a request that has to queue
+    waits, in a pool thread, and cancellation can't leak the slot.
+    """
+    if bulkhead.acquire(blocking=False):
+        return True
+
+    waiter = asyncio.ensure_future(sync_to_async(bulkhead.acquire, thread_sensitive=False)())
+    try:
+        return await asyncio.shield(waiter)
+    except asyncio.CancelledError:
+        def release_unused(future):
+            if not future.cancelled() and future.exception() is None and future.result():
+                bulkhead.release()
+        waiter.add_done_callback(release_unused)
+        raise
+
+
+_lock = threading.Lock()
+_bulkheads = {}
+_shed = defaultdict(lambda: {'stale': 0, 'rejected': 0})
+
+
+def get_bulkhead(endpoint_class):
+    """
+    The process's bulkhead for a class, or None when admission control is
+    off or the class has no limits configured.
+    """
+    config = settings.ADMISSION
+    limits = config['CLASSES'].get(endpoint_class)
+    if not config['ENABLED'] or not limits:
+        return None
+
+    key = (endpoint_class, limits['CONCURRENCY'], limits['QUEUE'], limits['QUEUE_TIMEOUT'])
+    bulkhead = _bulkheads.get(key)
+    if bulkhead is None:
+        with _lock:
+            bulkhead = _bulkheads.setdefault(key, Bulkhead(*key[1:]))
+    return bulkhead
+
+
+def admission_stats():
+    """
+    Slots in use, waiting requests and shed counts for this process, per class.
+    """
+    with _lock:
+        shed = {name: dict(counts) for name, counts in _shed.items()}
+    stats = {}
+    for name in settings.ADMISSION['CLASSES']:
+        bulkhead = get_bulkhead(name)
+        counts = shed.get(name, {})
+        stats[name] = {
+            'concurrency': bulkhead.concurrency if bulkhead else 0,
+            'active': bulkhead.active if bulkhead else 0,
+            'waiting': bulkhead.waiting if bulkhead else 0,
+            'stale': counts.get('stale', 0),
+            'rejected': counts.get('rejected', 0),
+        }
+    return stats
+
+
+def reset_admission_stats():
+    with _lock:
+        _shed.clear()
+
+
+def _record_shed(endpoint_class, outcome):
+    with _lock:
+        _shed[endpoint_class][outcome] += 1
+
+
+def get_stale_cache():
+    return caches[settings.ADMISSION['STALE_ALIAS']]
+
+
+def stale_key(user, endpoint, query_params):
+    # Unlike the response cache key, no data version or day: stale is the point
+    return f'stale:{user.pk}:{endpoint}:{query_digest(query_params)}'
+
+
+def _stale_key(request, endpoint):
+    """
+    Where this request's last good response is kept, or None when stale
+    copies are off or the user is anonymous.
+    """
+    if settings.ADMISSION['STALE_TIMEOUT'] <= 0 or not request.user.is_authenticated:
+        return None
+    return stale_key(request.user, endpoint, request.query_params)
+
+
+def _keeps_stale(key, response):
+    return key is not None and response.status_code == 200 and hasattr(response, 'data')
+
+
+def _shed_response(endpoint_class, data):
+    if data is not None:
+        _record_shed(endpoint_class, 'stale')
+        return Response(data, headers={SHED_HEADER: 'stale'})
+
+    _record_shed(endpoint_class, 'rejected')
+    limits = settings.ADMISSION['CLASSES'][endpoint_class]
+    return Response(
+        {'error': 'The server is busy, please retry shortly.'},
+        status=settings.ADMISSION['STATUS'],
+        headers={SHED_HEADER: 'rejected', 'Retry-After': str(limits['RETRY_AFTER'])},
+    )
+
+
+def admission_controlled(endpoint_class, endpoint):
+    """
+    Decorator for a view/action handler (inside @cached_response, so cache
+    hits skip admission) that runs it within the class's bulkhead and
+    sheds the request when the bulkhead is full. Sync and async handlers.
+    """
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                bulkhead = get_bulkhead(endpoint_class)
+                if bulkhead is None:
+                    return await view_method(view, request, *args, **kwargs)
+
+                admitted = await acquire_async(bulkhead)
+                key = _stale_key(request, endpoint)
+                if not admitted:
+                    data = await get_stale_cache().aget(key) if key else None
+                    return _shed_response(endpoint_class, data)
+
+                try:
+                    response = await view_method(view, request, *args, **kwargs)
+                finally:
+                    bulkhead.release()
+                if _keeps_stale(key, response):
+                    await get_stale_cache().aset(key, response.data, settings.ADMISSION['STALE_TIMEOUT'])
+                return response
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            bulkhead = get_bulkhead(endpoint_class)
+            if bulkhead is None:
+                return view_method(view, request, *args, **kwargs)
+
+            key = _stale_key(request, endpoint)
+            if not bulkhead.acquire():
+                data = get_stale_cache().get(key) if key else None
+                return _shed_response(endpoint_class, data)
+
+            try:
+                response = view_method(view, request, *args, **kwargs)
+            finally:
+                bulkhead.release()
+            if _keeps_stale(key, response):
+                get_stale_cache().set(key, response.data, settings.ADMISSION['STALE_TIMEOUT'])
+            return response
+        return wrapper
+    return decorator
@@ -3,6 +3,15 @@ ASGI config for finance_tracker project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Run it under an ASGI server, e.g.
+
+    gunicorn finance_tracker.asgi:application -k uvicorn.workers.UvicornWorker
+
+and set ASYNC_VIEWS_ENABLED=True to serve the analytics and transaction
+summary endpoints from their async views, which run independent queries
+concurrently (ASYNC_QUERY_WORKERS threads per process). The other
+endpoints stay sync and are run in a thread by Django as usual.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
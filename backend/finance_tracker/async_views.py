@@ -0,0 +1,44 @@
+"""
+A minimal async-capable DRF APIView.
+
+DRF's dispatch() is synchronous, so an `async def get` on a plain APIView
+would hand back an un-awaited coroutine. AsyncAPIView runs the usual
+authentication/permission/throttle checks in a worker thread (they hit
+the database) and awaits coroutine handlers; everything else (request
+parsing, exception handling, renderers) is DRF's own.
+"""
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    Subclasses define `async def get(...)` etc. Django requires a view's
+    handlers to be all sync or all async, hence the async options().
+    """
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if iscoroutinefunction(handler):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
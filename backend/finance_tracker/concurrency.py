@@ -0,0 +1,61 @@
+"""
+Run independent ORM reads concurrently from async views.
+
+Django database connections belong to one thread, and the async ORM
+funnels every query of a request through that request's single sync
+thread, so awaiting two querysets still runs them one after the other.
+run_concurrently() instead gives each callable a thread from a bounded
+pool (with that thread's own connection) and awaits them together.
+
+Inside a transaction the callables run one by one on the request's own
+connection instead: other connections couldn't see its uncommitted rows
+(this is also what keeps TestCase-based tests correct).
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_VIEWS['QUERY_WORKERS'],
+            thread_name_prefix='query-worker',
+        )
+    return _executor
+
+
+def _in_worker(func):
+    def run():
+        # Same connection housekeeping Django does around each request
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return run
+
+
+def _run_serially(funcs):
+    return [func() for func in funcs]
+
+
+async def run_concurrently(*funcs):
+    """
+    Call each zero-argument function (typically one query) and return
+    their results in order.
+    """
+    if len(funcs) < 2 or await sync_to_async(lambda: connection.in_atomic_block)():
+        return await sync_to_async(_run_serially)(funcs)
+
+    executor = get_executor()
+    return await asyncio.gather(*(
+        sync_to_async(_in_worker(func), thread_sensitive=False, executor=executor)()
+        for func in funcs
+    ))
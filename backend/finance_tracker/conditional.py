@@ -0,0 +1,92 @@
+"""
+Conditional GET for per-user read endpoints.
+
+A response only changes when the user's data version does (bumped on
+every transaction/budget/category write), when the query string changes,
+or when the day rolls over (default date ranges and analytics depend on
+today). The ETag is a hash of exactly those, so it is known from the
+authenticated user alone and a matching If-None-Match is answered with
+304 before the view runs any query. Last-Modified is the later of the
+last data change and the start of today.
+
+Successful responses are marked private/no-cache so browsers keep them
+but revalidate on every use. Error responses (a malformed date range)
+and responses shed under load (see admission.py) carry no validators.
+"""
+import hashlib
+from datetime import datetime, time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .response_cache import query_digest
+
+
+def data_etag(request, endpoint):
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    parts = (
+        user.pk, user.data_version, timezone.localdate().isoformat(), endpoint,
+        query_digest(request.query_params), request.META.get('HTTP_ACCEPT', ''),
+    )
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def data_last_modified(request):
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    start_of_today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    if user.data_updated_at is None:
+        return start_of_today
+    return max(user.data_updated_at, start_of_today)
+
+
+def conditional_response(endpoint):
+    """
+    Decorator for a view/action handler (outside @cached_response, so a
+    304 skips the cache lookup too) adding ETag and Last-Modified and
+    answering If-None-Match / If-Modified-Since with 304. Works on sync
+    and async handlers alike.
+    """
+    conditional = condition(
+        etag_func=lambda request, view, *args, **kwargs: data_etag(request, endpoint),
+        last_modified_func=lambda request, view, *args, **kwargs: data_last_modified(request),
+    )
+
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @conditional
+            async def respond(request, view, *args, **kwargs):
+                return await view_method(view, request, *args, **kwargs)
+
+            @wraps(view_method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                return _mark_private(await respond(request, view, *args, **kwargs))
+            return async_wrapper
+
+        @conditional
+        def respond(request, view, *args, **kwargs):
+            return view_method(view, request, *args, **kwargs)
+
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            return _mark_private(respond(request, view, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def _mark_private(response):
+    patch_vary_headers(response, ['Authorization'])
+    succeeded = 200 <= response.status_code < 300 or response.status_code == 304
+    if not succeeded or response.has_header('X-Load-Shed'):
+        # Errors and shed responses (stale or rejected) mustn't validate later requests
+        response.headers.pop('ETag', None)
+        response.headers.pop('Last-Modified', None)
+    if succeeded:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,84 @@
+"""
+Everything the dashboard page shows, built in one request.
+
+The summary (this month) and trends (last 180 days) sections come from a
+single rollup read over the trends window grouped by month, type and
+category: the trend rows are folded whole, and the current month's rows
+are the summary. Category names, icons and colors for every section come
+from the category registry, and the rest is one query each (recent
+transactions, active budgets plus their spend), so a full dashboard costs
+a handful of queries whatever the size of the account.
+"""
+from datetime import timedelta
+
+from budgets.models import Budget
+from budgets.serializers import BudgetSerializer
+from budgets.views import overview_payload
+from transactions import rollups
+from transactions.categories import registry as category_registry
+from transactions.models import Transaction
+from transactions.serializers import CategorySerializer, TransactionSerializer
+from transactions.stats import STATS_GROUP_BY, build_period_stats, summary_payload, trends_payload
+
+SECTIONS = ('summary', 'trends', 'recent', 'categories', 'budgets')
+TRENDS_DAYS = 180
+RECENT_LIMIT = 5
+MAX_RECENT_LIMIT = 50
+
+
+class Dashboard:
+    """
+    Builds the requested sections for one user. Intermediate results that
+    several sections need are computed once and shared.
+    """
+    def __init__(self, user, today, context=None, recent_limit=RECENT_LIMIT):
+        self.user = user
+        self.today = today
+        self.context = context or {}
+        self.recent_limit = recent_limit
+        self._period_rows = None
+
+    def period_rows(self):
+        """
+        Rollup rows for the trends window, read once for summary and trends.
+        """
+        if self._period_rows is None:
+            self._period_rows = rollups.period_totals(
+                self.user, self.today - timedelta(days=TRENDS_DAYS), self.today,
+                group_by=STATS_GROUP_BY
+            )
+        return self._period_rows
+
+    def summary(self):
+        month_start = self.today.replace(day=1)
+        rows = [row for row in self.period_rows() if row['month'] >= month_start]
+        return summary_payload(build_period_stats(rows, month_start, self.today))
+
+    def trends(self):
+        stats = build_period_stats(
+            self.period_rows(), self.today - timedelta(days=TRENDS_DAYS), self.today
+        )
+        return trends_payload(stats)
+
+    def recent(self):
+        transactions = Transaction.objects.filter(user=self.user)
+        return TransactionSerializer(
+            transactions[:self.recent_limit], many=True, context=self.context
+        ).data
+
+    def categories(self):
+        categories = category_registry.sorted_for_user(self.user)
+        return CategorySerializer(categories, many=True, context=self.context).data
+
+    def budgets(self):
+        active_budgets = Budget.objects.filter(
+            user=self.user,
+            is_active=True,
+            start_date__lte=self.today,
+            end_date__gte=self.today
+        )
+        budget_data = BudgetSerializer(active_budgets, many=True, context=self.context).data
+        return overview_payload(budget_data)
+
+    def build(self, sections=SECTIONS):
+        return {section: getattr(self, section)() for section in sections}
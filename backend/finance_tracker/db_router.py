@@ -0,0 +1,106 @@
+"""
+Read-replica routing for analytics and reporting traffic.
+
+Views opt in with @replica_reads; inside them (and inside the
+read_replica() context manager) every ORM read goes to the 'replica'
+database alias when one is configured. Writes, migrations and all other
+views stay on 'default'.
+
+Read-your-writes: a user who wrote within REPLICA['STICKY_SECONDS'] is
+kept on the primary, so a chart refreshed right after adding a
+transaction can't come from a replica that hasn't caught up yet. The
+time of the last write is the user's data_updated_at, which every
+transaction/budget/category write already bumps and which authentication
+reads from the primary on every request, before any view routes reads
+(see users/authentication.py). STICKY_SECONDS should exceed the
+replica's usual lag.
+
+The flag lives in a context variable, so it follows async views into
+their query worker threads and streaming responses (exports) through
+to their last chunk.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_alias():
+    """
+    The replica's alias, or None when no replica is configured.
+    """
+    alias = settings.REPLICA['ALIAS']
+    return alias if alias in connections else None
+
+
+def wrote_recently(user):
+    updated_at = getattr(user, 'data_updated_at', None)
+    if updated_at is None:
+        return False
+    return timezone.now() - updated_at < timedelta(seconds=settings.REPLICA['STICKY_SECONDS'])
+
+
+@contextmanager
+def read_replica(enabled=True):
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _streamed(chunks, enabled):
+    # Consumed after the view returned, maybe in another context: no reset()
+    previous = _use_replica.get()
+    _use_replica.set(enabled)
+    try:
+        yield from chunks
+    finally:
+        _use_replica.set(previous)
+
+
+def replica_reads(view_method):
+    """
+    Decorator for a view/action handler whose reads may come from the
+    replica (sync or async, plain or streaming responses).
+    """
+    if iscoroutinefunction(view_method):
+        @wraps(view_method)
+        async def async_wrapper(view, request, *args, **kwargs):
+            with read_replica(not wrote_recently(request.user)):
+                return await view_method(view, request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        enabled = not wrote_recently(request.user)
+        with read_replica(enabled):
+            response = view_method(view, request, *args, **kwargs)
+        if getattr(response, 'streaming', False):
+            response.streaming_content = _streamed(response.streaming_content, enabled)
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db == 'default'
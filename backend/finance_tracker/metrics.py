@@ -0,0 +1,318 @@
+"""
+Per-endpoint request metrics, exposed in Prometheus text format.
+
+MetricsMiddleware times every request, counts its SQL queries and their
+time through a database execute wrapper (installed on every connection
+and routed to the current request through a context variable, so queries
+that async views run in worker threads count too), and records the
+response size, keyed by the resolved URL name (e.g. 'analytics-insights').
+
+Each thread records into its own shard, so the request path never waits
+on a lock; the shards are only merged when /api/metrics/ is scraped.
+Numbers are per process. With METRICS['ENABLED'] off the middleware
+removes itself at startup and costs nothing.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .admission import admission_stats
+from .response_cache import cache_stats
+
+# Upper bounds of the histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+UNRESOLVED = '<unresolved>'
+
+
+class _ViewStats:
+    __slots__ = (
+        'requests', 'statuses', 'latency_buckets', 'latency_sum',
+        'query_buckets', 'queries', 'query_seconds', 'response_bytes',
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = defaultdict(int)
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.query_buckets = [0] * (len(QUERY_COUNT_BUCKETS) + 1)
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.response_bytes = 0
+
+    def merge(self, other):
+        self.requests += other.requests
+        for status, count in other.statuses.items():
+            self.statuses[status] += count
+        for index, count in enumerate(other.latency_buckets):
+            self.latency_buckets[index] += count
+        self.latency_sum += other.latency_sum
+        for index, count in enumerate(other.query_buckets):
+            self.query_buckets[index] += count
+        self.queries += other.queries
+        self.query_seconds += other.query_seconds
+        self.response_bytes += other.response_bytes
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = defaultdict(_ViewStats)
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def record(self, view, status, seconds, queries, query_seconds, response_bytes):
+        stats = self._shard()[view]
+        stats.requests += 1
+        stats.statuses[status] += 1
+        stats.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.latency_sum += seconds
+        stats.query_buckets[bisect_left(QUERY_COUNT_BUCKETS, queries)] += 1
+        stats.queries += queries
+        stats.query_seconds += query_seconds
+        stats.response_bytes += response_bytes
+
+    def snapshot(self):
+        """
+        Merge every thread's shard into {view: _ViewStats}. A scrape may race
+        with a request being recorded and miss it until the next scrape.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        merged = defaultdict(_ViewStats)
+        for shard in shards:
+            for view, stats in list(shard.items()):
+                merged[view].merge(stats)
+        return dict(merged)
+
+    def reset(self):
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+registry = MetricsRegistry()
+
+
+class QueryCounter:
+    """
+    Counts a request's queries and their time. Async views may run queries
+    in worker threads, so updates take a lock.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.seconds += elapsed
+                self.count += 1
+
+
+# The current request's counter. Context variables follow the request into
+# sync_to_async worker threads, whose connections are not the request thread's.
+_current_counter = ContextVar('metrics_query_counter', default=None)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _current_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    """
+    connection_created receiver: every connection, in every thread, reports
+    to whichever request is current.
+    """
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_counter, dispatch_uid='metrics-query-counter')
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = _current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_counter.reset(token)
+        return self.measure(request, response, counter, started)
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = _current_counter.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_counter.reset(token)
+        return self.measure(request, response, counter, started)
+
+    def measure(self, request, response, counter, started):
+        def finish(response_bytes):
+            match = request.resolver_match
+            registry.record(
+                view=(match.view_name if match else None) or UNRESOLVED,
+                status=response.status_code,
+                seconds=time.perf_counter() - started,
+                queries=counter.count,
+                query_seconds=counter.seconds,
+                response_bytes=response_bytes,
+            )
+
+        if response.streaming:
+            # Exports run their queries while streaming; record once the body is done
+            response.streaming_content = _measured(response.streaming_content, counter, finish)
+        else:
+            finish(len(response.content))
+        return response
+
+
+def _measured(chunks, counter, finish):
+    size = 0
+    # May be consumed in another context than the request ran in, so no reset()
+    previous = _current_counter.get()
+    _current_counter.set(counter)
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            yield chunk
+    finally:
+        _current_counter.set(previous)
+        finish(size)
+
+
+# ==================== PROMETHEUS EXPOSITION ====================
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram(lines, name, view, bounds, buckets, total):
+    cumulative = 0
+    for bound, count in zip(bounds, buckets):
+        cumulative += count
+        lines.append(f'{name}_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+    cumulative += buckets[-1]
+    lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {cumulative}')
+    lines.append(f'{name}_sum{{view="{view}"}} {total}')
+    lines.append(f'{name}_count{{view="{view}"}} {cumulative}')
+
+
+def render_prometheus():
+    views = registry.snapshot()
+    lines = []
+
+    lines += [
+        '# HELP finance_requests_total Requests handled, by view and status code.',
+        '# TYPE finance_requests_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        for status, count in sorted(stats.statuses.items()):
+            lines.append(f'finance_requests_total{{view="{_label(view)}",status="{status}"}} {count}')
+
+    lines += [
+        '# HELP finance_request_duration_seconds Request latency, by view.',
+        '# TYPE finance_request_duration_seconds histogram',
+    ]
+    for view, stats in sorted(views.items()):
+        _histogram(lines, 'finance_request_duration_seconds', _label(view),
+                   LATENCY_BUCKETS, stats.latency_buckets, round(stats.latency_sum, 6))
+
+    lines += [
+        '# HELP finance_request_queries SQL queries per request, by view.',
+        '# TYPE finance_request_queries histogram',
+    ]
+    for view, stats in sorted(views.items()):
+        _histogram(lines, 'finance_request_queries', _label(view),
+                   QUERY_COUNT_BUCKETS, stats.query_buckets, stats.queries)
+
+    lines += [
+        '# HELP finance_request_query_seconds_total Time spent in SQL queries, by view.',
+        '# TYPE finance_request_query_seconds_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'finance_request_query_seconds_total{{view="{_label(view)}"}} {round(stats.query_seconds, 6)}')
+
+    lines += [
+        '# HELP finance_response_bytes_total Response body bytes sent, by view.',
+        '# TYPE finance_response_bytes_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'finance_response_bytes_total{{view="{_label(view)}"}} {stats.response_bytes}')
+
+    cache = cache_stats()
+    lines += [
+        '# HELP finance_response_cache_requests_total Response cache lookups, by endpoint and outcome.',
+        '# TYPE finance_response_cache_requests_total counter',
+    ]
+    for endpoint, counts in sorted(cache['endpoints'].items()):
+        for outcome in ('hits', 'misses'):
+            lines.append(
+                f'finance_response_cache_requests_total{{endpoint="{_label(endpoint)}",outcome="{outcome}"}} {counts[outcome]}'
+            )
+
+    admission = admission_stats()
+    lines += [
+        '# HELP finance_admission_shed_total Requests shed by admission control, by endpoint class and outcome.',
+        '# TYPE finance_admission_shed_total counter',
+    ]
+    for endpoint_class, counts in sorted(admission.items()):
+        for outcome in ('stale', 'rejected'):
+            lines.append(
+                f'finance_admission_shed_total{{endpoint_class="{_label(endpoint_class)}",outcome="{outcome}"}} {counts[outcome]}'
+            )
+    lines += [
+        '# HELP finance_admission_active Requests running in each endpoint class.',
+        '# TYPE finance_admission_active gauge',
+    ]
+    for endpoint_class, counts in sorted(admission.items()):
+        lines.append(f'finance_admission_active{{endpoint_class="{_label(endpoint_class)}"}} {counts["active"]}')
+    lines += [
+        '# HELP finance_admission_waiting Requests queued for each endpoint class.',
+        '# TYPE finance_admission_waiting gauge',
+    ]
+    for endpoint_class, counts in sorted(admission.items()):
+        lines.append(f'finance_admission_waiting{{endpoint_class="{_label(endpoint_class)}"}} {counts["waiting"]}')
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,126 @@
+"""
+Per-user response cache for read-heavy endpoints (summary, analytics).
+
+Entries are keyed on (user, endpoint, normalized query params, user data
+version, day), so any transaction/budget/category write bumps the version
+and makes the old entries unreachable; they then age out via the TTL or
+the backend's MAX_ENTRIES culling. Works with any Django cache backend.
+"""
+import hashlib
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from rest_framework.response import Response
+
+_lock = threading.Lock()
+_counters = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+
+def _record(endpoint, outcome):
+    with _lock:
+        _counters[endpoint][outcome] += 1
+
+
+def cache_stats():
+    """
+    Hit/miss counters for this process, per endpoint and overall.
+    """
+    with _lock:
+        endpoints = {name: dict(counts) for name, counts in _counters.items()}
+    hits = sum(counts['hits'] for counts in endpoints.values())
+    misses = sum(counts['misses'] for counts in endpoints.values())
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0,
+        'endpoints': endpoints,
+    }
+
+
+def reset_cache_stats():
+    with _lock:
+        _counters.clear()
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE['ALIAS']]
+
+
+def query_digest(query_params):
+    """
+    Hash of the query params, sorted so ?a=1&b=2 and ?b=2&a=1 match.
+    """
+    params = sorted(
+        (name, value)
+        for name in query_params
+        for value in query_params.getlist(name)
+    )
+    return hashlib.sha1(repr(params).encode()).hexdigest()
+
+
+def response_cache_key(user, endpoint, query_params):
+    """
+    Build the cache key for one user's view of one endpoint.
+    """
+    digest = query_digest(query_params)
+    # The same day as the ETag's (conditional.py): TIME_ZONE's, not the OS's
+    return f'resp:{user.pk}:{user.data_version}:{timezone.localdate().isoformat()}:{endpoint}:{digest}'
+
+
+def cached_response(endpoint):
+    """
+    Decorator for a view/action handler returning a Response. Successful
+    responses are cached per user until the user's data version changes
+    or RESPONSE_CACHE['TIMEOUT'] seconds pass. Async handlers use the
+    cache's async API.
+    """
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+            @wraps(view_method)
+            async def async_wrapper(view, request, *args, **kwargs):
+                config = settings.RESPONSE_CACHE
+                if not config['ENABLED'] or not request.user.is_authenticated:
+                    return await view_method(view, request, *args, **kwargs)
+
+                cache = get_response_cache()
+                key = response_cache_key(request.user, endpoint, request.query_params)
+                data = await cache.aget(key)
+                if data is not None:
+                    _record(endpoint, 'hits')
+                    return Response(data, headers={'X-Cache': 'HIT'})
+
+                _record(endpoint, 'misses')
+                response = await view_method(view, request, *args, **kwargs)
+                if response.status_code == 200 and not response.has_header('X-Load-Shed'):
+                    await cache.aset(key, response.data, config['TIMEOUT'])
+                response['X-Cache'] = 'MISS'
+                return response
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(view, request, *args, **kwargs):
+            config = settings.RESPONSE_CACHE
+            if not config['ENABLED'] or not request.user.is_authenticated:
+                return view_method(view, request, *args, **kwargs)
+
+            cache = get_response_cache()
+            key = response_cache_key(request.user, endpoint, request.query_params)
+            data = cache.get(key)
+            if data is not None:
+                _record(endpoint, 'hits')
+                return Response(data, headers={'X-Cache': 'HIT'})
+
+            _record(endpoint, 'misses')
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code == 200 and not response.has_header('X-Load-Shed'):
+                # Shed responses (finance_tracker/admission.py) aren't current
+                cache.set(key, response.data, config['TIMEOUT'])
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 from decouple import config
 import os
 import dj_database_url
@@ -30,6 +31,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',  # Refresh tokens revoked at logout
     'corsheaders',
     
     # Local apps
@@ -42,6 +44,7 @@ INSTALLED_APPS = [
 # ==================== MIDDLEWARE ====================
 
 MIDDLEWARE = [
+    'finance_tracker.metrics.MetricsMiddleware',  # First, so it times everything below
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -107,9 +110,155 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Seconds a writer waits for the database lock
+                'timeout': 20,
+            },
         }
     }
 
+# Optional read-only replica. Analytics, the dashboard, the transaction
+# summary/trends and exports read from it (see finance_tracker/db_router.py),
+# except for users who wrote within the last STICKY_SECONDS, so they see
+# their own writes.
+# Locally two SQLite files will do: set
+# DATABASE_REPLICA_URL=sqlite:////path/to/replica.sqlite3 and copy the
+# primary over with `python manage.py sync_replica`.
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = {
+        **dj_database_url.parse(DATABASE_REPLICA_URL, conn_max_age=600, conn_health_checks=True),
+        # Tests read the test primary through this alias
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['finance_tracker.db_router.ReplicaRouter']
+
+REPLICA = {
+    'ALIAS': 'replica',
+    'STICKY_SECONDS': config('REPLICA_STICKY_SECONDS', default=10, cast=int),
+}
+
+# ==================== CACHING ====================
+
+# 'responses' holds per-user cached API responses (see finance_tracker/response_cache.py).
+# Locally it is in-memory; point RESPONSE_CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache (with a directory as
+# RESPONSE_CACHE_LOCATION) to share it between processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': config('RESPONSE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('RESPONSE_CACHE_LOCATION', default='finance-responses'),
+        'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
+        'OPTIONS': {
+            # Oldest entries are culled once this many are stored
+            'MAX_ENTRIES': config('RESPONSE_CACHE_MAX_ENTRIES', default=5000, cast=int),
+        },
+    },
+    'auth': {
+        'BACKEND': config('AUTH_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('AUTH_CACHE_LOCATION', default='finance-auth'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('AUTH_CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    },
+    # Last good responses served when admission control sheds a request;
+    # separate from 'responses' so they neither evict fresh entries nor
+    # depend on RESPONSE_CACHE being enabled
+    'stale': {
+        'BACKEND': config('ADMISSION_STALE_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('ADMISSION_STALE_CACHE_LOCATION', default='finance-stale'),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('ADMISSION_STALE_CACHE_MAX_ENTRIES', default=1000, cast=int),
+        },
+    },
+}
+
+RESPONSE_CACHE = {
+    'ENABLED': config('RESPONSE_CACHE_ENABLED', default=True, cast=bool),
+    'ALIAS': 'responses',
+    'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
+}
+
+# Authenticated users are cached so requests load only the columns that
+# must be current (data version, is_active, token revocation) instead of
+# the whole row. Those are read from the database every time, so the
+# in-memory default is safe with several workers; a shared
+# AUTH_CACHE_BACKEND only makes other processes see profile changes
+# before USER_TIMEOUT runs out.
+AUTH_CACHE = {
+    'ENABLED': config('AUTH_CACHE_ENABLED', default=True, cast=bool),
+    'ALIAS': 'auth',
+    'USER_TIMEOUT': config('AUTH_USER_CACHE_TIMEOUT', default=30, cast=int),
+}
+
+# ==================== ASYNC VIEWS ====================
+
+# With ENABLED on, the analytics and summary URLs are served by async views
+# that run their independent queries concurrently (up to QUERY_WORKERS
+# threads per process). Meant for ASGI deployments, e.g.
+#   gunicorn finance_tracker.asgi:application -k uvicorn.workers.UvicornWorker
+ASYNC_VIEWS = {
+    'ENABLED': config('ASYNC_VIEWS_ENABLED', default=False, cast=bool),
+    'QUERY_WORKERS': config('ASYNC_QUERY_WORKERS', default=8, cast=int),
+}
+
+# ==================== ADMISSION CONTROL ====================
+
+# Per-process bulkheads for the expensive read endpoints (see
+# finance_tracker/admission.py). Each class runs at most CONCURRENCY
+# requests at once; QUEUE more may wait up to QUEUE_TIMEOUT seconds, and
+# the rest are shed: served the last good response (kept STALE_TIMEOUT
+# seconds in the STALE_ALIAS cache; 0 keeps none) or answered with STATUS
+# and Retry-After: RETRY_AFTER. Size CONCURRENCY below the worker/thread
+# count so CRUD always finds a worker. Limits are per process, so they need
+# threaded (gthread) or ASGI workers: a single-threaded sync worker never
+# has more than one request in flight.
+ADMISSION = {
+    'ENABLED': config('ADMISSION_ENABLED', default=True, cast=bool),
+    'STATUS': config('ADMISSION_SHED_STATUS', default=503, cast=int),
+    'STALE_TIMEOUT': config('ADMISSION_STALE_TIMEOUT', default=3600, cast=int),
+    'STALE_ALIAS': 'stale',
+    'CLASSES': {
+        # Insights, prediction and comparison
+        'analytics': {
+            'CONCURRENCY': config('ADMISSION_ANALYTICS_CONCURRENCY', default=4, cast=int),
+            'QUEUE': config('ADMISSION_ANALYTICS_QUEUE', default=8, cast=int),
+            'QUEUE_TIMEOUT': config('ADMISSION_ANALYTICS_QUEUE_TIMEOUT', default=2.0, cast=float),
+            'RETRY_AFTER': 5,
+        },
+        # Transaction summary and trends, the dashboard
+        'reports': {
+            'CONCURRENCY': config('ADMISSION_REPORTS_CONCURRENCY', default=8, cast=int),
+            'QUEUE': config('ADMISSION_REPORTS_QUEUE', default=16, cast=int),
+            'QUEUE_TIMEOUT': config('ADMISSION_REPORTS_QUEUE_TIMEOUT', default=2.0, cast=float),
+            'RETRY_AFTER': 2,
+        },
+    },
+}
+
+# ==================== CATEGORY REGISTRY ====================
+
+# Process-local category cache used to fill category fields in serializers
+# (see transactions/categories.py). Per-user entries are checked against
+# the user's data version; defaults are re-read after DEFAULTS_TIMEOUT
+# seconds so changes made in other processes show up.
+CATEGORY_REGISTRY = {
+    'MAX_USERS': config('CATEGORY_REGISTRY_MAX_USERS', default=1000, cast=int),
+    'DEFAULTS_TIMEOUT': config('CATEGORY_REGISTRY_DEFAULTS_TIMEOUT', default=300, cast=int),
+}
+
+# ==================== METRICS ====================
+
+# Per-endpoint latency/query metrics, scraped from /api/metrics/ (see
+# finance_tracker/metrics.py). Disabling removes the middleware entirely.
+METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+}
+
 # ==================== PASSWORD VALIDATION ====================
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -131,11 +280,17 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # simplejwt's JWTAuthentication, with the user cached (see users/authentication.py)
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson-backed JSON (stdlib fallback); output matches the stock renderer
+    'DEFAULT_RENDERER_CLASSES': (
+        'finance_tracker.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,
 }
@@ -155,6 +310,9 @@ CORS_ALLOWED_ORIGINS = [
     "https://ai-finance-tracker-frontend.onrender.com",  # Add your actual frontend URL
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Let the frontend make conditional GETs (see finance_tracker/conditional.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match', 'if-modified-since')
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
 
 # ==================== INTERNATIONALIZATION ====================
 
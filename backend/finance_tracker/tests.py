@@ -0,0 +1,270 @@
+"""
+Project-level tests.
+"""
+import asyncio
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from transactions.models import Transaction
+from users.models import CustomUser
+from .admission import (
+    SHED_HEADER, Bulkhead, acquire_async, admission_stats, get_stale_cache, reset_admission_stats, stale_key,
+)
+from .metrics import registry, render_prometheus
+from .response_cache import get_response_cache
+
+
+def reports_limits(**limits):
+    classes = dict(settings.ADMISSION['CLASSES'], reports=dict(settings.ADMISSION['CLASSES']['reports'], **limits))
+    return dict(settings.ADMISSION, CLASSES=classes)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out waiting')
+        time.sleep(0.005)
+
+
+class BulkheadTests(SimpleTestCase):
+    def test_full_bulkhead_queues_then_sheds(self):
+        bulkhead = Bulkhead(concurrency=1, queue=1, queue_timeout=0.05)
+        self.assertTrue(bulkhead.acquire())
+        self.assertFalse(bulkhead.acquire(blocking=False))
+        # Queues, times out
+        self.assertFalse(bulkhead.acquire())
+        self.assertEqual(bulkhead.waiting, 0)
+
+        bulkhead.queue_timeout = 5
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(bulkhead.acquire()))
+        waiter.start()
+        wait_for(lambda: bulkhead.waiting == 1)
+        # The queue is full: shed without waiting
+        started = time.monotonic()
+        self.assertFalse(bulkhead.acquire())
+        self.assertLess(time.monotonic() - started, 1)
+
+        bulkhead.release()
+        waiter.join()
+        self.assertEqual(admitted, [True])
+        self.assertEqual((bulkhead.active, bulkhead.waiting), (1, 0))
+
+    def test_cancelled_async_wait_gives_the_slot_back(self):
+        bulkhead = Bulkhead(concurrency=1, queue=1, queue_timeout=5)
+        self.assertTrue(bulkhead.acquire())
+
+        async def cancel_while_queued():
+            task = asyncio.ensure_future(acquire_async(bulkhead))
+            while bulkhead.waiting == 0:
+                await asyncio.sleep(0.005)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # The pool thread now gets the slot nobody will use
+            bulkhead.release()
+            for _ in range(400):
+                if bulkhead.active == 0 and bulkhead.waiting == 0:
+                    return
+                await asyncio.sleep(0.005)
+
+        asyncio.run(cancel_while_queued())
+        self.assertEqual((bulkhead.active, bulkhead.waiting), (0, 0))
+        self.assertTrue(bulkhead.acquire(blocking=False))
+
+
+# Replica reads go to the test primary (see transactions/tests.py)
+@override_settings(
+    REPLICA=dict(settings.REPLICA, ALIAS='default'),
+    RESPONSE_CACHE=dict(settings.RESPONSE_CACHE, ENABLED=False),
+)
+class StaleResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='stale@example.com', username='stale', password='stale-password'
+        )
+
+    def setUp(self):
+        get_stale_cache().clear()
+        get_response_cache().clear()
+        reset_admission_stats()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_shed_request_gets_the_stale_copy(self):
+        fresh = self.client.get('/api/dashboard/')
+        self.assertEqual(fresh.status_code, 200)
+        key = stale_key(self.user, 'dashboard', fresh.wsgi_request.GET)
+        self.assertIsNotNone(get_stale_cache().get(key))
+        self.assertIsNone(get_response_cache().get(key))
+
+        with override_settings(ADMISSION=reports_limits(CONCURRENCY=0, QUEUE=0)):
+            shed = self.client.get('/api/dashboard/')
+            self.assertEqual(shed[SHED_HEADER], 'stale')
+            self.assertEqual(shed.json(), fresh.json())
+
+            self.assertNotIn('ETag', shed)
+
+            rejected = self.client.get('/api/dashboard/?sections=summary')
+            self.assertEqual(rejected.status_code, settings.ADMISSION['STATUS'])
+            self.assertEqual(rejected[SHED_HEADER], 'rejected')
+            self.assertEqual(rejected['Retry-After'], str(settings.ADMISSION['CLASSES']['reports']['RETRY_AFTER']))
+
+            stats = admission_stats()['reports']
+            self.assertEqual((stats['stale'], stats['rejected'], stats['active'], stats['waiting']), (1, 1, 0, 0))
+            metrics = render_prometheus()
+            self.assertIn('finance_admission_shed_total{endpoint_class="reports",outcome="stale"} 1', metrics)
+            self.assertIn('finance_admission_shed_total{endpoint_class="reports",outcome="rejected"} 1', metrics)
+            self.assertIn('finance_admission_active{endpoint_class="reports"} 0', metrics)
+
+    def test_no_stale_copies_without_a_timeout(self):
+        with override_settings(ADMISSION=dict(settings.ADMISSION, STALE_TIMEOUT=0)):
+            self.assertEqual(self.client.get('/api/dashboard/').status_code, 200)
+        self.assertIsNone(get_stale_cache().get(stale_key(self.user, 'dashboard', {})))
+
+
+@override_settings(
+    REPLICA=dict(settings.REPLICA, ALIAS='default'),
+    RESPONSE_CACHE=dict(settings.RESPONSE_CACHE, ENABLED=False),
+)
+class ConditionalResponseTests(TestCase):
+    url = '/api/transactions/transactions/summary/?start_date=2026-01-01&end_date=2026-01-31'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='conditional@example.com', username='conditional', password='conditional-password'
+        )
+
+    def setUp(self):
+        # A real token, so every request sees the user's current data version
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_matching_etag_gets_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+        revalidated = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        self.assertIn('Authorization', revalidated['Vary'])
+
+        # Another query string is another representation
+        other = self.client.get(self.url + '&type=expense', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(other.status_code, 200)
+
+    def test_write_changes_the_etag(self):
+        before = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, amount=12, type='expense', date=date(2026, 1, 3))
+
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertEqual(after.json()['total_expenses'], 12)
+
+    def test_errors_carry_no_validators(self):
+        response = self.client.get('/api/transactions/transactions/summary/?start_date=nope&end_date=2026-01-31')
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotIn('private', response.get('Cache-Control', ''))
+
+
+@override_settings(REPLICA=dict(settings.REPLICA, ALIAS='default'))
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='metrics@example.com', username='metrics', password='metrics-password'
+        )
+        cls.staff = CustomUser.objects.create_user(
+            email='metrics-staff@example.com', username='metrics-staff', password='staff-password', is_staff=True
+        )
+        for day in (3, 4):
+            Transaction.objects.create(user=cls.user, amount=day, type='expense', date=date(2026, 1, day))
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_scrape_is_staff_only(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.assertEqual(APIClient().get('/api/metrics/').status_code, 401)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('# TYPE finance_requests_total counter', response.content.decode())
+
+    def test_records_status_queries_and_size(self):
+        # Counted independently of the middleware (the request resets
+        # connection.queries, so CaptureQueriesContext can't be used)
+        executed = []
+        with connection.execute_wrapper(lambda execute, sql, *args: executed.append(sql) or execute(sql, *args)):
+            response = self.client.get('/api/transactions/categories/')
+        self.assertEqual(response.status_code, 200)
+        self.client.get('/api/transactions/transactions/summary/?start_date=nope&end_date=2026-01-31')
+
+        views = registry.snapshot()
+        stats = views['category-list']
+        self.assertEqual((stats.requests, dict(stats.statuses)), (1, {200: 1}))
+        self.assertEqual(stats.queries, len(executed))
+        self.assertGreater(stats.query_seconds, 0)
+        self.assertEqual(stats.response_bytes, len(response.content))
+        self.assertEqual(dict(views['transaction-summary'].statuses), {400: 1})
+
+        metrics = render_prometheus()
+        self.assertIn('finance_requests_total{view="category-list",status="200"} 1', metrics)
+        self.assertIn('finance_requests_total{view="transaction-summary",status="400"} 1', metrics)
+        self.assertIn(f'finance_request_queries_sum{{view="category-list"}} {len(executed)}', metrics)
+        self.assertIn('finance_request_queries_count{view="category-list"} 1', metrics)
+        self.assertIn('finance_request_duration_seconds_bucket{view="category-list",le="+Inf"} 1', metrics)
+        self.assertIn(f'finance_response_bytes_total{{view="category-list"}} {len(response.content)}', metrics)
+
+    def test_streamed_response_is_recorded_when_consumed(self):
+        response = self.client.get('/api/transactions/transactions/export/?file_format=csv')
+        self.assertTrue(response.streaming)
+        self.assertNotIn('transaction-export', registry.snapshot())
+
+        body = b''.join(response.streaming_content)
+        stats = registry.snapshot()['transaction-export']
+        self.assertEqual((stats.requests, stats.response_bytes), (1, len(body)))
+        # The export's own queries run while streaming, and still count
+        self.assertGreaterEqual(stats.queries, 1)
+
+    def test_scrape_merges_every_thread(self):
+        def record(status):
+            registry.record('demo', status, seconds=0.02, queries=3, query_seconds=0.01, response_bytes=10)
+
+        threads = [threading.Thread(target=record, args=(status,)) for status in (200, 200, 500)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = registry.snapshot()['demo']
+        self.assertEqual((stats.requests, dict(stats.statuses)), (3, {200: 2, 500: 1}))
+        self.assertEqual((stats.queries, stats.response_bytes), (9, 30))
+        metrics = render_prometheus()
+        self.assertIn('finance_request_duration_seconds_bucket{view="demo",le="0.01"} 0', metrics)
+        self.assertIn('finance_request_duration_seconds_bucket{view="demo",le="0.025"} 3', metrics)
+        self.assertIn('finance_request_queries_bucket{view="demo",le="2"} 0', metrics)
+        self.assertIn('finance_request_queries_bucket{view="demo",le="5"} 3', metrics)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView
+from .views import DashboardView, MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -13,4 +14,8 @@ urlpatterns = [
     path('api/transactions/', include('transactions.urls')),
     path('api/budgets/', include('budgets.urls')),
     path('api/analytics/', include('analytics.urls')),
+    path('api/dashboard/', DashboardView.as_view(), name='dashboard'),
+    
+    # Prometheus metrics (staff only)
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,56 @@
+from datetime import datetime
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from .dashboard import Dashboard, SECTIONS, RECENT_LIMIT, MAX_RECENT_LIMIT
+from .metrics import render_prometheus
+from .admission import admission_controlled
+from .conditional import conditional_response
+from .db_router import replica_reads
+from .response_cache import cached_response
+
+class DashboardView(APIView):
+    """
+    Summary, trends, recent transactions, categories and budget overview in
+    one response. ?sections= picks a subset (comma separated) and
+    ?recent_limit= sets how many recent transactions to include.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @conditional_response('dashboard')
+    @cached_response('dashboard')
+    @admission_controlled('reports', 'dashboard')
+    @replica_reads
+    def get(self, request):
+        requested = request.query_params.get('sections')
+        sections = [s.strip() for s in requested.split(',') if s.strip()] if requested else list(SECTIONS)
+        unknown = [s for s in sections if s not in SECTIONS]
+        if unknown:
+            return Response(
+                {'error': f'Unknown sections: {", ".join(unknown)}. Use any of: {", ".join(SECTIONS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            recent_limit = int(request.query_params.get('recent_limit', RECENT_LIMIT))
+        except ValueError:
+            return Response({'error': 'recent_limit must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+        recent_limit = min(max(recent_limit, 0), MAX_RECENT_LIMIT)
+        
+        dashboard = Dashboard(
+            request.user, datetime.now().date(),
+            context={'request': request}, recent_limit=recent_limit
+        )
+        return Response(dashboard.build(sections))
+
+
+class MetricsView(APIView):
+    """
+    Request metrics for this process in Prometheus text format (staff only).
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Transaction, RecurringTransaction
+from .models import Category, Transaction, RecurringTransaction, MonthlyRollup
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -21,4 +21,10 @@ class RecurringTransactionAdmin(admin.ModelAdmin):
     list_display = ['user', 'amount', 'type', 'frequency', 'next_date', 'is_active']
     list_filter = ['frequency', 'is_active', 'type']
     search_fields = ['description', 'user__email']
-    ordering = ['next_date']
\ No newline at end of file
+    ordering = ['next_date']
+@admin.register(MonthlyRollup)
+class MonthlyRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'month', 'type', 'category', 'total', 'count']
+    list_filter = ['type', 'month']
+    search_fields = ['user__email']
+    ordering = ['-month']
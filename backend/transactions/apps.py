@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transactions'
+
+    def ready(self):
+        # Keep the monthly rollups in step with transaction writes
+        from . import signals  # noqa: F401
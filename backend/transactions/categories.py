@@ -0,0 +1,126 @@
+"""
+Process-local category registry.
+
+Categories change rarely but are read on nearly every request: the
+category list, and the name/icon/color shown next to every transaction
+and budget. The registry keeps the default categories process-wide and
+each user's own categories in an LRU-bounded map, so serializers can fill
+those fields from memory instead of joining or querying per row.
+
+Invalidation:
+- Category save/delete drops the affected entry in this process (signals).
+- Those writes also bump the owner's category_version (every user's, for
+  a default category), and a per-user entry is only used while the
+  user's category_version still matches, so other processes notice the
+  change as well. Transaction and budget writes leave it alone, so an
+  active user's entry survives them.
+- Defaults are re-read after CATEGORY_REGISTRY['DEFAULTS_TIMEOUT'] seconds.
+
+Cached instances are shared between requests and must not be modified.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import Category
+
+
+def _sort_key(category):
+    return (category.type, category.name)
+
+
+class CategoryRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._defaults = None
+        self._defaults_loaded_at = 0.0
+        self._generation = 0
+        # user_id -> (category_version, defaults generation, {category_id: Category})
+        self._users = OrderedDict()
+
+    def defaults(self):
+        """
+        {category_id: Category} for the default categories.
+        """
+        return self._current_defaults()[1]
+
+    def _current_defaults(self):
+        """
+        (generation, defaults); the generation changes whenever the
+        defaults are reloaded or invalidated.
+        """
+        config = settings.CATEGORY_REGISTRY
+        with self._lock:
+            if self._defaults is not None and time.monotonic() - self._defaults_loaded_at < config['DEFAULTS_TIMEOUT']:
+                return self._generation, self._defaults
+        defaults = {
+            category.pk: category
+            for category in Category.objects.filter(user__isnull=True, is_default=True)
+        }
+        with self._lock:
+            self._generation += 1
+            self._defaults = defaults
+            self._defaults_loaded_at = time.monotonic()
+            return self._generation, defaults
+
+    def for_user(self, user):
+        """
+        {category_id: Category} for every category `user` can use: their
+        own plus the defaults. Costs at most two small queries on a miss.
+        """
+        generation, defaults = self._current_defaults()
+        with self._lock:
+            entry = self._users.get(user.pk)
+            if entry is not None and entry[:2] == (user.category_version, generation):
+                self._users.move_to_end(user.pk)
+                return entry[2]
+
+        categories = dict(defaults)
+        categories.update(
+            (category.pk, category) for category in Category.objects.filter(user=user)
+        )
+        with self._lock:
+            self._users[user.pk] = (user.category_version, generation, categories)
+            self._users.move_to_end(user.pk)
+            while len(self._users) > settings.CATEGORY_REGISTRY['MAX_USERS']:
+                self._users.popitem(last=False)
+        return categories
+
+    def sorted_for_user(self, user, type=None):
+        """
+        The user's categories ordered by type and name, like the category
+        endpoints, optionally narrowed to one type.
+        """
+        categories = self.for_user(user).values()
+        if type is not None:
+            categories = [category for category in categories if category.type == type]
+        return sorted(categories, key=_sort_key)
+
+    def get(self, user, category_id):
+        """
+        One of the user's categories, or None if it isn't one of theirs.
+        """
+        return self.for_user(user).get(category_id)
+
+    def invalidate(self, user_id=None):
+        """
+        Forget one user's categories, or the defaults (and with them every
+        user's merged map) when user_id is None.
+        """
+        with self._lock:
+            if user_id is None:
+                self._defaults = None
+                self._generation += 1
+            else:
+                self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._defaults = None
+            self._generation += 1
+            self._users.clear()
+
+
+registry = CategoryRegistry()
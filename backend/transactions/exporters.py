@@ -0,0 +1,147 @@
+"""
+Streaming export of a user's account (CSV, NDJSON or ZIP of CSVs).
+
+Rows are pulled with values_list(...).iterator(chunk_size=...) and encoded
+as they are sent, so memory stays flat however large the account is.
+"""
+import csv
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+
+from budgets.models import Budget
+from finance_tracker.renderers import json_dumps
+from .models import Category, RecurringTransaction
+
+CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'ndjson', 'zip')
+
+# section name -> (record label, exported columns)
+SECTIONS = {
+    'transactions': ('transaction', (
+        'id', 'date', 'type', 'amount', 'category__name', 'description',
+        'is_recurring', 'created_at', 'updated_at',
+    )),
+    'recurring': ('recurring_transaction', (
+        'id', 'type', 'amount', 'category__name', 'description', 'frequency',
+        'next_date', 'is_active', 'created_at',
+    )),
+    'budgets': ('budget', (
+        'id', 'category__name', 'amount', 'period', 'start_date', 'end_date',
+        'is_active', 'alert_threshold', 'created_at', 'updated_at',
+    )),
+    'categories': ('category', (
+        'id', 'name', 'type', 'icon', 'color', 'is_default', 'created_at',
+    )),
+}
+
+
+def column_name(field):
+    return 'category' if field == 'category__name' else field
+
+
+def section_querysets(user, transactions, filters):
+    """
+    Build the querysets for every section. `transactions` is already
+    filtered by TransactionViewSet.get_queryset; the same type/category/date
+    filters are applied to the other sections where they make sense.
+    """
+    recurring = RecurringTransaction.objects.filter(user=user)
+    budgets = Budget.objects.filter(user=user)
+    if filters.get('type'):
+        recurring = recurring.filter(type=filters['type'])
+    if filters.get('category'):
+        recurring = recurring.filter(category_id=filters['category'])
+        budgets = budgets.filter(category_id=filters['category'])
+    if filters.get('start_date') and filters.get('end_date'):
+        budgets = budgets.filter(start_date__lte=filters['end_date'], end_date__gte=filters['start_date'])
+
+    return {
+        'transactions': transactions.order_by('-date', '-created_at', '-id'),
+        'recurring': recurring.order_by('next_date', 'id'),
+        'budgets': budgets.order_by('-start_date', 'id'),
+        'categories': Category.objects.for_user(user).order_by('type', 'name'),
+    }
+
+
+def iter_rows(queryset, fields):
+    return queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+class _Echo:
+    """
+    Minimal file-like object whose write() hands the data straight back,
+    letting csv.writer produce encoded lines for a generator.
+    """
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([column_name(field) for field in fields])
+    for row in iter_rows(queryset, fields):
+        yield writer.writerow(row)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def stream_ndjson(querysets, sections):
+    for section in sections:
+        record, fields = SECTIONS[section]
+        columns = [column_name(field) for field in fields]
+        for row in iter_rows(querysets[section], fields):
+            data = dict(zip(columns, row))
+            data['record'] = record
+            yield json_dumps(data, default=_json_default) + b'\n'
+
+
+class _ZipSink:
+    """
+    Write-only, non-seekable sink for zipfile; drained between chunks so
+    the archive is streamed rather than assembled in memory.
+    """
+    def __init__(self):
+        self.parts = []
+        self.offset = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def stream_zip(querysets, sections):
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for section in sections:
+            record, fields = SECTIONS[section]
+            with archive.open(f'{section}.csv', mode='w', force_zip64=True) as member:
+                buffered = []
+                for line in stream_csv(querysets[section], fields):
+                    buffered.append(line)
+                    if len(buffered) >= CHUNK_SIZE:
+                        member.write(''.join(buffered).encode())
+                        buffered = []
+                        yield sink.drain()
+                if buffered:
+                    member.write(''.join(buffered).encode())
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,243 @@
+"""
+Streaming import of bank statements (CSV, OFX, QIF) into transactions.
+
+Files are read line by line and parsed into plain row dicts, validated
+without going through the serializer machinery, and written with
+bulk_create in chunks, each in its own database transaction. Memory use
+is bounded by the chunk size, not by the size of the file.
+"""
+import csv
+import io
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from .models import Category, Transaction
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+SUPPORTED_FORMATS = ('csv', 'ofx', 'qif')
+
+CSV_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%Y/%m/%d', '%d.%m.%Y')
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def detect_format(filename, requested=None):
+    """
+    Pick the parser from an explicit ?file_format= or the file extension.
+    """
+    fmt = (requested or filename.rsplit('.', 1)[-1]).lower()
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f'Unsupported format "{fmt}". Use one of: {", ".join(SUPPORTED_FORMATS)}.')
+    return fmt
+
+
+# ==================== PARSERS ====================
+# Each parser yields (line_number, row) where row holds raw 'date',
+# 'amount' and optional 'type', 'category', 'description' strings.
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None:
+        return
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key}
+
+
+OFX_TAG = re.compile(r'<(/?)([A-Z.]+)>([^<\r\n]*)', re.IGNORECASE)
+
+
+def parse_ofx(lines):
+    """
+    Tolerates both SGML (OFX 1.x, unclosed tags) and XML (OFX 2.x) files.
+    """
+    current = None
+    start_line = 0
+    for line_number, line in enumerate(lines, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    yield start_line, current
+                    current = None
+                elif not closing:
+                    current, start_line = {}, line_number
+            elif current is not None and not closing:
+                value = value.strip()
+                if tag == 'DTPOSTED':
+                    current['date'] = value[:8]
+                elif tag == 'TRNAMT':
+                    current['amount'] = value
+                elif tag in ('NAME', 'MEMO') and value:
+                    current['description'] = ' - '.join(filter(None, [current.get('description'), value]))
+
+
+def parse_qif(lines):
+    current = {}
+    start_line = None
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('!'):
+            continue
+        if start_line is None:
+            start_line = line_number
+        code, value = line[0], line[1:].strip()
+        if code == '^':
+            if current:
+                yield start_line, current
+            current, start_line = {}, None
+        elif code == 'D':
+            current['date'] = value
+        elif code in ('T', 'U'):
+            current['amount'] = value
+        elif code == 'P':
+            current['description'] = value
+        elif code == 'M' and value:
+            current['description'] = ' - '.join(filter(None, [current.get('description'), value]))
+        elif code == 'L':
+            # "[Account]" entries are transfers, not categories
+            if not value.startswith('['):
+                current['category'] = value.split(':')[0]
+    if current:
+        yield start_line, current
+
+
+PARSERS = {'csv': parse_csv, 'ofx': parse_ofx, 'qif': parse_qif}
+
+
+# ==================== VALIDATION ====================
+
+def parse_import_date(value, fmt, date_format=None):
+    value = (value or '').strip()
+    if not value:
+        raise ImportRowError('Missing date.')
+
+    if fmt == 'ofx':
+        formats = ('%Y%m%d',)
+    elif fmt == 'qif':
+        # QIF writes 1/31'24 or 1/31/2024 (US month-first)
+        value = value.replace("'", '/').replace(' ', '')
+        formats = ('%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d')
+    else:
+        formats = (date_format,) if date_format else CSV_DATE_FORMATS
+
+    for candidate in formats:
+        try:
+            return datetime.strptime(value, candidate).date()
+        except ValueError:
+            continue
+    raise ImportRowError(f'Unrecognised date "{value}".')
+
+
+def parse_import_amount(value):
+    cleaned = (value or '').replace(',', '').replace('$', '').strip()
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ImportRowError(f'Invalid amount "{value}".')
+    if not amount.is_finite():
+        raise ImportRowError(f'Invalid amount "{value}".')
+    if amount == 0:
+        raise ImportRowError('Amount must not be zero.')
+    if abs(amount) >= Decimal('100000000'):
+        raise ImportRowError('Amount is too large.')
+    return amount
+
+
+class CategoryResolver:
+    """
+    Maps category names to the user's categories (custom first, then
+    defaults) using one query for the whole import.
+    """
+    def __init__(self, user):
+        self.by_name_and_type = {}
+        self.by_name = {}
+        categories = Category.objects.for_user(user).order_by('is_default', 'id')
+        for category in categories:
+            name = category.name.strip().lower()
+            self.by_name_and_type.setdefault((name, category.type), category)
+            self.by_name.setdefault(name, category)
+
+    def resolve(self, name, type):
+        """
+        The category called `name` of the given type; raises ImportRowError
+        when there is none (a name of the other type doesn't match).
+        """
+        key = (name or '').strip().lower()
+        if not key:
+            return None
+        category = self.by_name_and_type.get((key, type))
+        if category is None:
+            other = self.by_name.get(key)
+            if other is not None:
+                raise ImportRowError(f'Category "{name}" is an {other.type} category, but the row is an {type}.')
+            raise ImportRowError(f'Unknown category "{name}".')
+        return category
+
+
+def build_transaction(user, row, fmt, resolver, date_format=None):
+    """
+    Turn a parsed row into an unsaved Transaction, raising ImportRowError
+    with a readable message when the row is invalid.
+    """
+    txn_date = parse_import_date(row.get('date'), fmt, date_format)
+    amount = parse_import_amount(row.get('amount'))
+
+    txn_type = (row.get('type') or '').strip().lower()
+    if txn_type and txn_type not in dict(Transaction.TRANSACTION_TYPES):
+        raise ImportRowError(f'Invalid type "{row.get("type")}". Use "expense" or "income".')
+    if not txn_type:
+        # Statements sign debits negative
+        txn_type = 'expense' if amount < 0 else 'income'
+
+    category = resolver.resolve(row.get('category'), txn_type)
+
+    return Transaction(
+        user=user,
+        amount=abs(amount).quantize(Decimal('0.01')),
+        type=txn_type,
+        category=category,
+        date=txn_date,
+        description=(row.get('description') or '')[:10000],
+    )
+
+
+# ==================== IMPORT ====================
+
+def import_transactions(user, uploaded_file, fmt, date_format=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream `uploaded_file` into the user's transactions.
+    Returns a report with imported/failed counts and per-row errors.
+    """
+    resolver = CategoryResolver(user)
+    lines = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', errors='replace', newline='')
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        with db_transaction.atomic():
+            Transaction.objects.bulk_create(batch, batch_size=chunk_size)
+        report['imported'] += len(batch)
+        batch.clear()
+
+    for line_number, row in PARSERS[fmt](lines):
+        try:
+            batch.append(build_transaction(user, row, fmt, resolver, date_format))
+        except ImportRowError as exc:
+            report['failed'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append({'line': line_number, 'error': str(exc)})
+            continue
+
+        if len(batch) >= chunk_size:
+            flush()
+
+    if batch:
+        flush()
+    return report
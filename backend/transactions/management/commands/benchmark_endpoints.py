@@ -0,0 +1,200 @@
+import json
+import statistics
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from finance_tracker.db_router import read_replica, replica_alias
+from transactions import synthetic
+from transactions.models import Transaction
+
+# (benchmark name, URL name, query params)
+ENDPOINTS = [
+    ('transactions.list', 'transaction-list', {}),
+    ('transactions.list_filtered', 'transaction-list', {'type': 'expense'}),
+    ('transactions.list_cursor', 'transaction-list', {'pagination': 'cursor'}),
+    ('transactions.detail', 'transaction-detail', {}),
+    ('transactions.summary', 'transaction-summary', {}),
+    ('transactions.trends', 'transaction-trends', {}),
+    ('transactions.recent', 'transaction-recent', {}),
+    ('transactions.export_csv', 'transaction-export', {'file_format': 'csv'}),
+    ('categories.list', 'category-list', {}),
+    ('categories.expense', 'category-expense-categories', {}),
+    ('recurring.list', 'recurring-transaction-list', {}),
+    ('budgets.list', 'budget-list', {}),
+    ('budgets.overview', 'budget-overview', {}),
+    ('analytics.insights', 'analytics-insights', {}),
+    ('analytics.prediction', 'spending-prediction', {}),
+    ('analytics.comparison', 'spending-comparison', {}),
+    ('dashboard', 'dashboard', {}),
+]
+
+
+class Command(BaseCommand):
+    help = 'Time every transactions/budgets/analytics endpoint at several data sizes and write JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=str, default='1000,10000,100000',
+            help='Comma-separated transaction counts for the benchmark user'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per endpoint')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated data')
+        parser.add_argument('--only', type=str, help='Only endpoints whose name starts with this')
+        parser.add_argument('--output', type=str, help='Write results to this JSON file')
+        parser.add_argument('--baseline', type=str, help='Compare against a previous results file')
+        parser.add_argument(
+            '--threshold', type=float, default=20.0,
+            help='Percent slowdown (median) reported as a regression (default 20)'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error when the baseline comparison finds a regression'
+        )
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Leave the response cache on (by default every request is computed)'
+        )
+        parser.add_argument(
+            '--replica', action='store_true',
+            help='Send every read to the replica (run once with --keep and sync the replica first)'
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark users afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers')
+        if options['replica'] and replica_alias() is None:
+            raise CommandError('--replica needs DATABASE_REPLICA_URL')
+        endpoints = [
+            endpoint for endpoint in ENDPOINTS
+            if not options['only'] or endpoint[0].startswith(options['only'])
+        ]
+        
+        response_cache = dict(settings.RESPONSE_CACHE, ENABLED=options['with_cache'])
+        results = {}
+        users = []
+        try:
+            with override_settings(RESPONSE_CACHE=response_cache):
+                for size in sizes:
+                    user = self.create_user(size, options['seed'])
+                    users.append(user)
+                    with read_replica(options['replica']):
+                        results[str(size)] = self.run_size(user, size, endpoints, options['repeat'], options['replica'])
+        finally:
+            if not options['keep'] and users:
+                synthetic.delete_synthetic_users(users)
+        
+        report = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'sizes': sizes,
+                'repeat': options['repeat'],
+                'seed': options['seed'],
+                'response_cache': options['with_cache'],
+                'replica': options['replica'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        
+        if options['baseline']:
+            regressions = self.compare(report, options['baseline'], options['threshold'])
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{regressions} regression(s) against {options["baseline"]}')
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Benchmarked {len(endpoints)} endpoints at {len(sizes)} data sizes!'))
+
+    def create_user(self, size, seed):
+        user = synthetic.create_users(1, seed, prefix=f'bench{size}')[0]
+        if not Transaction.objects.filter(user=user).exists():
+            synthetic.generate([user], size, seed=seed)
+        return user
+
+    def run_size(self, user, size, endpoints, repeat, replica=False):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user)
+        database = connections[replica_alias()] if replica else connection
+        latest = Transaction.objects.filter(user=user).order_by('-date', '-id').values_list('pk', flat=True).first()
+        
+        self.stdout.write(f'\n{size} transactions')
+        self.stdout.write(f'{"endpoint":<28} {"median ms":>10} {"p95 ms":>10} {"queries":>8} {"bytes":>10}')
+        results = {}
+        for name, url_name, params in endpoints:
+            kwargs = {'pk': latest} if url_name.endswith('-detail') else {}
+            url = reverse(url_name, kwargs=kwargs)
+            
+            self.request(client, url, params)  # Warm-up
+            samples = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(database) as queries:
+                    started = time.perf_counter()
+                    status, size_bytes = self.request(client, url, params)
+                    samples.append((time.perf_counter() - started) * 1000)
+            
+            samples.sort()
+            result = {
+                'status': status,
+                'median_ms': round(statistics.median(samples), 3),
+                'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                'min_ms': round(samples[0], 3),
+                'queries': len(queries),
+                'bytes': size_bytes,
+            }
+            results[name] = result
+            self.stdout.write(
+                f"{name:<28} {result['median_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+                f"{result['queries']:>8} {result['bytes']:>10}"
+            )
+        return results
+
+    def request(self, client, url, params):
+        response = client.get(url, params)
+        if response.streaming:
+            body = b''.join(response.streaming_content)
+        else:
+            body = response.content
+        return response.status_code, len(body)
+
+    def compare(self, report, baseline_path, threshold):
+        """
+        Print the change against a stored baseline; returns the number of regressions.
+        """
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        
+        self.stdout.write(f'\nCompared with {baseline_path}')
+        self.stdout.write(f'{"size":>8} {"endpoint":<28} {"median ms":>18} {"change":>8} {"queries":>10}')
+        regressions = 0
+        for size, endpoints in report['results'].items():
+            for name, current in endpoints.items():
+                previous = baseline.get(size, {}).get(name)
+                if previous is None:
+                    continue
+                change = (current['median_ms'] / previous['median_ms'] - 1) * 100 if previous['median_ms'] else 0
+                slower = change > threshold
+                more_queries = current['queries'] > previous['queries']
+                flag = ''
+                if slower or more_queries:
+                    regressions += 1
+                    flag = '  REGRESSION'
+                self.stdout.write(
+                    f"{size:>8} {name:<28} {previous['median_ms']:>8.2f} -> {current['median_ms']:>7.2f} "
+                    f"{change:>+7.1f}% {previous['queries']:>4} -> {current['queries']:<4}{flag}"
+                )
+        
+        if regressions:
+            self.stdout.write(self.style.WARNING(f'{regressions} regression(s) beyond {threshold}% or with more queries'))
+        return regressions
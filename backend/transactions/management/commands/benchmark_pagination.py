@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from transactions.models import Category, Transaction
+from transactions.pagination import TransactionCursorPagination
+from transactions.views import TransactionViewSet
+
+BENCH_EMAIL = 'bench-pagination@example.com'
+
+
+class Command(BaseCommand):
+    help = 'Compare page-number and cursor pagination latency at increasing depths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Transactions for the benchmark user')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed requests per depth')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark user afterwards')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        page_size = api_settings.PAGE_SIZE
+        user = self.get_user(rows)
+        view = TransactionViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+
+        def timed(params):
+            samples = []
+            for _ in range(options['repeat']):
+                request = factory.get('/api/transactions/transactions/', params, HTTP_HOST='localhost')
+                force_authenticate(request, user=user)
+                started = time.perf_counter()
+                response = view(request)
+                response.render()
+                samples.append((time.perf_counter() - started) * 1000)
+            return statistics.median(samples)
+
+        depths = [0] + [d for d in (1000, 10000, 50000, 100000, 500000) if d < rows]
+        ordered = Transaction.objects.filter(user=user).order_by(*TransactionCursorPagination.ordering)
+        encoder = TransactionCursorPagination()
+
+        self.stdout.write(f'{"offset":>10} {"page (ms)":>12} {"cursor (ms)":>12}')
+        for depth in depths:
+            page_ms = timed({'page': depth // page_size + 1})
+            cursor_params = {'pagination': 'cursor'}
+            if depth:
+                cursor_params['cursor'] = encoder.encode_cursor(ordered[depth - 1], reverse=False)
+            cursor_ms = timed(cursor_params)
+            self.stdout.write(f'{depth:>10} {page_ms:>12.2f} {cursor_ms:>12.2f}')
+
+        if not options['keep']:
+            # The queryset delete adjusts rollups in one grouped pass
+            Transaction.objects.filter(user=user).delete()
+            user.delete()
+            self.stdout.write('Removed benchmark user')
+
+    def get_user(self, rows):
+        User = get_user_model()
+        user, _ = User.objects.get_or_create(email=BENCH_EMAIL, defaults={'username': BENCH_EMAIL})
+        existing = Transaction.objects.filter(user=user).count()
+        if existing >= rows:
+            return user
+
+        rng = random.Random(42)
+        categories = list(Category.objects.filter(is_default=True)) or [None]
+        today = date.today()
+        batch = []
+        for _ in range(rows - existing):
+            category = rng.choice(categories)
+            batch.append(Transaction(
+                user=user,
+                amount=rng.randint(100, 50000) / 100,
+                type=category.type if category else 'expense',
+                category=category,
+                date=today - timedelta(days=rng.randint(0, 3650)),
+            ))
+            if len(batch) == 5000:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+        self.stdout.write(f'Generated {rows - existing} transactions')
+        return user
@@ -0,0 +1,114 @@
+import json
+import statistics
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from finance_tracker import renderers
+from finance_tracker.renderers import FastJSONRenderer
+from transactions import synthetic
+from transactions.models import Transaction
+from transactions.read_serializers import TransactionReadSerializer
+from transactions.serializers import TransactionSerializer
+
+
+class _Request:
+    """
+    Just enough of a request for the serializers' category lookups.
+    """
+    def __init__(self, user):
+        self.user = user
+
+
+class Command(BaseCommand):
+    help = 'Compare rows per second of the transaction read paths (query, serialize and render JSON)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Transactions to serialize per run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated data')
+        parser.add_argument('--output', type=str, help='Write results to this JSON file')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark user afterwards')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        user = synthetic.create_users(1, options['seed'], prefix=f'serializers{rows}')[0]
+        try:
+            if not Transaction.objects.filter(user=user).exists():
+                synthetic.generate([user], rows, seed=options['seed'])
+            results = self.run(user, rows, options['repeat'])
+        finally:
+            if not options['keep']:
+                synthetic.delete_synthetic_users([user])
+
+        report = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'rows': rows,
+                'repeat': options['repeat'],
+                'orjson': renderers.orjson is not None,
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Benchmarked {len(results)} read paths over {rows} rows!'))
+
+    def paths(self, queryset, context):
+        def model_serializer():
+            data = TransactionSerializer(queryset.all(), many=True, context=context).data
+            return JSONRenderer().render(data)
+
+        def values_stdlib():
+            data = TransactionReadSerializer(TransactionReadSerializer.values(queryset.all()), context=context).data
+            return JSONRenderer().render(data)
+
+        def values_orjson():
+            data = TransactionReadSerializer(TransactionReadSerializer.values(queryset.all()), context=context).data
+            return FastJSONRenderer().render(data)
+
+        paths = [
+            ('model_serializer+json', model_serializer),
+            ('values+json', values_stdlib),
+        ]
+        if renderers.orjson is not None:
+            paths.append(('values+orjson', values_orjson))
+        return paths
+
+    def run(self, user, rows, repeat):
+        queryset = Transaction.objects.filter(user=user)[:rows]
+        context = {'request': _Request(user)}
+        count = min(rows, Transaction.objects.filter(user=user).count())
+
+        self.stdout.write(f'{"path":<24} {"median ms":>10} {"rows/s":>12} {"speedup":>8} {"bytes":>10}')
+        results = {}
+        baseline = None
+        for name, path in self.paths(queryset, context):
+            body = path()  # Warm-up
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                path()
+                samples.append(time.perf_counter() - started)
+
+            median = statistics.median(samples)
+            baseline = baseline or median
+            result = {
+                'median_ms': round(median * 1000, 3),
+                'rows_per_second': round(count / median),
+                'speedup': round(baseline / median, 2),
+                'bytes': len(body),
+            }
+            results[name] = result
+            self.stdout.write(
+                f"{name:<24} {result['median_ms']:>10.2f} {result['rows_per_second']:>12} "
+                f"{result['speedup']:>7.2f}x {result['bytes']:>10}"
+            )
+        return results
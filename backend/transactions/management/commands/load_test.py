@@ -0,0 +1,388 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.urls import reverse
+
+from transactions import synthetic
+from transactions.models import Transaction
+
+# Operations a virtual user picks from, with their default weights
+OPERATIONS = {
+    'dashboard': 6,
+    'create': 2,
+    'budgets': 2,
+}
+ENDPOINT_NAMES = {
+    'dashboard': 'dashboard',
+    'create': 'transactions.create',
+    'budgets': 'budgets.overview',
+}
+
+
+def percentile(samples, percent):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class HTTPConnection:
+    """
+    One keep-alive HTTP/1.1 connection over asyncio streams (a virtual
+    user's browser). Reconnects when the server closed it.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        """
+        Send a request with an optional JSON body. Returns the status,
+        lower-cased headers and body.
+        """
+        payload = json.dumps(body).encode() if body is not None else b''
+        lines = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Accept: application/json',
+            f'Content-Length: {len(payload)}',
+        ]
+        if payload:
+            lines.append('Content-Type: application/json')
+        if token:
+            lines.append(f'Authorization: Bearer {token}')
+        message = ('\r\n'.join(lines) + '\r\n\r\n').encode() + payload
+
+        reused = self.writer is not None
+        try:
+            return await self._exchange(message)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        # An idle keep-alive connection the server had already closed
+        return await self._exchange(message)
+
+    async def _exchange(self, message):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(message)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError('Connection closed by the server')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, headers, body
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await self.reader.readline()
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Log in many synthetic users against a running server and replay a mix of dashboard reads, '
+        'transaction creates and budget overviews; reports throughput and p50/p95/p99 per endpoint as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Virtual users, each with its own connection')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to replay the mix for')
+        parser.add_argument(
+            '--mix', type=str, default=','.join(f'{name}={weight}' for name, weight in OPERATIONS.items()),
+            help='Operation weights, e.g. dashboard=6,create=2,budgets=2'
+        )
+        parser.add_argument('--think-ms', type=float, default=0, help='Pause between a user\'s requests')
+        parser.add_argument('--transactions', type=int, default=1000, help='Generated transactions per user')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the data and the request mix')
+        parser.add_argument(
+            '--url', type=str,
+            help='Base URL of a server already running against this database, or against any database '
+                 'with --skip-setup (by default runserver is started on a free port)'
+        )
+        parser.add_argument(
+            '--skip-setup', action='store_true',
+            help='Reuse load test users that already exist where the server runs (e.g. from an earlier run '
+                 'with --keep) instead of creating them and their data here'
+        )
+        parser.add_argument('--output', type=str, help='Write results to this JSON file instead of stdout')
+        parser.add_argument('--keep', action='store_true', help='Keep the load test users afterwards')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['duration'] <= 0:
+            raise CommandError('--users and --duration must be positive')
+        mix = self.parse_mix(options['mix'])
+
+        emails = [synthetic.synthetic_email('load', options['seed'], index) for index in range(options['users'])]
+        users = []
+        server = None
+        try:
+            if not options['skip_setup']:
+                users = synthetic.create_users(options['users'], options['seed'], prefix='load')
+
+            if options['url']:
+                base = urlsplit(options['url'])
+                host, port = base.hostname, base.port or 80
+            else:
+                host, port = '127.0.0.1', free_port()
+                server = self.start_server(host, port)
+            # Before generating any data: a --url server on another database
+            # can't log these users in
+            asyncio.run(self.check_login(host, port, emails[0], options))
+
+            missing = [user for user in users if not Transaction.objects.filter(user=user).exists()]
+            if missing:
+                self.stdout.write(f'Generating {options["transactions"]} transactions for {len(missing)} users...')
+                synthetic.generate(missing, options['transactions'], seed=options['seed'])
+
+            self.stdout.write(f'{len(emails)} users for {options["duration"]}s against {host}:{port}')
+            logins, results, elapsed = asyncio.run(self.run(host, port, emails, mix, options))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            if users and not options['keep']:
+                synthetic.delete_synthetic_users(users)
+
+        report = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'database': connection.vendor,
+                'server': options['url'] or 'runserver',
+                'users': options['users'],
+                'duration_seconds': round(elapsed, 3),
+                'mix': mix,
+                'think_ms': options['think_ms'],
+                'transactions_per_user': None if options['skip_setup'] else options['transactions'],
+            },
+            'login': self.summarize(*logins),
+            'totals': self.summarize([sample for samples in results.values() for sample in samples], elapsed),
+            'endpoints': {name: self.summarize(samples, elapsed) for name, samples in sorted(results.items())},
+        }
+        self.print_table(report)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Sent {report['totals']['requests']} requests at {report['totals']['requests_per_second']} req/s!"
+        ))
+
+    def parse_mix(self, value):
+        mix = {}
+        for part in value.split(','):
+            name, _, weight = part.partition('=')
+            name = name.strip()
+            if name not in OPERATIONS:
+                raise CommandError(f'Unknown operation "{name}" in --mix. Use any of: {", ".join(OPERATIONS)}.')
+            try:
+                mix[name] = float(weight)
+            except ValueError:
+                raise CommandError(f'--mix weight for "{name}" must be a number')
+        if not any(weight > 0 for weight in mix.values()):
+            raise CommandError('--mix needs at least one positive weight')
+        return mix
+
+    def start_server(self, host, port):
+        """
+        Start runserver on host:port with this process's settings and wait
+        until it accepts connections.
+        """
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        server = subprocess.Popen(
+            [sys.executable, manage_py, 'runserver', f'{host}:{port}', '--noreload'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'runserver exited with status {server.returncode}')
+            try:
+                socket.create_connection((host, port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'runserver did not start listening on {host}:{port}')
+
+    async def check_login(self, host, port, email, options):
+        """
+        Log one load test user in, so a server that can't is reported
+        before any data is generated.
+        """
+        conn = HTTPConnection(host, port)
+        try:
+            status, headers, body = await conn.request(
+                'POST', reverse('token_obtain_pair'), {'email': email, 'password': synthetic.SYNTHETIC_PASSWORD}
+            )
+        except OSError as exc:
+            raise CommandError(f'Could not connect to {host}:{port}: {exc}')
+        finally:
+            conn.close()
+        if status == 200:
+            return
+        if options['skip_setup']:
+            hint = 'Create the load test users there first (a run without --skip-setup, with --keep).'
+        else:
+            hint = 'Is the server using this database? Otherwise use --skip-setup with users created there.'
+        raise CommandError(f'{email} could not log in to {host}:{port} (status {status}). {hint}')
+
+    async def run(self, host, port, emails, mix, options):
+        """
+        Log every user in, then let each replay the mix until the duration
+        is up. Samples are (status, ms, shed); returns the login samples with
+        the seconds they took, {endpoint: samples} and the replay's seconds.
+        """
+        results = defaultdict(list)
+        login_samples = []
+        connections = [HTTPConnection(host, port) for _ in emails]
+        login_path = reverse('token_obtain_pair')
+
+        async def login(email, conn):
+            started = time.perf_counter()
+            status, headers, body = await conn.request(
+                'POST', login_path, {'email': email, 'password': synthetic.SYNTHETIC_PASSWORD}
+            )
+            login_samples.append((status, (time.perf_counter() - started) * 1000, False))
+            if status != 200:
+                raise CommandError(f'Login failed for {email} with status {status}')
+            return json.loads(body)['access']
+
+        started = time.perf_counter()
+        tokens = await asyncio.gather(*(login(email, conn) for email, conn in zip(emails, connections)))
+        logins = (login_samples, time.perf_counter() - started)
+
+        # The server's category ids, which needn't be this database's
+        status, headers, body = await connections[0].request(
+            'GET', reverse('category-expense-categories'), token=tokens[0]
+        )
+        if status != 200:
+            raise CommandError(f'Listing expense categories failed with status {status}')
+        category_ids = [category['id'] for category in json.loads(body)] or [None]
+
+        paths = {
+            'dashboard': reverse('dashboard'),
+            'create': reverse('transaction-list'),
+            'budgets': reverse('budget-overview'),
+        }
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        today = date.today()
+        rng = random.Random(options['seed'])
+        deadline = time.perf_counter() + options['duration']
+
+        async def virtual_user(token, conn):
+            while time.perf_counter() < deadline:
+                operation = rng.choices(names, weights)[0]
+                if operation == 'create':
+                    body = {
+                        'amount': f'{rng.uniform(1, 120):.2f}',
+                        'type': 'expense',
+                        'category': rng.choice(category_ids),
+                        'date': (today - timedelta(days=rng.randrange(30))).isoformat(),
+                        'description': 'Load test',
+                    }
+                    request = conn.request('POST', paths[operation], body, token)
+                else:
+                    request = conn.request('GET', paths[operation], token=token)
+
+                started = time.perf_counter()
+                try:
+                    status, headers, body = await request
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn.close()
+                    status, headers = 0, {}
+                results[ENDPOINT_NAMES[operation]].append(
+                    (status, (time.perf_counter() - started) * 1000, 'x-load-shed' in headers)
+                )
+                if options['think_ms']:
+                    await asyncio.sleep(options['think_ms'] / 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(virtual_user(token, conn) for token, conn in zip(tokens, connections)))
+        elapsed = time.perf_counter() - started
+        for conn in connections:
+            conn.close()
+        return logins, dict(results), elapsed
+
+    def summarize(self, samples, elapsed):
+        latencies = [ms for status, ms, shed in samples]
+        statuses = defaultdict(int)
+        for status, ms, shed in samples:
+            statuses[str(status)] += 1
+        return {
+            'requests': len(samples),
+            'requests_per_second': round(len(samples) / elapsed, 1) if elapsed else 0,
+            'errors': sum(1 for status, ms, shed in samples if not 200 <= status < 300),
+            'shed': sum(1 for status, ms, shed in samples if shed),
+            'statuses': dict(sorted(statuses.items())),
+            'p50_ms': round(percentile(latencies, 50), 3) if latencies else None,
+            'p95_ms': round(percentile(latencies, 95), 3) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 3) if latencies else None,
+            'max_ms': round(max(latencies), 3) if latencies else None,
+        }
+
+    def print_table(self, report):
+        self.stdout.write(
+            f'\n{"endpoint":<22} {"requests":>9} {"req/s":>8} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} '
+            f'{"errors":>7} {"shed":>6}'
+        )
+        rows = [('auth.login', report['login']), *report['endpoints'].items(), ('total', report['totals'])]
+        for name, result in rows:
+            if not result['requests']:
+                continue
+            self.stdout.write(
+                f"{name:<22} {result['requests']:>9} {result['requests_per_second']:>8} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                f"{result['errors']:>7} {result['shed']:>6}"
+            )
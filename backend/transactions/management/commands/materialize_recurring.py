@@ -0,0 +1,19 @@
+from datetime import date
+from django.core.management.base import BaseCommand
+from transactions.recurring import materialize_due, BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Generate the transactions for every due recurring template (safe to run concurrently)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='Treat this day as today (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        stats = materialize_due(today=options['date'], batch_size=options['batch_size'])
+        
+        rate = stats['templates'] / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Processed {stats['templates']} templates, created {stats['transactions']} "
+            f"transactions in {stats['seconds']}s ({rate:.0f} templates/s)"
+        ))
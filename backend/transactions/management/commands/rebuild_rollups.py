@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from transactions import rollups
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly transaction rollups from raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='user_ids',
+            help='Only rebuild rollups for this user id (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids']
+        count = rollups.rebuild(user_ids)
+        
+        scope = f'{len(user_ids)} user(s)' if user_ids else 'all users'
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {count} rollup rows for {scope}!'))
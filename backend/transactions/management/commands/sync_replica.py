@@ -0,0 +1,29 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from finance_tracker.db_router import replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Copy the SQLite primary database over the SQLite replica (local stand-in for replication)'
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No replica configured (set DATABASE_REPLICA_URL)')
+        primary, replica = connections['default'], connections[alias]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite files; use your database\'s replication')
+        
+        replica.close()
+        primary.ensure_connection()
+        target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        
+        self.stdout.write(self.style.SUCCESS(f"✅ Copied {settings.DATABASES['default']['NAME']} to {settings.DATABASES[alias]['NAME']}!"))
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    Transaction = apps.get_model('transactions', 'Transaction')
+    MonthlyRollup = apps.get_model('transactions', 'MonthlyRollup')
+    rows = Transaction.objects.order_by().annotate(
+        month=TruncMonth('date')
+    ).values('user_id', 'month', 'category_id', 'type').annotate(
+        total=Sum('amount'), count=Count('id')
+    )
+    MonthlyRollup.objects.bulk_create(
+        [MonthlyRollup(**row) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('type', models.CharField(choices=[('expense', 'Expense'), ('income', 'Income')], max_length=10)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='transactions.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-month'],
+                'unique_together': {('user', 'month', 'category', 'type')},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_transaction_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recurringtransaction',
+            name='anchor_day',
+            field=models.PositiveSmallIntegerField(blank=True, help_text="Day of month the schedule recurs on, so Jan 31 -> Feb 28 -> Mar 31 doesn't drift", null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recurringtransaction',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['next_date'], name='recurring_due_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_recurring_anchor_day'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='transaction_user_id_4685bf_idx',
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['user', 'type', 'name'], name='category_user_type_name_idx'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='user',
+            field=models.ForeignKey(blank=True, db_index=False, help_text='Owner of this category. Null = default category for all users', null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'type', 'date'], name='txn_user_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'type', 'date'], name='txn_user_cat_type_date_idx'),
+        ),
+    ]
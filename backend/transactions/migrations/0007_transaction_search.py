@@ -0,0 +1,99 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE transactions_transaction_fts USING fts5(
+        description,
+        content='transactions_transaction',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    # External-content table: triggers mirror every write, bulk ones included
+    """
+    CREATE TRIGGER transactions_transaction_fts_insert AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_delete AFTER DELETE ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER transactions_transaction_fts_update AFTER UPDATE OF description ON transactions_transaction BEGIN
+        INSERT INTO transactions_transaction_fts(transactions_transaction_fts, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO transactions_transaction_fts(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    "INSERT INTO transactions_transaction_fts(transactions_transaction_fts) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_insert',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_delete',
+    'DROP TRIGGER IF EXISTS transactions_transaction_fts_update',
+    'DROP TABLE IF EXISTS transactions_transaction_fts',
+]
+# Must match the expression in transactions/search.py for the index to be used
+POSTGRES_CREATE = [
+    """
+    CREATE INDEX txn_description_search_idx ON transactions_transaction
+    USING GIN (to_tsvector('simple', coalesce(description, '')))
+    """,
+]
+POSTGRES_DROP = ['DROP INDEX IF EXISTS txn_description_search_idx']
+
+
+def sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+        statements = SQLITE_CREATE
+    elif connection.vendor == 'postgresql':
+        statements = POSTGRES_CREATE
+    else:
+        # search.py falls back to LIKE matching
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionSearchEntry',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='transactions.transaction')),
+                ('document', models.TextField(db_column='transactions_transaction_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'transactions_transaction_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -1,6 +1,17 @@
 from django.db import models
 from django.conf import settings
 
+class CategoryQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """
+        The user's own categories plus the defaults. Defaults have no owner,
+        so both halves of the OR are seeks on the (user, type, name) index.
+        """
+        return self.filter(
+            models.Q(user=user) | models.Q(user__isnull=True, is_default=True)
+        )
+
+
 class Category(models.Model):
     """
     Categories for organizing transactions (e.g., Food, Transport, Salary)
@@ -16,6 +27,7 @@ class Category(models.Model):
         on_delete=models.CASCADE, 
         null=True, 
         blank=True,
+        db_index=False,  # Covered by the (user, type, name) index
         help_text="Owner of this category. Null = default category for all users"
     )
     name = models.CharField(max_length=100)
@@ -25,14 +37,84 @@ class Category(models.Model):
     is_default = models.BooleanField(default=False, help_text="System default category")
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = CategoryQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Categories"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['user', 'type', 'name'], name='category_user_type_name_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.type})"
 
 
+class TransactionQuerySet(models.QuerySet):
+    """
+    QuerySet that keeps MonthlyRollup and Budget.spent_amount in step on
+    the bulk write paths, which bypass the per-row save/delete signals.
+    """
+    ROLLUP_FIELDS = {'user', 'user_id', 'amount', 'type', 'category', 'category_id', 'date'}
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        from budgets import counters
+        from users.versioning import bump_data_version
+        from . import rollups
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_data_version(*{obj.user_id for obj in objs})
+        if rollups.is_suspended():
+            # The caller rebuilds the affected rollups and budgets itself
+            return objs
+        if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+            # We can't tell which rows actually landed, so recount their months
+            rollups.rebuild_months({
+                (obj.user_id, rollups.month_start(obj.date)) for obj in objs
+            })
+            counters.recount_covering(objs)
+        else:
+            rollups.apply_transactions(objs)
+            counters.apply_deltas(counters.transaction_deltas(objs))
+        return objs
+    
+    def update(self, **kwargs):
+        from users.versioning import bump_data_version
+        if not self.ROLLUP_FIELDS.intersection(kwargs):
+            user_ids = set(self.order_by().values_list('user_id', flat=True).distinct())
+            updated = super().update(**kwargs)
+            bump_data_version(*user_ids)
+            return updated
+        
+        from budgets import counters
+        from . import rollups
+        pks = list(self.values_list('pk', flat=True))
+        touched = rollups.month_keys(Transaction.objects.filter(pk__in=pks))
+        spent_before = counters.grouped_deltas(Transaction.objects.filter(pk__in=pks), sign=-1)
+        updated = super().update(**kwargs)
+        touched |= rollups.month_keys(Transaction.objects.filter(pk__in=pks))
+        spent_after = counters.grouped_deltas(Transaction.objects.filter(pk__in=pks))
+        rollups.rebuild_months(touched)
+        counters.apply_deltas(counters.merge(spent_before, spent_after))
+        bump_data_version(*{user_id for user_id, month in touched})
+        return updated
+    
+    def delete(self):
+        from budgets import counters
+        from users.versioning import bump_data_version
+        from . import rollups
+        deltas = rollups.grouped_deltas(self, sign=-1)
+        spent = counters.grouped_deltas(self, sign=-1)
+        with rollups.suspended():
+            result = super().delete()
+        rollups.apply_deltas(deltas)
+        counters.apply_deltas(spent)
+        bump_data_version(*{key[0] for key in deltas})
+        return result
+    
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Transaction(models.Model):
     """
     Individual income or expense transaction
@@ -61,17 +143,94 @@ class Transaction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = TransactionQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-date', '-created_at']
         indexes = [
-            models.Index(fields=['user', '-date']),
-            models.Index(fields=['user', 'type']),
+            # Also covers the (-date, -created_at, -id) keyset pagination order
+            models.Index(fields=['user', '-date', '-created_at', '-id']),
+            # Type + date range filters (summary edges, insights, prediction)
+            models.Index(fields=['user', 'type', 'date'], name='txn_user_type_date_idx'),
+            # Budget spend lookups: user, category, expense, date window
+            models.Index(fields=['user', 'category', 'type', 'date'], name='txn_user_cat_type_date_idx'),
         ]
     
     def __str__(self):
         return f"{self.type}: ${self.amount} - {self.category}"
 
 
+class FullTextMatch(models.Lookup):
+    """
+    `<fts column> MATCH <query>` for the SQLite FTS5 index below.
+    """
+    lookup_name = 'match'
+    
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TransactionSearchEntry(models.Model):
+    """
+    Read-only view of the FTS5 table indexing transaction descriptions on
+    SQLite (created and kept in sync by triggers in migration 0007; see
+    search.py). Joined to Transaction on rowid = id. Not used on PostgreSQL,
+    which searches a GIN expression index instead.
+    """
+    transaction = models.OneToOneField(
+        Transaction,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry'
+    )
+    # FTS5's hidden column named after the table; the left side of MATCH
+    document = models.TextField(db_column='transactions_transaction_fts')
+    # FTS5's hidden bm25 rank (lower is better)
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'transactions_transaction_fts'
+
+
+TransactionSearchEntry._meta.get_field('document').register_lookup(FullTextMatch)
+
+
+class MonthlyRollup(models.Model):
+    """
+    Pre-aggregated monthly totals per user, category and type.
+    Kept current by the Transaction signals (see rollups.py) so summaries
+    and analytics only scan one row per month instead of every transaction.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='monthly_rollups'
+    )
+    month = models.DateField(help_text="First day of the month")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='monthly_rollups'
+    )
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-month']
+        # Also serves as the (user, month) lookup index for period reads
+        unique_together = ['user', 'month', 'category', 'type']
+    
+    def __str__(self):
+        return f"{self.user} {self.month:%Y-%m} {self.type}: ${self.total}"
+
+
 class RecurringTransaction(models.Model):
     """
     Template for transactions that repeat (e.g., monthly rent, weekly groceries)
@@ -94,11 +253,44 @@ class RecurringTransaction(models.Model):
     description = models.TextField(blank=True)
     frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
     next_date = models.DateField()
+    anchor_day = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text="Day of month the schedule recurs on, so Jan 31 -> Feb 28 -> Mar 31 doesn't drift"
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['next_date']
+        indexes = [
+            # Due-template scans only ever look at active rows
+            models.Index(fields=['next_date'], condition=models.Q(is_active=True), name='recurring_due_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save() tell an edited next_date from the stored one
+        instance._stored_next_date = instance.__dict__.get('next_date')
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or 'next_date' in fields:
+            self._stored_next_date = self.__dict__.get('next_date')
+    
+    def save(self, *args, **kwargs):
+        # A new or directly edited next_date defines the schedule again.
+        # Other edits keep the anchor, so a template anchored on the 31st
+        # and clamped to Feb 28 still returns to the 31st; the materializer
+        # advances next_date with bulk_update and keeps it too.
+        next_date = self._meta.get_field('next_date').to_python(self.next_date)
+        stored = getattr(self, '_stored_next_date', None)
+        if next_date and (self.anchor_day is None or next_date != stored):
+            self.anchor_day = next_date.day
+        super().save(*args, **kwargs)
+        self._stored_next_date = next_date
     
     def __str__(self):
         return f"{self.description} - {self.frequency}"
\ No newline at end of file
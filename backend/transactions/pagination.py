@@ -0,0 +1,150 @@
+"""
+Keyset (cursor) pagination for the transaction list.
+
+Page-number pagination runs a COUNT(*) per page and an ever-growing
+OFFSET. Keyset pagination instead remembers the (date, created_at, id) of
+the last row served and asks for rows strictly after it, so every page is
+an index range scan on (user, -date, -created_at, -id) however deep it is, and rows
+inserted meanwhile never shift or duplicate entries between pages.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TransactionCursorPagination(BasePagination):
+    """
+    Opt in with ?pagination=cursor; follow the returned next/previous links.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-date', '-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return max(1, min(size, self.max_page_size))
+
+    # ==================== CURSOR ENCODING ====================
+
+    def encode_cursor(self, row, reverse):
+        payload = {
+            'd': row.date.isoformat(),
+            'c': row.created_at.isoformat(),
+            'i': row.id,
+            'r': int(reverse),
+        }
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            position = (
+                parse_date(payload['d']),
+                parse_datetime(payload['c']),
+                int(payload['i']),
+            )
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    # ==================== PAGINATION ====================
+
+    def after(self, position):
+        """
+        Rows that come strictly after `position` in (-date, -created_at, -id) order.
+        """
+        date, created_at, pk = position
+        # The leading date bound lets the database seek on the index
+        return Q(date__lte=date) & (
+            Q(date__lt=date)
+            | Q(date=date, created_at__lt=created_at)
+            | Q(date=date, created_at=created_at, id__lt=pk)
+        )
+
+    def before(self, position):
+        date, created_at, pk = position
+        return Q(date__gte=date) & (
+            Q(date__gt=date)
+            | Q(date=date, created_at__gt=created_at)
+            | Q(date=date, created_at=created_at, id__gt=pk)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            rows = list(queryset.order_by(*self.ordering)[:page_size + 1])
+            self.has_next = len(rows) > page_size
+            self.has_previous = False
+            self.page = rows[:page_size]
+            return self.page
+
+        position, reverse = cursor
+        if reverse:
+            # Walk backwards from the cursor, then flip back into display order
+            reversed_ordering = [field.lstrip('-') for field in self.ordering]
+            rows = list(queryset.filter(self.before(position)).order_by(*reversed_ordering)[:page_size + 1])
+            self.has_previous = len(rows) > page_size
+            self.has_next = True
+            self.page = list(reversed(rows[:page_size]))
+        else:
+            rows = list(queryset.filter(self.after(position)).order_by(*self.ordering)[:page_size + 1])
+            self.has_next = len(rows) > page_size
+            self.has_previous = True
+            self.page = rows[:page_size]
+        return self.page
+
+    def get_link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
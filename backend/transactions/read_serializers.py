@@ -0,0 +1,161 @@
+"""
+Lightweight read-only serializers for large result sets.
+
+DRF's ModelSerializer builds a field tree and walks it for every model
+instance, which dominates CPU time on big pages. These serializers read
+values_list() rows instead of instances and convert each column with a
+converter chosen once per model field, producing exactly the same output
+as the matching ModelSerializer. They only serialize; writes keep using
+the regular serializers.
+"""
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils import timezone
+
+from .categories import registry as category_registry
+from .models import Category, Transaction
+from .serializers import TransactionSerializer
+
+PLAIN, CONVERTED, COMPUTED = 'plain', 'converted', 'computed'
+
+
+def _datetime_converter():
+    current = timezone.get_current_timezone()
+
+    def convert(value):
+        if timezone.is_aware(value):
+            value = value.astimezone(current)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _decimal_converter(field):
+    quantum = Decimal(1).scaleb(-field.decimal_places)
+
+    def convert(value):
+        return '{:f}'.format(value.quantize(quantum))
+    return convert
+
+
+def date_isoformat(value):
+    return value.isoformat()
+
+
+def field_converter(field):
+    """
+    The function DRF's default field for `field` would apply on output,
+    or None when the database value is already what it returns.
+    """
+    if isinstance(field, models.DateTimeField):
+        return _datetime_converter()
+    if isinstance(field, models.DateField):
+        return date_isoformat
+    if isinstance(field, models.DecimalField):
+        return _decimal_converter(field)
+    return None
+
+
+class ValuesReadSerializer:
+    """
+    Serialize values_list(named=True) rows of `model` to dicts with keys
+    `fields`. Subclasses may add computed fields by overriding
+    `extra_values(rows)` to return {field name: per-row function}.
+    """
+    model = None
+    fields = ()
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+
+    @classmethod
+    def columns(cls):
+        """
+        Database columns to select: every output field backed by a model field.
+        """
+        columns = []
+        for name in cls.fields:
+            try:
+                field = cls.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            columns.append(field.attname)
+        return columns
+
+    @classmethod
+    def values(cls, queryset):
+        """
+        Rows for this serializer from a queryset of `model`.
+        """
+        return queryset.values_list(*cls.columns(), named=True)
+
+    def extra_values(self, rows):
+        return {}
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        columns = self.columns()
+        position = {column: index for index, column in enumerate(columns)}
+        extras = self.extra_values(rows)
+
+        getters = []
+        for name in self.fields:
+            if name in extras:
+                getters.append((name, COMPUTED, extras[name], None))
+                continue
+            field = self.model._meta.get_field(name)
+            convert = field_converter(field)
+            getters.append((name, PLAIN if convert is None else CONVERTED, position[field.attname], convert))
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, kind, source, convert in getters:
+                if kind is PLAIN:
+                    item[name] = row[source]
+                elif kind is CONVERTED:
+                    value = row[source]
+                    item[name] = None if value is None else convert(value)
+                else:
+                    item[name] = source(row)
+            data.append(item)
+        return data
+
+
+class TransactionReadSerializer(ValuesReadSerializer):
+    """
+    Same output as TransactionSerializer. Category name/icon/color come
+    from the category registry (one bulk query for any it doesn't know).
+    """
+    model = Transaction
+    fields = TransactionSerializer.Meta.fields
+
+    def extra_values(self, rows):
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        categories = {}
+        if user is not None and user.is_authenticated:
+            categories = category_registry.for_user(user)
+
+        index = self.columns().index('category_id')
+        missing = {row[index] for row in rows if row[index] is not None and row[index] not in categories}
+        if missing:
+            categories = {**categories, **Category.objects.in_bulk(missing)}
+
+        def attribute(name):
+            def get(row):
+                category = categories.get(row[index])
+                return getattr(category, name) if category is not None else None
+            return get
+
+        return {
+            'category_name': attribute('name'),
+            'category_icon': attribute('icon'),
+            'category_color': attribute('color'),
+        }
@@ -0,0 +1,136 @@
+"""
+Materialization of RecurringTransaction templates into real transactions.
+
+Due templates are claimed in id-ordered batches. On databases that support
+it (PostgreSQL) each batch is locked with SELECT ... FOR UPDATE SKIP LOCKED,
+so several workers can run at once and never pick the same template; on
+SQLite each batch takes the database write lock as it starts (what BEGIN
+IMMEDIATE does), so concurrent runs queue for the lock instead of failing
+with "database is locked". Every missed occurrence of a batch is
+generated in one pass, bulk inserted, and next_date is advanced past today.
+"""
+import calendar
+import time
+from datetime import date, timedelta
+
+from django.db import connection, transaction as db_transaction
+
+from .models import RecurringTransaction, Transaction
+
+BATCH_SIZE = 1000
+# Cap on transactions written per database transaction, so one long
+# catch-up (e.g. a daily template idle for years) can't hold locks for long
+MAX_ROWS_PER_BATCH = 20000
+
+
+def add_months(value, months, anchor_day):
+    """
+    Move `value` forward by `months`, landing on `anchor_day` clamped to
+    the length of the target month (31 -> 30 in April, 28/29 in February).
+    """
+    month_index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return date(year, month, min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def next_occurrence(current, frequency, anchor_day):
+    if frequency == 'daily':
+        return current + timedelta(days=1)
+    if frequency == 'weekly':
+        return current + timedelta(weeks=1)
+    if frequency == 'monthly':
+        return add_months(current, 1, anchor_day)
+    if frequency == 'yearly':
+        return add_months(current, 12, anchor_day)
+    raise ValueError(f'Unknown frequency "{frequency}"')
+
+
+def occurrences(template, today):
+    """
+    Return (due dates up to and including today, the following next_date).
+    """
+    anchor_day = template.anchor_day or template.next_date.day
+    due = []
+    current = template.next_date
+    while current <= today:
+        due.append(current)
+        current = next_occurrence(current, template.frequency, anchor_day)
+    return due, current
+
+
+def lock_for_writing():
+    """
+    On SQLite, take the write lock at the start of the current transaction.
+    A transaction that has read first can't wait for the lock when it
+    later writes (SQLite fails at once to avoid a deadlock), while one
+    that asks before reading waits up to the connection timeout.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'UPDATE {RecurringTransaction._meta.db_table} SET id = id WHERE 0')
+
+
+def claim_batch(today, batch_size):
+    queryset = RecurringTransaction.objects.filter(
+        is_active=True, next_date__lte=today
+    ).order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        queryset = queryset.select_for_update(skip_locked=True)
+    return list(queryset[:batch_size])
+
+
+def materialize_due(today=None, batch_size=BATCH_SIZE):
+    """
+    Generate every missed occurrence of every due template, across all
+    users. Safe to call from several processes at once.
+    Returns stats: templates processed, transactions created, seconds.
+    """
+    today = today or date.today()
+    started = time.perf_counter()
+    stats = {'templates': 0, 'transactions': 0}
+
+    while True:
+        with db_transaction.atomic():
+            lock_for_writing()
+            templates = claim_batch(today, batch_size)
+            if not templates:
+                break
+
+            generated = []
+            processed = []
+            for template in templates:
+                if len(generated) >= MAX_ROWS_PER_BATCH:
+                    # The rest stay due and are picked up by the next batch
+                    break
+                processed.append(template)
+                if template.anchor_day is None:
+                    template.anchor_day = template.next_date.day
+                due, following = occurrences(template, today)
+                generated.extend(
+                    Transaction(
+                        user_id=template.user_id,
+                        amount=template.amount,
+                        type=template.type,
+                        category_id=template.category_id,
+                        description=template.description,
+                        date=occurrence,
+                        is_recurring=True,
+                    )
+                    for occurrence in due
+                )
+                template.next_date = following
+
+            Transaction.objects.bulk_create(generated, batch_size=batch_size)
+            RecurringTransaction.objects.bulk_update(
+                processed, ['next_date', 'anchor_day'], batch_size=batch_size
+            )
+
+        stats['templates'] += len(processed)
+        stats['transactions'] += len(generated)
+        if not connection.features.has_select_for_update_skip_locked:
+            # SQLite has one writer at a time; pause so other workers get a turn
+            time.sleep(0.05)
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
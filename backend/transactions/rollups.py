@@ -0,0 +1,291 @@
+"""
+Maintenance and querying of the MonthlyRollup table.
+
+Every Transaction write is turned into a (user, month, category, type)
+delta and folded into the matching rollup row with F() expressions, so
+reads can sum one row per month instead of scanning raw transactions.
+"""
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils.dateparse import parse_date
+
+from .models import MonthlyRollup, Transaction
+
+_state = threading.local()
+
+
+def month_start(value):
+    """
+    Return the first day of the month for a date (or ISO date string).
+    """
+    if isinstance(value, str):
+        value = parse_date(value)
+    return value.replace(day=1)
+
+
+def next_month(value):
+    """
+    Return the first day of the month after `value`.
+    """
+    return (value.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+@contextmanager
+def suspended():
+    """
+    Temporarily stop the signal handlers from applying per-row deltas.
+    Used by bulk paths that apply one grouped delta afterwards instead.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+# ==================== WRITE PATH ====================
+
+def apply_delta(user_id, month, category_id, type, amount, count):
+    """
+    Add `amount` and `count` to one rollup row, creating it if needed.
+    Negative deltas never create rows: there is nothing to subtract from.
+    """
+    rows = MonthlyRollup.objects.filter(
+        user_id=user_id, month=month, category_id=category_id, type=type
+    )
+    updated = rows.update(total=F('total') + amount, count=F('count') + count)
+
+    if not updated and count > 0:
+        try:
+            with db_transaction.atomic():
+                MonthlyRollup.objects.create(
+                    user_id=user_id, month=month, category_id=category_id,
+                    type=type, total=amount, count=count
+                )
+        except IntegrityError:
+            # Another writer created the row first - add to theirs
+            rows.update(total=F('total') + amount, count=F('count') + count)
+
+    if count < 0:
+        rows.filter(count__lte=0).delete()
+
+
+def apply_deltas(deltas):
+    """
+    Apply a {(user_id, month, category_id, type): (amount, count)} mapping.
+    """
+    for (user_id, month, category_id, type), (amount, count) in deltas.items():
+        if amount or count:
+            apply_delta(user_id, month, category_id, type, amount, count)
+
+
+def transaction_key(user_id, txn_date, category_id, type):
+    return (user_id, month_start(txn_date), category_id, type)
+
+
+def apply_transactions(objs, sign=1):
+    """
+    Fold a batch of in-memory Transaction objects into the rollups,
+    issuing one write per affected rollup row rather than per transaction.
+    """
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for obj in objs:
+        key = transaction_key(obj.user_id, obj.date, obj.category_id, obj.type)
+        deltas[key][0] += sign * Decimal(str(obj.amount))
+        deltas[key][1] += sign
+    apply_deltas(deltas)
+
+
+def grouped_deltas(queryset, sign=1):
+    """
+    Compute rollup deltas for every transaction in `queryset` with one
+    grouped query.
+    """
+    rows = queryset.order_by().annotate(month=TruncMonth('date')).values(
+        'user_id', 'month', 'category_id', 'type'
+    ).annotate(total=Sum('amount'), count=Count('id'))
+
+    return {
+        (row['user_id'], row['month'], row['category_id'], row['type']):
+            (sign * row['total'], sign * row['count'])
+        for row in rows
+    }
+
+
+def month_keys(queryset):
+    """
+    Return the set of (user_id, month) pairs touched by `queryset`.
+    """
+    return set(
+        queryset.order_by().annotate(month=TruncMonth('date'))
+        .values_list('user_id', 'month').distinct()
+    )
+
+
+def _recount(user_filter, month_filter, txn_filter):
+    with db_transaction.atomic():
+        MonthlyRollup.objects.filter(user_filter, month_filter).delete()
+        rows = Transaction.objects.filter(user_filter, txn_filter).order_by().annotate(
+            month=TruncMonth('date')
+        ).values('user_id', 'month', 'category_id', 'type').annotate(
+            total=Sum('amount'), count=Count('id')
+        )
+        created = MonthlyRollup.objects.bulk_create(
+            [MonthlyRollup(**row) for row in rows], batch_size=1000
+        )
+    return len(created)
+
+
+def rebuild_months(keys):
+    """
+    Recompute the rollup rows for a set of (user_id, month) pairs from
+    the raw transactions.
+    """
+    by_user = defaultdict(set)
+    for user_id, month in keys:
+        by_user[user_id].add(month)
+
+    for user_id, months in by_user.items():
+        txn_filter = Q()
+        for month in months:
+            txn_filter |= Q(date__gte=month, date__lt=next_month(month))
+        _recount(Q(user_id=user_id), Q(month__in=months), txn_filter)
+
+
+def rebuild(user_ids=None):
+    """
+    Recompute all rollup rows (optionally only for some users).
+    Returns the number of rollup rows written.
+    """
+    user_filter = Q(user_id__in=user_ids) if user_ids is not None else Q()
+    return _recount(user_filter, Q(), Q())
+
+
+def fold_category(category):
+    """
+    Move a category's rollup totals onto the uncategorised rows, mirroring
+    the SET_NULL its transactions get when the category is deleted.
+    """
+    rows = MonthlyRollup.objects.filter(category=category).values(
+        'user_id', 'month', 'type', 'total', 'count'
+    )
+    for row in rows:
+        apply_delta(row['user_id'], row['month'], None, row['type'], row['total'], row['count'])
+
+
+# ==================== READ PATH ====================
+
+def to_date(value):
+    """
+    A date from a date or YYYY-MM-DD string; None stays None (an open bound).
+    """
+    if value is None or isinstance(value, date):
+        return value
+    parsed = parse_date(value)  # Raises ValueError for impossible dates
+    if parsed is None:
+        raise ValueError(f'{value!r} is not a YYYY-MM-DD date')
+    return parsed
+
+
+def period_totals(user, start_date=None, end_date=None, group_by=(), **filters):
+    """
+    Sum a user's transactions between two dates (inclusive, either may be
+    None for an open range) grouped by `group_by`.
+
+    Months that lie completely inside the range are read from MonthlyRollup;
+    only the partial months at either edge are aggregated from raw
+    transactions, so the cost is bounded by the number of months.
+    `group_by` may contain 'month' plus any lookup valid on both models
+    (e.g. 'type', 'category_id', 'category__name').
+
+    Returns a list of dicts holding the group_by keys, 'total' and 'count'.
+    """
+    parts = period_totals_queries(user, start_date, end_date, group_by, **filters)
+    return merge_period_totals([part() for part in parts], group_by)
+
+
+def period_totals_queries(user, start_date=None, end_date=None, group_by=(), **filters):
+    """
+    The (at most two) independent reads behind period_totals, as callables
+    returning row lists, so async callers can run them concurrently and
+    combine the results with merge_period_totals.
+    """
+    start_date = to_date(start_date)
+    end_date = to_date(end_date)
+    group_by = list(group_by)
+
+    # [first_full, last_full) is the span of whole months inside the range
+    first_full = None
+    if start_date is not None:
+        first_full = start_date if start_date.day == 1 else next_month(start_date)
+    last_full = None
+    if end_date is not None:
+        last_full = month_start(end_date + timedelta(days=1))
+
+    rollup_filter = Q(user=user, count__gt=0, **filters)
+    raw_filter = Q()
+    if first_full is not None and last_full is not None and first_full >= last_full:
+        # No whole month inside the range - everything comes from raw rows
+        rollup_filter = None
+        raw_filter = Q(date__range=[start_date, end_date])
+    else:
+        if first_full is not None:
+            rollup_filter &= Q(month__gte=first_full)
+            if start_date < first_full:
+                raw_filter |= Q(date__gte=start_date, date__lt=first_full)
+        if last_full is not None:
+            rollup_filter &= Q(month__lt=last_full)
+            if last_full <= end_date:
+                raw_filter |= Q(date__gte=last_full, date__lte=end_date)
+        if not raw_filter:
+            raw_filter = None
+
+    def grouped(queryset, total, count):
+        if not group_by:
+            row = queryset.aggregate(total=total, count=count)
+            return [row] if row['count'] else []
+        return list(queryset.values(*group_by).annotate(total=total, count=count))
+
+    queries = []
+    if rollup_filter is not None:
+        queries.append(lambda: grouped(
+            MonthlyRollup.objects.filter(rollup_filter).order_by(),
+            Sum('total'), Sum('count')
+        ))
+
+    if raw_filter is not None:
+        queries.append(lambda: grouped(
+            Transaction.objects.filter(raw_filter, user=user, **filters).order_by()
+            .annotate(month=TruncMonth('date')),
+            Sum('amount'), Count('id')
+        ))
+
+    return queries
+
+
+def merge_period_totals(results, group_by=()):
+    """
+    Combine the row lists of period_totals_queries into one row per group.
+    """
+    merged = {}
+    for rows in results:
+        for row in rows:
+            key = tuple(row[field] for field in group_by)
+            if key in merged:
+                merged[key]['total'] += row['total']
+                merged[key]['count'] += row['count']
+            else:
+                merged[key] = row
+    return list(merged.values())
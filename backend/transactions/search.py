@@ -0,0 +1,73 @@
+"""
+Full-text search over transaction descriptions.
+
+- SQLite: an FTS5 table (transactions_transaction_fts) mirrored from the
+  transaction table by triggers, joined through TransactionSearchEntry
+  and ranked with bm25.
+- PostgreSQL: a GIN index on to_tsvector('simple', description), matched
+  with a prefix tsquery and ranked with ts_rank.
+- Anything else (or SQLite built without FTS5): every term must appear
+  in the description (LIKE), unranked.
+
+Every term of the query is matched as a prefix ("coff star" finds
+"Coffee at Starbucks"). search() only adds a condition and a
+`search_rank` annotation (higher is better), so it combines with any
+other filters on the queryset.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+MAX_TERMS = 8
+FTS_TABLE = 'transactions_transaction_fts'
+# Must match the index expression in migration 0007
+POSTGRES_DOCUMENT = "to_tsvector('simple', coalesce(\"transactions_transaction\".\"description\", ''))"
+
+_fts_tables = {}
+
+
+def search_terms(text):
+    """
+    The words of a query, lower-cased; punctuation and operators are dropped.
+    """
+    return re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+
+
+def has_fts_table(alias):
+    if alias not in _fts_tables:
+        with connections[alias].cursor() as cursor:
+            _fts_tables[alias] = FTS_TABLE in connections[alias].introspection.table_names(cursor)
+    return _fts_tables[alias]
+
+
+def search(queryset, text):
+    """
+    Narrow a Transaction queryset to rows whose description matches every
+    term of `text`, annotated with `search_rank`. An empty query matches nothing.
+    """
+    terms = search_terms(text)
+    if not terms:
+        # Still annotated, so callers can order by the rank
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and has_fts_table(queryset.db):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(search_entry__document__match=match).annotate(
+            search_rank=-F('search_entry__rank')
+        )
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.filter(
+            RawSQL(f"{POSTGRES_DOCUMENT} @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f"ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', %s))", [tsquery], output_field=FloatField())
+        )
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(description__icontains=term)
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Category, Transaction, RecurringTransaction
+from .categories import registry as category_registry
 
 class CategorySerializer(serializers.ModelSerializer):
     """
@@ -21,15 +22,49 @@ class CategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class CategoryFieldsMixin:
+    """
+    Fills category_* fields from the category registry instead of loading
+    obj.category, so a list of rows needs no join and no query per row.
+    Falls back to the relation when there is no request user to look up
+    (or the row was loaded with select_related anyway).
+    """
+    def category_for(self, obj):
+        if obj.category_id is None:
+            return None
+        if type(obj).category.is_cached(obj):
+            return obj.category
+        
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and user.pk == obj.user_id:
+            category = category_registry.get(user, obj.category_id)
+            if category is not None:
+                return category
+        return obj.category
+    
+    def get_category_name(self, obj):
+        category = self.category_for(obj)
+        return category.name if category else None
+    
+    def get_category_icon(self, obj):
+        category = self.category_for(obj)
+        return category.icon if category else None
+    
+    def get_category_color(self, obj):
+        category = self.category_for(obj)
+        return category.color if category else None
+
+
+class TransactionSerializer(CategoryFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Transaction model.
     Includes extra fields to show category details without making extra database queries.
     """
-    # These fields pull data from the related Category object
-    category_name = serializers.CharField(source='category.name', read_only=True)
-    category_icon = serializers.CharField(source='category.icon', read_only=True)
-    category_color = serializers.CharField(source='category.color', read_only=True)
+    # These fields come from the category registry (see CategoryFieldsMixin)
+    category_name = serializers.SerializerMethodField()
+    category_icon = serializers.SerializerMethodField()
+    category_color = serializers.SerializerMethodField()
     
     class Meta:
         model = Transaction
@@ -56,12 +91,12 @@ class TransactionSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class RecurringTransactionSerializer(serializers.ModelSerializer):
+class RecurringTransactionSerializer(CategoryFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for RecurringTransaction model.
     Used for transactions that repeat on a schedule like monthly rent.
     """
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_name = serializers.SerializerMethodField()
     
     class Meta:
         model = RecurringTransaction
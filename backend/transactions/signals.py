@@ -0,0 +1,69 @@
+from decimal import Decimal
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from users.versioning import bump_data_version, bump_all_data_versions
+from .models import Category, Transaction
+from . import rollups
+from .categories import registry as category_registry
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    """
+    Before an update, stash the stored values so post_save can move the
+    old amount out of its rollup row (the category, date or type may change).
+    """
+    instance._rollup_previous = None
+    if raw or instance.pk is None or rollups.is_suspended():
+        return
+    instance._rollup_previous = Transaction.objects.filter(pk=instance.pk).values(
+        'user_id', 'date', 'category_id', 'type', 'amount'
+    ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or rollups.is_suspended():
+        return
+    
+    previous = getattr(instance, '_rollup_previous', None)
+    deltas = {}
+    if previous and not created:
+        old_key = rollups.transaction_key(
+            previous['user_id'], previous['date'], previous['category_id'], previous['type']
+        )
+        deltas[old_key] = (-previous['amount'], -1)
+    
+    new_key = rollups.transaction_key(
+        instance.user_id, instance.date, instance.category_id, instance.type
+    )
+    amount, count = deltas.get(new_key, (0, 0))
+    deltas[new_key] = (amount + Decimal(str(instance.amount)), count + 1)
+    rollups.apply_deltas(deltas)
+    bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    if rollups.is_suspended():
+        return
+    rollups.apply_transactions([instance], sign=-1)
+    bump_data_version(instance.user_id)
+
+
+@receiver(pre_delete, sender=Category)
+def fold_category_rollups(sender, instance, **kwargs):
+    rollups.fold_category(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_version_on_category_change(sender, instance, raw=False, **kwargs):
+    category_registry.invalidate(instance.user_id)
+    if raw:
+        return
+    if instance.user_id is None:
+        # Default categories are shared by everyone
+        bump_all_data_versions(categories=True)
+    else:
+        bump_data_version(instance.user_id, categories=True)
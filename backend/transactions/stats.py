@@ -0,0 +1,213 @@
+"""
+Period statistics shared by the summary, insights and comparison endpoints.
+
+All figures for a period (income/expense totals and counts, per-month
+totals and the expense breakdown by category) are derived from a single
+rollup read, instead of each view issuing its own set of aggregates over
+the same transactions.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from finance_tracker.concurrency import run_concurrently
+
+from . import rollups
+
+ZERO = Decimal('0')
+
+
+@dataclass
+class MonthTotals:
+    month: date
+    income: Decimal = ZERO
+    expenses: Decimal = ZERO
+    income_count: int = 0
+    expense_count: int = 0
+
+    @property
+    def net(self) -> Decimal:
+        return self.income - self.expenses
+
+    @property
+    def transaction_count(self) -> int:
+        return self.income_count + self.expense_count
+
+
+@dataclass
+class CategoryTotal:
+    name: Optional[str]
+    icon: Optional[str]
+    color: Optional[str]
+    total: Decimal = ZERO
+    count: int = 0
+
+
+@dataclass
+class PeriodStats:
+    start_date: Optional[date]
+    end_date: Optional[date]
+    total_income: Decimal = ZERO
+    total_expenses: Decimal = ZERO
+    income_count: int = 0
+    expense_count: int = 0
+    months: dict = field(default_factory=dict)
+    expense_categories: list = field(default_factory=list)
+
+    @property
+    def transaction_count(self) -> int:
+        return self.income_count + self.expense_count
+
+    @property
+    def has_data(self) -> bool:
+        return self.transaction_count > 0
+
+    @property
+    def net_savings(self) -> Decimal:
+        return self.total_income - self.total_expenses
+
+    @property
+    def savings_rate(self):
+        """
+        Percentage of income saved, or 0 when there was no income.
+        """
+        if self.total_income > 0:
+            return self.net_savings / self.total_income * 100
+        return 0
+
+    @property
+    def average_monthly_expense(self) -> Decimal:
+        """
+        Average expense over the months that had any expenses.
+        """
+        totals = [m.expenses for m in self.months.values() if m.expense_count]
+        return sum(totals, ZERO) / len(totals) if totals else ZERO
+
+    @property
+    def top_category(self) -> Optional[CategoryTotal]:
+        return self.expense_categories[0] if self.expense_categories else None
+
+    def month_totals(self, month: date) -> MonthTotals:
+        month = month.replace(day=1)
+        return self.months.get(month) or MonthTotals(month)
+
+    def totals_since(self, month: date) -> MonthTotals:
+        """
+        Combined totals for `month` and every later month in the period.
+        """
+        month = month.replace(day=1)
+        combined = MonthTotals(month)
+        for totals in self.months.values():
+            if totals.month >= month:
+                combined.income += totals.income
+                combined.expenses += totals.expenses
+                combined.income_count += totals.income_count
+                combined.expense_count += totals.expense_count
+        return combined
+
+
+STATS_GROUP_BY = ('month', 'type', 'category__name', 'category__icon', 'category__color')
+
+
+def period_stats(user, start_date=None, end_date=None, **filters) -> PeriodStats:
+    """
+    Compute PeriodStats for a user's transactions between two dates
+    (inclusive; either may be None for an open range). Extra keyword
+    arguments (type, category_id) narrow the transactions considered.
+    """
+    rows = rollups.period_totals(user, start_date, end_date, group_by=STATS_GROUP_BY, **filters)
+    return build_period_stats(rows, start_date, end_date)
+
+
+async def aperiod_stats(user, start_date=None, end_date=None, **filters) -> PeriodStats:
+    """
+    period_stats for async views: the rollup and raw-edge reads run
+    concurrently.
+    """
+    queries = rollups.period_totals_queries(user, start_date, end_date, STATS_GROUP_BY, **filters)
+    results = await run_concurrently(*queries)
+    return build_period_stats(rollups.merge_period_totals(results, STATS_GROUP_BY), start_date, end_date)
+
+
+def build_period_stats(rows, start_date=None, end_date=None) -> PeriodStats:
+    """
+    Fold period_totals rows (grouped by STATS_GROUP_BY, or a prefix of it
+    such as ('month', 'type')) into PeriodStats. Callers holding rows for
+    a wide window can build stats for a sub-range without another query.
+    """
+    stats = PeriodStats(start_date=start_date, end_date=end_date)
+    categories = {}
+    for row in rows:
+        month = stats.months.get(row['month'])
+        if month is None:
+            month = stats.months[row['month']] = MonthTotals(row['month'])
+
+        if row['type'] == 'income':
+            stats.total_income += row['total']
+            stats.income_count += row['count']
+            month.income += row['total']
+            month.income_count += row['count']
+            continue
+
+        stats.total_expenses += row['total']
+        stats.expense_count += row['count']
+        month.expenses += row['total']
+        month.expense_count += row['count']
+
+        key = (row.get('category__name'), row.get('category__icon'), row.get('category__color'))
+        category = categories.get(key)
+        if category is None:
+            category = categories[key] = CategoryTotal(*key)
+        category.total += row['total']
+        category.count += row['count']
+
+    stats.months = dict(sorted(stats.months.items()))
+    stats.expense_categories = sorted(
+        categories.values(), key=lambda item: item.total, reverse=True
+    )
+    return stats
+
+
+# ==================== RESPONSE PAYLOADS ====================
+
+def summary_payload(stats: PeriodStats) -> dict:
+    """
+    The body of /transactions/summary/ (also the dashboard's summary section).
+    """
+    return {
+        'period': {
+            'start_date': stats.start_date,
+            'end_date': stats.end_date
+        },
+        'total_income': float(stats.total_income),
+        'total_expenses': float(stats.total_expenses),
+        'net_savings': float(stats.net_savings),
+        'savings_rate': round(stats.savings_rate, 2),
+        'category_breakdown': [
+            {
+                'category__name': category.name,
+                'category__icon': category.icon,
+                'category__color': category.color,
+                'total': category.total,
+                'count': category.count
+            }
+            for category in stats.expense_categories
+        ],
+        'transaction_count': stats.transaction_count
+    }
+
+
+def trends_payload(stats: PeriodStats) -> list:
+    """
+    Income, expenses and net per month, oldest first.
+    """
+    return [
+        {
+            'month': month.month.strftime('%Y-%m'),
+            'income': float(month.income),
+            'expenses': float(month.expenses),
+            'net': float(month.net)
+        }
+        for month in stats.months.values()
+    ]
@@ -0,0 +1,272 @@
+"""
+Deterministic synthetic data for benchmarks and local load testing.
+
+Every user gets a salary, rent and a few subscriptions as recurring
+templates (and their past occurrences), day-to-day spending spread over
+the default expense categories with per-category amount distributions, a
+couple of custom categories and monthly budgets. Everything is written
+with bulk_create, and the same seed always produces the same data.
+"""
+import calendar
+import io
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction as db_transaction
+
+from budgets import counters as budget_counters
+from budgets.models import Budget
+from users.versioning import bump_data_version
+from . import rollups
+from .models import Category, RecurringTransaction, Transaction
+
+SYNTHETIC_DOMAIN = 'synthetic.example'
+SYNTHETIC_PASSWORD = 'synthetic-password'
+CHUNK_SIZE = 10000
+
+# category name -> (share of day-to-day expenses, median amount, spread)
+SPENDING_PROFILE = {
+    'Food & Dining': (0.38, 18, 0.6),
+    'Transportation': (0.16, 12, 0.7),
+    'Shopping': (0.14, 45, 0.9),
+    'Entertainment': (0.09, 25, 0.7),
+    'Bills & Utilities': (0.06, 80, 0.4),
+    'Healthcare': (0.04, 60, 0.8),
+    'Personal Care': (0.05, 30, 0.5),
+    'Education': (0.02, 90, 0.8),
+    'Travel': (0.02, 350, 0.9),
+    'Other Expenses': (0.04, 20, 1.0),
+}
+CUSTOM_CATEGORIES = (('Pets', 'expense', '🐶'), ('Side Project', 'income', '🛠️'))
+DESCRIPTIONS = {
+    'Food & Dining': ('Groceries', 'Lunch', 'Coffee', 'Dinner out', 'Takeaway'),
+    'Transportation': ('Fuel', 'Bus ticket', 'Taxi', 'Parking', 'Train'),
+    'Shopping': ('Clothes', 'Electronics', 'Home goods', 'Online order'),
+    'Entertainment': ('Cinema', 'Concert', 'Games', 'Books'),
+}
+
+
+def money(value):
+    return Decimal(str(round(max(value, 0.5), 2)))
+
+
+def default_categories():
+    categories = {category.name: category for category in Category.objects.filter(user__isnull=True, is_default=True)}
+    if not categories:
+        call_command('create_default_categories', stdout=io.StringIO())
+        categories = {category.name: category for category in Category.objects.filter(user__isnull=True, is_default=True)}
+    return categories
+
+
+def synthetic_email(prefix, seed, index):
+    return f'{prefix}-{seed}-{index}@{SYNTHETIC_DOMAIN}'
+
+
+def create_users(count, seed, prefix='user'):
+    """
+    Create `count` synthetic users (emails <prefix>-<seed>-<n>@synthetic.example).
+    All share SYNTHETIC_PASSWORD and one hash of it, so creating thousands
+    stays fast.
+    """
+    User = get_user_model()
+    password = make_password(SYNTHETIC_PASSWORD)
+    users = [
+        User(
+            email=synthetic_email(prefix, seed, index),
+            username=f'{prefix}-{seed}-{index}',
+            password=password,
+        )
+        for index in range(count)
+    ]
+    User.objects.bulk_create(users, batch_size=1000, ignore_conflicts=True)
+    return list(User.objects.filter(email__in=[user.email for user in users]).order_by('pk'))
+
+
+def delete_synthetic_users(users=None):
+    """
+    Delete the given synthetic users (all of them when None) and their data.
+    """
+    User = get_user_model()
+    queryset = User.objects.filter(email__endswith=f'@{SYNTHETIC_DOMAIN}')
+    if users is not None:
+        queryset = queryset.filter(pk__in=[user.pk for user in users])
+    users = queryset
+    # The queryset delete adjusts rollups in one grouped pass
+    Transaction.objects.filter(user__in=users).delete()
+    return users.delete()[1].get(User._meta.label, 0)
+
+
+def month_starts(start, end):
+    current = start.replace(day=1)
+    while current <= end:
+        yield current
+        current = (current + timedelta(days=32)).replace(day=1)
+
+
+def day_in_month(month, day):
+    return month.replace(day=min(day, calendar.monthrange(month.year, month.month)[1]))
+
+
+class UserDataGenerator:
+    """
+    Generates one user's data. `transactions` is the approximate number of
+    transactions to produce over `months` months ending today.
+    """
+    def __init__(self, user, categories, rng, transactions, months, today):
+        self.user = user
+        self.categories = categories
+        self.rng = rng
+        self.transactions = transactions
+        self.today = today
+        first_month = today.year * 12 + today.month - months
+        self.start = date(first_month // 12, first_month % 12 + 1, 1)
+        self.salary = money(rng.lognormvariate(8.2, 0.35))
+        self.rent = money(float(self.salary) * rng.uniform(0.25, 0.4))
+        self.custom = []
+
+    def custom_categories(self):
+        self.custom = [
+            Category(user=self.user, name=name, type=kind, icon=icon, is_default=False)
+            for name, kind, icon in CUSTOM_CATEGORIES
+        ]
+        return self.custom
+
+    def recurring_templates(self):
+        rng = self.rng
+        templates = [
+            ('income', self.salary, 'Salary', 'Monthly salary', 'monthly', rng.randint(25, 28)),
+            ('expense', self.rent, 'Bills & Utilities', 'Rent', 'monthly', 1),
+        ]
+        for name in rng.sample(['Streaming service', 'Music subscription', 'Gym membership', 'Cloud storage'], k=rng.randint(1, 3)):
+            templates.append(('expense', money(rng.uniform(5, 40)), 'Entertainment', name, 'monthly', rng.randint(1, 28)))
+        self.templates = templates
+
+        return [
+            RecurringTransaction(
+                user=self.user, amount=amount, type=kind, category=self.categories[category],
+                description=description, frequency=frequency,
+                next_date=self.next_occurrence(day), anchor_day=day,
+            )
+            for kind, amount, category, description, frequency, day in templates
+        ]
+
+    def next_occurrence(self, day):
+        """
+        The first occurrence after today: iter_transactions() generates
+        everything up to and including today.
+        """
+        this_month = day_in_month(self.today, day)
+        if this_month > self.today:
+            return this_month
+        return day_in_month((self.today.replace(day=1) + timedelta(days=32)).replace(day=1), day)
+
+    def iter_transactions(self):
+        rng = self.rng
+        # Past occurrences of the recurring templates
+        fixed = 0
+        for month in month_starts(self.start, self.today):
+            for kind, amount, category, description, frequency, day in self.templates:
+                occurred = day_in_month(month, day)
+                if occurred <= self.today:
+                    fixed += 1
+                    yield Transaction(
+                        user=self.user, amount=amount, type=kind, category=self.categories[category],
+                        description=description, date=occurred, is_recurring=True,
+                    )
+
+        names = list(SPENDING_PROFILE)
+        weights = [SPENDING_PROFILE[name][0] for name in names]
+        days = (self.today - self.start).days + 1
+        pets = self.custom[0] if self.custom else None
+        side_project = self.custom[1] if len(self.custom) > 1 else None
+        for _ in range(max(self.transactions - fixed, 0)):
+            occurred = self.start + timedelta(days=rng.randrange(days))
+            roll = rng.random()
+            if roll < 0.03 and side_project:
+                yield Transaction(
+                    user=self.user, amount=money(rng.lognormvariate(5.5, 0.6)), type='income',
+                    category=side_project, description='Client invoice', date=occurred,
+                )
+                continue
+            if roll < 0.06 and pets:
+                yield Transaction(
+                    user=self.user, amount=money(rng.lognormvariate(3.2, 0.5)), type='expense',
+                    category=pets, description='Pet supplies', date=occurred,
+                )
+                continue
+            name = rng.choices(names, weights)[0]
+            share, median, spread = SPENDING_PROFILE[name]
+            yield Transaction(
+                user=self.user,
+                amount=money(median * rng.lognormvariate(0, spread)),
+                type='expense',
+                category=self.categories[name],
+                description=rng.choice(DESCRIPTIONS.get(name, ('',))),
+                date=occurred,
+            )
+
+    def budgets(self):
+        month = self.today.replace(day=1)
+        end = day_in_month(month, 31)
+        budgets = []
+        for name in self.rng.sample(list(SPENDING_PROFILE), k=4):
+            share, median, spread = SPENDING_PROFILE[name]
+            expected = self.transactions / max((self.today - self.start).days / 30, 1) * share * median
+            budgets.append(Budget(
+                user=self.user, category=self.categories[name], period='monthly',
+                amount=money(expected * self.rng.uniform(0.8, 1.3)),
+                start_date=month, end_date=end,
+            ))
+        return budgets
+
+
+def generate(users, transactions_per_user, months=24, seed=42, today=None, chunk_size=CHUNK_SIZE):
+    """
+    Fill the given users with synthetic data. Returns counts per model.
+    """
+    today = today or date.today()
+    categories = default_categories()
+    rng = random.Random(seed)
+    generators = [
+        UserDataGenerator(user, categories, random.Random(rng.random()), transactions_per_user, months, today)
+        for user in users
+    ]
+    counts = {'categories': 0, 'recurring': 0, 'budgets': 0, 'transactions': 0}
+
+    custom = [category for generator in generators for category in generator.custom_categories()]
+    Category.objects.bulk_create(custom, batch_size=chunk_size)
+    counts['categories'] = len(custom)
+    # bulk_create skips the signals that refresh the category registry
+    bump_data_version(*{category.user_id for category in custom}, categories=True)
+
+    recurring = [template for generator in generators for template in generator.recurring_templates()]
+    RecurringTransaction.objects.bulk_create(recurring, batch_size=chunk_size)
+    counts['recurring'] = len(recurring)
+
+    budgets = [budget for generator in generators for budget in generator.budgets()]
+    Budget.objects.bulk_create(budgets, batch_size=chunk_size, ignore_conflicts=True)
+    counts['budgets'] = len(budgets)
+
+    def flush(batch):
+        with db_transaction.atomic():
+            Transaction.objects.bulk_create(batch)
+        counts['transactions'] += len(batch)
+
+    # Rollups are rebuilt once at the end instead of per chunk
+    with rollups.suspended():
+        batch = []
+        for generator in generators:
+            for transaction in generator.iter_transactions():
+                batch.append(transaction)
+                if len(batch) >= chunk_size:
+                    flush(batch)
+                    batch = []
+        if batch:
+            flush(batch)
+    rollups.rebuild([user.pk for user in users])
+    budget_counters.recount(Budget.objects.filter(user__in=users))
+    return counts
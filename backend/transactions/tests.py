@@ -1,3 +1,786 @@
-from django.test import TestCase
+"""
+Transactions app tests.
 
-# Create your tests here.
+QueryPlanTests runs every query the main read endpoints issue through
+SQLite's EXPLAIN QUERY PLAN. A step that walks one of our tables without
+an index ("SCAN transactions_transaction") fails the test, so a dropped
+index or a filter rewritten into a non-indexable shape shows up here.
+
+The other cases cover request validation and the derived data kept in
+step on writes.
+"""
+import io
+import json
+import random
+import re
+from types import SimpleNamespace
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import LiveServerTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from budgets.models import Budget
+from finance_tracker.renderers import FastJSONRenderer
+from finance_tracker.response_cache import cache_stats, get_response_cache, reset_cache_stats
+from users.models import CustomUser
+from . import rollups, synthetic
+from .categories import registry as category_registry
+from .models import Category, MonthlyRollup, RecurringTransaction, Transaction
+from .read_serializers import TransactionReadSerializer
+from .serializers import TransactionSerializer
+
+# A whole-table read, or a walk over an entire index ("SCAN t USING
+# [COVERING] INDEX i") which costs the same; aliased tables are named by alias
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?: USING (?:COVERING )?INDEX \w+)?$')
+TABLE_ALIAS = re.compile(r'"(\w+)" (?:AS )?([A-Z]\d+)\b')
+APP_TABLE_PREFIXES = ('transactions_', 'budgets_', 'analytics_', 'users_')
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+# Replica reads go to the test primary: a TEST MIRROR alias is a second
+# connection that can't see the test case's uncommitted rows
+primary_reads = override_settings(REPLICA=dict(settings.REPLICA, ALIAS='default'))
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(sql):
+    """
+    Tables of ours that the plan for `sql` reads without an index.
+    """
+    aliases = {alias: table for table, alias in TABLE_ALIAS.findall(sql)}
+    scans = []
+    for step in query_plan(sql):
+        match = FULL_SCAN.match(step)
+        if not match:
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        if table.startswith(APP_TABLE_PREFIXES):
+            scans.append(table)
+    return scans
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+@primary_reads
+class QueryPlanTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='plans@example.com', username='plans', password='plans-password'
+        )
+        other = CustomUser.objects.create_user(
+            email='other@example.com', username='other', password='other-password'
+        )
+        food = Category.objects.create(name='Food', type='expense', is_default=True)
+        rent = Category.objects.create(name='Rent', type='expense', is_default=True)
+        salary = Category.objects.create(name='Salary', type='income', is_default=True)
+        Category.objects.create(user=cls.user, name='Hobbies', type='expense')
+
+        today = date.today()
+        cls.today = today
+        rows = []
+        for owner in (cls.user, other):
+            for day in range(400):
+                rows.append(Transaction(
+                    user=owner, amount=10 + day % 7, type='expense',
+                    category=food if day % 2 else rent, date=today - timedelta(days=day),
+                ))
+            for month in range(13):
+                rows.append(Transaction(
+                    user=owner, amount=3000, type='income', category=salary,
+                    date=today - timedelta(days=30 * month),
+                ))
+        Transaction.objects.bulk_create(rows)
+
+        for category in (food, rent):
+            Budget.objects.create(
+                user=cls.user, category=category, amount=500, period='monthly',
+                start_date=today.replace(day=1), end_date=today + timedelta(days=30),
+            )
+        RecurringTransaction.objects.create(
+            user=cls.user, amount=50, type='expense', category=food,
+            frequency='monthly', next_date=today + timedelta(days=3),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertIndexedQueries(self, url):
+        """
+        Request `url` and check the plan of every query it ran. The
+        category registry starts cold so its loading queries are checked too.
+        """
+        category_registry.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+            if getattr(response, 'streaming', False):
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+
+        statements = [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].lstrip().upper().startswith(EXPLAINABLE)
+        ]
+        self.assertTrue(statements, f'{url} ran no queries')
+        for sql in statements:
+            self.assertEqual(full_scans(sql), [], f'{url} scans a whole table:\n{sql}')
+        return response
+
+    def test_transaction_list(self):
+        start = (self.today - timedelta(days=100)).isoformat()
+        end = (self.today - timedelta(days=10)).isoformat()
+        for url in (
+            '/api/transactions/transactions/',
+            f'/api/transactions/transactions/?type=expense&start_date={start}&end_date={end}',
+            f'/api/transactions/transactions/?category={Category.objects.get(name="Food").pk}',
+            '/api/transactions/transactions/recent/',
+            f'/api/transactions/transactions/?search=rent&type=expense&start_date={start}&end_date={end}',
+        ):
+            with self.subTest(url=url):
+                self.assertIndexedQueries(url)
+
+    def test_search_without_terms(self):
+        for query in ('', '%20%20', '%2B%2A%22-%29'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/transactions/transactions/?search={query}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['results'], [])
+
+    def test_transaction_cursor_pages(self):
+        response = self.assertIndexedQueries('/api/transactions/transactions/?pagination=cursor&page_size=50')
+        next_link = response.json()['next']
+        response = self.assertIndexedQueries(next_link)
+        self.assertIndexedQueries(response.json()['previous'])
+
+    def test_summary_and_trends(self):
+        start = (self.today - timedelta(days=200)).isoformat()
+        end = (self.today - timedelta(days=15)).isoformat()
+        for url in (
+            '/api/transactions/transactions/summary/',
+            f'/api/transactions/transactions/summary/?start_date={start}&end_date={end}',
+            '/api/transactions/transactions/trends/',
+        ):
+            with self.subTest(url=url):
+                self.assertIndexedQueries(url)
+
+    def test_csv_export_takes_one_section(self):
+        response = self.client.get('/api/transactions/transactions/export/?file_format=csv&sections=budgets,transactions')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/transactions/transactions/export/?file_format=csv&sections=budgets')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('budgets.csv', response['Content-Disposition'])
+
+    def test_export(self):
+        for url in (
+            '/api/transactions/transactions/export/?file_format=csv',
+            '/api/transactions/transactions/export/?file_format=ndjson&type=expense',
+        ):
+            with self.subTest(url=url):
+                self.assertIndexedQueries(url)
+
+    def test_categories(self):
+        for url in (
+            '/api/transactions/categories/',
+            '/api/transactions/categories/expense_categories/',
+            '/api/transactions/categories/income_categories/',
+        ):
+            with self.subTest(url=url):
+                self.assertIndexedQueries(url)
+
+    def test_recurring(self):
+        self.assertIndexedQueries('/api/transactions/recurring/')
+
+    def test_budgets(self):
+        for url in ('/api/budgets/', '/api/budgets/overview/'):
+            with self.subTest(url=url):
+                self.assertIndexedQueries(url)
+
+    def test_analytics(self):
+        for url in (
+            '/api/analytics/insights/',
+            '/api/analytics/prediction/',
+            '/api/analytics/comparison/',
+        ):
+            with self.subTest(url=url):
+                self.assertIndexedQueries(url)
+
+    def test_dashboard(self):
+        self.assertIndexedQueries('/api/dashboard/')
+
+    def test_detects_full_scans(self):
+        sql = str(Transaction.objects.filter(amount__gt=100).query)
+        self.assertEqual(full_scans(sql), ['transactions_transaction'])
+        # The whole (user, -date, ...) index walked in order
+        sql = str(Transaction.objects.order_by('user', '-date', '-created_at', '-id').values('id').query)
+        self.assertEqual(full_scans(sql), ['transactions_transaction'])
+        # A scan inside a subquery, where the table is named by its alias
+        sql = str(Transaction.objects.filter(category__in=Category.objects.filter(is_default=True).values('id')).query)
+        self.assertIn('transactions_category', full_scans(sql))
+
+
+@primary_reads
+class SummaryRangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='summary@example.com', username='summary', password='summary-password'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_malformed_dates_are_rejected(self):
+        for query, field in (
+            ('start_date=garbage&end_date=2026-01-31', 'start_date'),
+            ('start_date=2026-01-01&end_date=2026-02-30', 'end_date'),
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/transactions/transactions/summary/?{query}')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+
+    def test_valid_range(self):
+        response = self.client.get(
+            '/api/transactions/transactions/summary/?start_date=2026-01-01&end_date=2026-01-31'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['period']['start_date'], '2026-01-01')
+
+
+@primary_reads
+@override_settings(RESPONSE_CACHE=dict(settings.RESPONSE_CACHE, ENABLED=True))
+class ResponseCacheTests(TestCase):
+    url = '/api/transactions/transactions/summary/?start_date=2026-01-01&end_date=2026-01-31'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='cached@example.com', username='cached', password='cached-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.txn = Transaction.objects.create(
+            user=cls.user, amount=10, type='expense', category=cls.food, date=date(2026, 1, 5)
+        )
+
+    def setUp(self):
+        get_response_cache().clear()
+        reset_cache_stats()
+        # A real token, so every request sees the user's current data version
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def get(self, url=None):
+        response = self.client.get(url or self.url)
+        self.assertEqual(response.status_code, 200)
+        return response['X-Cache'], response.json()['total_expenses']
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.get(), ('MISS', 10))
+        self.assertEqual(self.get(), ('HIT', 10))
+        self.assertEqual(cache_stats()['endpoints']['transactions-summary'], {'hits': 1, 'misses': 1})
+
+    def test_key_ignores_param_order(self):
+        self.get()
+        self.assertEqual(
+            self.get('/api/transactions/transactions/summary/?end_date=2026-01-31&start_date=2026-01-01')[0], 'HIT'
+        )
+        self.assertEqual(self.get(self.url + '&type=income')[0], 'MISS')
+
+    def test_writes_invalidate(self):
+        def write_and_check(write, expenses):
+            self.get()
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            self.assertEqual(self.get(), ('MISS', expenses))
+
+        transactions = Transaction.objects.filter(user=self.user)
+        for name, write, expenses in (
+            ('create', lambda: Transaction.objects.create(
+                user=self.user, amount=5, type='expense', category=self.food, date=date(2026, 1, 6)), 15),
+            ('save', lambda: Transaction.objects.filter(pk=self.txn.pk).first().save(), 15),
+            ('bulk_create', lambda: Transaction.objects.bulk_create([
+                Transaction(user=self.user, amount=1, type='expense', category=self.food, date=date(2026, 1, 7)),
+            ]), 16),
+            ('queryset update', lambda: transactions.update(amount=2), 6),
+            ('queryset delete', lambda: transactions.filter(date=date(2026, 1, 7)).delete(), 4),
+            ('default category', lambda: Category.objects.create(name='Rent', type='expense', is_default=True), 4),
+            ('budget', lambda: Budget.objects.create(
+                user=self.user, category=self.food, amount=100, period='monthly',
+                start_date=date(2026, 1, 1), end_date=date(2026, 1, 31)), 4),
+        ):
+            with self.subTest(write=name):
+                write_and_check(write, expenses)
+
+
+class CursorPaginationTests(TestCase):
+    url = '/api/transactions/transactions/?pagination=cursor&page_size=3'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='cursor@example.com', username='cursor', password='cursor-password'
+        )
+        rows = [
+            Transaction(user=cls.user, amount=n + 1, type='expense', date=date(2026, 1, 10 - n // 4))
+            for n in range(11)
+        ]
+        Transaction.objects.bulk_create(rows)
+        # Ties on date and created_at across page boundaries, broken by id
+        tied = Transaction.objects.filter(user=cls.user, date=date(2026, 1, 9))
+        tied.update(created_at=tied.first().created_at)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def expected(self):
+        return list(
+            Transaction.objects.filter(user=self.user)
+            .order_by('-date', '-created_at', '-id').values_list('id', flat=True)
+        )
+
+    def walk(self, url=None, pages=None):
+        ids, url = [], url or self.url
+        while url and pages != 0:
+            page = self.client.get(url).json()
+            ids += [row['id'] for row in page['results']]
+            url = page['next']
+            pages = None if pages is None else pages - 1
+        return ids, url
+
+    def test_walk_covers_every_row_once(self):
+        ids, _ = self.walk()
+        self.assertEqual(ids, self.expected())
+
+    def test_inserts_mid_scroll_neither_repeat_nor_skip(self):
+        expected = self.expected()
+        seen, next_url = self.walk(pages=2)
+        Transaction.objects.create(user=self.user, amount=99, type='expense', date=date(2026, 2, 1))
+        Transaction.objects.create(user=self.user, amount=98, type='expense', date=date(2026, 1, 1))
+        rest, _ = self.walk(next_url)
+
+        self.assertEqual(seen, expected[:6])
+        # The newer row sorts before the cursor, the older one after it
+        self.assertEqual(rest, expected[6:] + [Transaction.objects.get(amount=98).pk])
+
+    def test_previous_links(self):
+        first = self.client.get(self.url).json()
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+
+        back = self.client.get(third['previous']).json()
+        self.assertEqual(back['results'], second['results'])
+        self.assertIsNotNone(back['next'])
+        back = self.client.get(back['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_malformed_cursor(self):
+        for cursor in ('garbage', 'bm90IGpzb24', 'eyJkIjoiMjAyNi0wMS0wMSJ9', 'eyJkIjoieCIsImMiOiJ5IiwiaSI6MX0'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(f'{self.url}&cursor={cursor}')
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json()['detail'], 'Invalid cursor')
+
+
+class ReadSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='serializer@example.com', username='serializer', password='serializer-password'
+        )
+        other = CustomUser.objects.create_user(
+            email='serializer-other@example.com', username='serializer-other', password='other-password'
+        )
+        food = Category.objects.create(name='Food', type='expense', is_default=True, icon='🍔', color='#ff0000')
+        own = Category.objects.create(user=cls.user, name='Hobbies', type='expense', icon='', color='#00ff00')
+        # Not the user's: filled from the relation/bulk query, not the registry
+        foreign = Category.objects.create(user=other, name='Theirs', type='income')
+        for amount, category, description in (
+            (Decimal('12.5'), food, 'Lunch'),
+            (Decimal('0.01'), None, ''),
+            (Decimal('99999999.99'), own, 'Bike \u2028 "quoted" café'),
+            (3, foreign, 'Refund'),
+        ):
+            Transaction.objects.create(
+                user=cls.user, amount=amount, type='expense', category=category,
+                description=description, date=date(2026, 3, 1),
+            )
+
+    def test_same_bytes_as_the_model_serializer(self):
+        category_registry.clear()
+        context = {'request': SimpleNamespace(user=self.user)}
+        queryset = Transaction.objects.filter(user=self.user).order_by('id')
+        model_data = TransactionSerializer(queryset, many=True, context=context).data
+        read_data = TransactionReadSerializer(TransactionReadSerializer.values(queryset), context=context).data
+
+        self.assertEqual(JSONRenderer().render(read_data), JSONRenderer().render(model_data))
+        for timezone_name in ('UTC', 'Asia/Kolkata'):
+            with self.subTest(timezone=timezone_name), override_settings(TIME_ZONE=timezone_name):
+                model_data = TransactionSerializer(queryset, many=True, context=context).data
+                read_data = TransactionReadSerializer(TransactionReadSerializer.values(queryset), context=context).data
+                self.assertEqual(list(read_data), list(model_data))
+
+    def test_fast_renderer_matches_drf(self):
+        data = {
+            'amounts': [Decimal('12.50'), Decimal('-0.01'), 3, 0.1, 123456.789],
+            'when': [date(2026, 1, 2), datetime(2026, 1, 2, 3, 4, 5, 678901), time(1, 2, 3)],
+            'text': 'café \u2028 \u2029 "quoted" \\ \n 🍔',
+            'nothing': None,
+            'flags': [True, False],
+            1: 'integer key',
+            'nested': [{'deep': []}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), JSONRenderer().render(None))
+        indented = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=2', indented),
+            JSONRenderer().render(data, 'application/json; indent=2', indented),
+        )
+        # Exponent notation is the one difference, and parses the same
+        floats = [1e20, 1e-7, 1.2345678901234567e19]
+        self.assertEqual(json.loads(FastJSONRenderer().render(floats)), json.loads(JSONRenderer().render(floats)))
+
+
+class RollupMaintenanceTests(TestCase):
+    """
+    After every write path the maintained rollups must equal a fresh rebuild.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='rollups@example.com', username='rollups', password='rollups-password'
+        )
+        cls.other = CustomUser.objects.create_user(
+            email='rollups-other@example.com', username='rollups-other', password='other-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.rent = Category.objects.create(name='Rent', type='expense', is_default=True)
+        cls.salary = Category.objects.create(name='Salary', type='income', is_default=True)
+        cls.hobbies = Category.objects.create(user=cls.user, name='Hobbies', type='expense')
+
+    def add(self, amount, day, category='food', type='expense', user=None):
+        return Transaction.objects.create(
+            user=user or self.user, amount=amount, type=type,
+            category=self.food if category == 'food' else category, date=day,
+        )
+
+    def rollup_rows(self):
+        return sorted(
+            MonthlyRollup.objects.values_list('user_id', 'month', 'category_id', 'type', 'total', 'count'),
+            key=str,
+        )
+
+    def assertRollupsFresh(self):
+        maintained = self.rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(maintained, self.rollup_rows())
+
+    def test_create(self):
+        self.add(10, date(2026, 1, 5))
+        self.add('20.50', date(2026, 1, 31))
+        self.add(3000, date(2026, 2, 1), category=self.salary, type='income')
+        self.assertRollupsFresh()
+        self.assertEqual(MonthlyRollup.objects.get(month=date(2026, 1, 1)).count, 2)
+
+    def test_edit_moves_between_rows(self):
+        txn = self.add(10, date(2026, 1, 5))
+        self.add(5, date(2026, 1, 6))
+        for changes in (
+            {'amount': 12},
+            {'date': date(2026, 3, 2)},
+            {'category': self.rent},
+            {'category': None},
+            {'type': 'income', 'category': self.salary},
+        ):
+            with self.subTest(changes=changes):
+                for field, value in changes.items():
+                    setattr(txn, field, value)
+                txn.save()
+                self.assertRollupsFresh()
+
+    def test_delete(self):
+        txn = self.add(10, date(2026, 1, 5))
+        self.add(5, date(2026, 1, 6))
+        txn.delete()
+        self.assertRollupsFresh()
+        self.add(7, date(2026, 4, 1)).delete()
+        self.assertRollupsFresh()
+        self.assertFalse(MonthlyRollup.objects.filter(month=date(2026, 4, 1)).exists())
+
+    def test_bulk_create(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, amount=day, type='expense', category=self.food, date=date(2026, 1, day))
+            for day in range(1, 29)
+        ] + [
+            Transaction(user=self.other, amount=100, type='income', category=self.salary, date=date(2026, 2, 1)),
+        ])
+        self.assertRollupsFresh()
+
+    def test_bulk_create_ignore_conflicts(self):
+        existing = self.add(10, date(2026, 1, 5))
+        Transaction.objects.bulk_create([
+            Transaction(pk=existing.pk, user=self.user, amount=99, type='expense', category=self.food, date=date(2026, 1, 5)),
+            Transaction(user=self.user, amount=4, type='expense', category=self.rent, date=date(2026, 2, 9)),
+        ], ignore_conflicts=True)
+        self.assertRollupsFresh()
+
+    def test_queryset_update(self):
+        for day in range(1, 11):
+            self.add(day, date(2026, 1, day), category=self.food if day % 2 else self.rent)
+        half = Transaction.objects.filter(user=self.user, date__day__lte=5)
+        queryset = Transaction.objects.filter(pk__in=list(half.values_list('pk', flat=True)))
+        for changes in (
+            {'amount': 8},
+            {'date': date(2026, 5, 15)},
+            {'category': self.hobbies},
+            {'type': 'income'},
+            {'description': 'not a rollup field'},
+        ):
+            with self.subTest(changes=changes):
+                self.assertEqual(queryset.update(**changes), 5)
+                self.assertRollupsFresh()
+
+    def test_queryset_delete(self):
+        for day in range(1, 11):
+            self.add(day, date(2026, 1 + day % 3, day))
+        self.add(50, date(2026, 1, 1), user=self.other)
+        Transaction.objects.filter(user=self.user, date__month=1).delete()
+        self.assertRollupsFresh()
+        Transaction.objects.filter(user=self.user).delete()
+        self.assertRollupsFresh()
+        self.assertFalse(MonthlyRollup.objects.filter(user=self.user).exists())
+
+    def test_category_delete(self):
+        self.add(10, date(2026, 1, 5), category=self.hobbies)
+        self.add(15, date(2026, 1, 8), category=None)
+        self.add(20, date(2026, 1, 9), category=self.food)
+        self.hobbies.delete()
+        self.assertRollupsFresh()
+        self.assertEqual(
+            MonthlyRollup.objects.get(user=self.user, category=None).total, 25
+        )
+
+    def test_rebuild_repairs_and_is_scoped(self):
+        self.add(10, date(2026, 1, 5))
+        self.add(10, date(2026, 1, 5), user=self.other)
+        expected = self.rollup_rows()
+        MonthlyRollup.objects.update(total=0, count=99)
+
+        rollups.rebuild(user_ids=[self.user.pk])
+        repaired = MonthlyRollup.objects.get(user=self.user)
+        self.assertEqual((repaired.total, repaired.count), (10, 1))
+        self.assertEqual(MonthlyRollup.objects.get(user=self.other).count, 99)
+
+        self.assertEqual(rollups.rebuild(), 2)
+        self.assertEqual(self.rollup_rows(), expected)
+
+
+class ImportCategoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='import@example.com', username='import', password='import-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+        cls.salary = Category.objects.create(name='Salary', type='income', is_default=True)
+
+    def test_category_must_match_the_row_type(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        statement = SimpleUploadedFile('statement.csv', (
+            'date,amount,type,category\n'
+            '2026-01-05,12.50,expense,food\n'
+            '2026-01-06,40.00,expense,Salary\n'
+            '2026-01-07,3000,income,Salary\n'
+        ).encode())
+        response = client.post('/api/transactions/transactions/import/', {'file': statement})
+
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual((report['imported'], report['failed']), (2, 1))
+        self.assertEqual(report['errors'][0]['line'], 3)
+        self.assertFalse(Transaction.objects.filter(type='expense', category=self.salary).exists())
+        self.assertEqual(Transaction.objects.get(type='expense').category, self.food)
+
+
+class RecurringAnchorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='recurring@example.com', username='recurring', password='recurring-password'
+        )
+
+    def test_anchor_survives_unrelated_edits(self):
+        template = RecurringTransaction.objects.create(
+            user=self.user, amount=900, type='expense', frequency='monthly', next_date=date(2026, 1, 31),
+        )
+        self.assertEqual(template.anchor_day, 31)
+        # What the materializer leaves behind after January's occurrence
+        RecurringTransaction.objects.filter(pk=template.pk).update(next_date=date(2026, 2, 28))
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.patch(f'/api/transactions/recurring/{template.pk}/', {'amount': '950.00'})
+        self.assertEqual(response.status_code, 200)
+        template.refresh_from_db()
+        self.assertEqual((template.next_date, template.anchor_day), (date(2026, 2, 28), 31))
+
+        response = client.patch(f'/api/transactions/recurring/{template.pk}/', {'next_date': '2026-03-15'})
+        self.assertEqual(response.status_code, 200)
+        template.refresh_from_db()
+        self.assertEqual(template.anchor_day, 15)
+
+
+
+class CategoryRegistryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='registry@example.com', username='registry', password='registry-password'
+        )
+        cls.food = Category.objects.create(name='Food', type='expense', is_default=True)
+
+    def setUp(self):
+        category_registry.clear()
+        self.own = Category.objects.create(user=self.user, name='Hobbies', type='expense')
+        self.user.refresh_from_db()
+
+    def test_transaction_writes_keep_the_entry(self):
+        self.assertEqual(set(category_registry.for_user(self.user)), {self.food.pk, self.own.pk})
+        Transaction.objects.create(user=self.user, amount=5, type='expense', category=self.own, date=date(2026, 1, 2))
+        self.user.refresh_from_db()
+        with self.assertNumQueries(0):
+            category_registry.for_user(self.user)
+
+    def test_rename_and_delete_reach_other_processes(self):
+        # The signals only reach this process's registry
+        other = type(category_registry)()
+        other.for_user(self.user)
+
+        self.own.name = 'Games'
+        self.own.save()
+        self.assertEqual(category_registry.get(self.user, self.own.pk).name, 'Games')
+        self.assertEqual(other.get(self.user, self.own.pk).name, 'Hobbies')
+        self.user.refresh_from_db()
+        self.assertEqual(other.get(self.user, self.own.pk).name, 'Games')
+
+        own_pk = self.own.pk
+        self.own.delete()
+        self.user.refresh_from_db()
+        for registry in (category_registry, other):
+            self.assertIsNone(registry.get(self.user, own_pk))
+            self.assertIsNotNone(registry.get(self.user, self.food.pk))
+
+    def test_default_change_reaches_every_user(self):
+        category_registry.for_user(self.user)
+        self.food.icon = 'utensils'
+        self.food.save()
+        self.user.refresh_from_db()
+        self.assertEqual(category_registry.get(self.user, self.food.pk).icon, 'utensils')
+
+    @override_settings(CATEGORY_REGISTRY=dict(settings.CATEGORY_REGISTRY, MAX_USERS=2))
+    def test_least_recently_used_user_is_evicted(self):
+        users = [self.user] + [
+            CustomUser.objects.create_user(email=f'registry{n}@example.com', username=f'registry{n}', password='pw')
+            for n in (2, 3)
+        ]
+        first, second, third = users
+        category_registry.for_user(first)
+        category_registry.for_user(second)
+        category_registry.for_user(first)
+        category_registry.for_user(third)
+
+        with self.assertNumQueries(0):
+            category_registry.for_user(first)
+            category_registry.for_user(third)
+        with self.assertNumQueries(1):
+            category_registry.for_user(second)
+
+
+class SyntheticDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='synthetic@example.com', username='synthetic', password='synthetic-password'
+        )
+
+    def test_recurring_templates_continue_where_history_stops(self):
+        categories = synthetic.default_categories()
+        for today in (date(2026, 10, 1), date(2026, 10, 17), date(2026, 10, 28), date(2026, 2, 28)):
+            generator = synthetic.UserDataGenerator(self.user, categories, random.Random(7), 50, 3, today)
+            templates = generator.recurring_templates()
+            rows = [row for row in generator.iter_transactions() if row.is_recurring]
+            for template in templates:
+                with self.subTest(today=today, template=template.description):
+                    self.assertGreater(template.next_date, today)
+                    dates = sorted(row.date for row in rows if row.description == template.description)
+                    # One occurrence a month, the next one due straight after the last
+                    months = [(d.year, d.month) for d in dates + [template.next_date]]
+                    expected = [(m.year, m.month) for m in synthetic.month_starts(generator.start, template.next_date)]
+                    self.assertEqual(months, expected)
+
+
+@primary_reads
+class LoadTestCommandTests(LiveServerTestCase):
+    def load_test(self, *args):
+        out = io.StringIO()
+        call_command(
+            'load_test', '--users', '1', '--duration', '0.5', '--transactions', '20',
+            '--url', self.live_server_url, *args, stdout=out,
+        )
+        output = out.getvalue()
+        return json.loads(output[output.index('\n{') + 1:output.rindex('}') + 1])
+
+    def test_tiny_run(self):
+        report = self.load_test('--keep')
+        self.assertEqual((report['login']['requests'], report['login']['errors']), (1, 0))
+        self.assertGreater(report['totals']['requests'], 0)
+        self.assertEqual(report['totals']['errors'], 0)
+        user = CustomUser.objects.get(email=synthetic.synthetic_email('load', 42, 0))
+        self.assertTrue(Transaction.objects.filter(user=user).exists())
+
+        # The kept account is reused without touching its data
+        created = Transaction.objects.filter(user=user).count()
+        report = self.load_test('--skip-setup', '--mix', 'dashboard=1')
+        self.assertEqual(report['totals']['errors'], 0)
+        self.assertIsNone(report['meta']['transactions_per_user'])
+        self.assertEqual(Transaction.objects.filter(user=user).count(), created)
+
+        # Without --keep the users are removed again
+        self.load_test('--mix', 'budgets=1')
+        self.assertFalse(CustomUser.objects.filter(email__endswith=f'@{synthetic.SYNTHETIC_DOMAIN}').exists())
+
+    def test_fails_before_generating_data(self):
+        with self.assertRaisesMessage(CommandError, 'could not log in'):
+            self.load_test('--skip-setup')
+
+        # Users created in a database the server doesn't use (here: never
+        # saved) stop the run before any data is generated
+        def create_elsewhere(count, seed, prefix='user'):
+            return [CustomUser(email=synthetic.synthetic_email(prefix, seed, index)) for index in range(count)]
+
+        with mock.patch.object(synthetic, 'create_users', create_elsewhere), \
+                mock.patch.object(synthetic, 'generate') as generate:
+            with self.assertRaisesMessage(CommandError, 'Is the server using this database?'):
+                self.load_test()
+        generate.assert_not_called()
+        self.assertFalse(CustomUser.objects.filter(email__endswith=f'@{synthetic.SYNTHETIC_DOMAIN}').exists())
@@ -1,12 +1,21 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, TransactionViewSet, RecurringTransactionViewSet
+from .views import CategoryViewSet, TransactionViewSet, RecurringTransactionViewSet, AsyncTransactionSummaryView
 
 router = DefaultRouter()
 router.register('categories', CategoryViewSet, basename='category')
 router.register('transactions', TransactionViewSet, basename='transaction')
 router.register('recurring', RecurringTransactionViewSet, basename='recurring-transaction')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.ASYNC_VIEWS['ENABLED']:
+    # Ahead of the router so it takes over the viewset's summary action
+    urlpatterns.append(
+        path('transactions/summary/', AsyncTransactionSummaryView.as_view(), name='transaction-summary')
+    )
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
\ No newline at end of file
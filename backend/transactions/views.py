@@ -1,17 +1,70 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q, Avg
-from django.db.models.functions import TruncMonth
+from rest_framework.parsers import MultiPartParser
+from django.http import StreamingHttpResponse
 from datetime import datetime, timedelta
 from .models import Transaction, Category, RecurringTransaction
+from . import rollups, importers, exporters, search
+from .categories import registry as category_registry
+from .stats import period_stats, aperiod_stats, build_period_stats, summary_payload, trends_payload
+from .pagination import TransactionCursorPagination
+from .read_serializers import TransactionReadSerializer
+from finance_tracker.admission import admission_controlled
+from finance_tracker.async_views import AsyncAPIView
+from finance_tracker.conditional import conditional_response
+from finance_tracker.db_router import replica_reads
+from finance_tracker.response_cache import cached_response
 from .serializers import (
     TransactionSerializer, 
     CategorySerializer, 
     RecurringTransactionSerializer
 )
 
+def rollup_filters(query_params):
+    """
+    The type/category filters of the transaction list, in a form that can
+    be applied to MonthlyRollup as well as Transaction.
+    """
+    filters = {}
+    transaction_type = query_params.get('type')
+    if transaction_type:
+        filters['type'] = transaction_type
+    
+    category_id = query_params.get('category')
+    if category_id:
+        filters['category_id'] = category_id
+    
+    return filters
+
+
+def summary_range(query_params):
+    """
+    The ?start_date=&end_date= of a summary, defaulting to this month so far.
+    Malformed dates raise ValidationError (a 400).
+    """
+    start_date = query_params.get('start_date')
+    end_date = query_params.get('end_date')
+    
+    if not start_date or not end_date:
+        today = datetime.now().date()
+        return today.replace(day=1), today
+    
+    errors = {}
+    dates = {}
+    for name, value in (('start_date', start_date), ('end_date', end_date)):
+        try:
+            dates[name] = rollups.to_date(value)
+        except ValueError:
+            errors[name] = ['Enter a valid date in YYYY-MM-DD format.']
+    if errors:
+        raise ValidationError(errors)
+    
+    return dates['start_date'], dates['end_date']
+
+
 class CategoryViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Category operations.
@@ -27,19 +80,26 @@ class CategoryViewSet(viewsets.ModelViewSet):
         2. Are default categories (available to everyone)
         """
         user = self.request.user
-        return Category.objects.filter(
-            Q(user=user) | Q(is_default=True)
-        ).order_by('type', 'name')
+        return Category.objects.for_user(user).order_by('type', 'name')
+    
+    @conditional_response('categories-list')
+    def list(self, request, *args, **kwargs):
+        # Served from the category registry; detail routes still query
+        categories = category_registry.sorted_for_user(request.user)
+        serializer = self.get_serializer(categories, many=True)
+        return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @conditional_response('categories-expense')
     def expense_categories(self, request):
-        categories = self.get_queryset().filter(type='expense')
+        categories = category_registry.sorted_for_user(request.user, type='expense')
         serializer = self.get_serializer(categories, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
+    @conditional_response('categories-income')
     def income_categories(self, request):
-        categories = self.get_queryset().filter(type='income')
+        categories = category_registry.sorted_for_user(request.user, type='income')
         serializer = self.get_serializer(categories, many=True)
         return Response(serializer.data)
 
@@ -48,6 +108,21 @@ class TransactionViewSet(viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
     
+    @property
+    def paginator(self):
+        """
+        Page-number pagination by default; ?pagination=cursor (or following
+        a cursor link) switches to keyset pagination, which stays fast on
+        deep pages of large histories.
+        """
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request else {}
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = TransactionCursorPagination()
+            else:
+                return super().paginator
+        return self._paginator
+    
     def get_queryset(self):
         queryset = Transaction.objects.filter(user=self.request.user)
         
@@ -64,100 +139,147 @@ class TransactionViewSet(viewsets.ModelViewSet):
         if start_date and end_date:
             queryset = queryset.filter(date__range=[start_date, end_date])
         
+        # Full-text search on the description, best matches first
+        # (cursor pagination keeps its date order)
+        search_text = self.request.query_params.get('search')
+        if search_text is not None:
+            queryset = search.search(queryset, search_text).order_by(
+                '-search_rank', '-date', '-created_at', '-id'
+            )
+        
         return queryset
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
+    @conditional_response('transactions-list')
+    def list(self, request, *args, **kwargs):
+        """
+        Reads rows with values_list() and the lightweight read serializer;
+        the output matches TransactionSerializer.
+        """
+        rows = TransactionReadSerializer.values(self.filter_queryset(self.get_queryset()))
+        context = self.get_serializer_context()
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(TransactionReadSerializer(page, context=context).data)
+        return Response(TransactionReadSerializer(rows, context=context).data)
+    
+    def get_rollup_filters(self):
+        return rollup_filters(self.request.query_params)
+    
     @action(detail=False, methods=['get'])
+    @conditional_response('transactions-summary')
+    @cached_response('transactions-summary')
+    @admission_controlled('reports', 'transactions-summary')
+    @replica_reads
     def summary(self, request):
-        queryset = self.get_queryset()
-        
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        
-        if not start_date or not end_date:
-            today = datetime.now().date()
-            start_date = today.replace(day=1)
-            end_date = today
-        
-        queryset = queryset.filter(date__range=[start_date, end_date])
-        
-        total_income = queryset.filter(type='income').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        total_expenses = queryset.filter(type='expense').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        category_breakdown = queryset.filter(type='expense').values(
-            'category__name', 'category__icon', 'category__color'
-        ).annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('-total')
+        start_date, end_date = summary_range(request.query_params)
+        stats = period_stats(request.user, start_date, end_date, **self.get_rollup_filters())
+        return Response(summary_payload(stats))
+    
+    @action(detail=False, methods=['get'])
+    @conditional_response('transactions-trends')
+    @admission_controlled('reports', 'transactions-trends')
+    @replica_reads
+    def trends(self, request):
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=180)
         
-        net_savings = total_income - total_expenses
-        savings_rate = (net_savings / total_income * 100) if total_income > 0 else 0
+        rows = rollups.period_totals(
+            request.user, start_date, end_date,
+            group_by=('month', 'type'),
+            **self.get_rollup_filters()
+        )
+        stats = build_period_stats(rows, start_date, end_date)
         
         return Response({
-            'period': {
-                'start_date': start_date,
-                'end_date': end_date
-            },
-            'total_income': float(total_income),
-            'total_expenses': float(total_expenses),
-            'net_savings': float(net_savings),
-            'savings_rate': round(savings_rate, 2),
-            'category_breakdown': list(category_breakdown),
-            'transaction_count': queryset.count()
+            'trends': trends_payload(stats)
         })
     
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_file(self, request):
+        """
+        Bulk import a bank statement (CSV, OFX or QIF) uploaded as `file`.
+        CSV needs `date` and `amount` columns; `type`, `category` and
+        `description` are optional. Invalid rows are skipped and reported.
+        """
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            return Response({'error': 'Upload a statement as "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            fmt = importers.detect_format(uploaded_file.name, request.query_params.get('file_format'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        report = importers.import_transactions(
+            request.user, uploaded_file, fmt,
+            date_format=request.query_params.get('date_format')
+        )
+        response_status = status.HTTP_201_CREATED if report['imported'] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=response_status)
+    
     @action(detail=False, methods=['get'])
-    def trends(self, request):
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=180)
+    @replica_reads
+    def export(self, request):
+        """
+        Stream the account as ?file_format=csv (one section, transactions
+        by default), ndjson or zip (one CSV per section). ?sections= picks from transactions,
+        recurring, budgets and categories. The usual type/category/date
+        filters apply.
+        """
+        file_format = request.query_params.get('file_format', 'csv').lower()
+        if file_format not in exporters.EXPORT_FORMATS:
+            return Response(
+                {'error': f'Unsupported format. Use one of: {", ".join(exporters.EXPORT_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        queryset = self.get_queryset().filter(date__range=[start_date, end_date])
+        requested = request.query_params.get('sections')
+        sections = [s.strip() for s in requested.split(',')] if requested else list(exporters.SECTIONS)
+        unknown = [s for s in sections if s not in exporters.SECTIONS]
+        if unknown:
+            return Response(
+                {'error': f'Unknown sections: {", ".join(unknown)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if file_format == 'csv' and requested and len(sections) > 1:
+            return Response(
+                {'error': 'A CSV export holds one section. Use file_format=zip or ndjson for several.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        monthly_data = queryset.annotate(
-            month=TruncMonth('date')
-        ).values('month', 'type').annotate(
-            total=Sum('amount'),
-            count=Count('id')
-        ).order_by('month')
+        querysets = exporters.section_querysets(request.user, self.get_queryset(), request.query_params)
+        filename = f'finance-export-{datetime.now().date().isoformat()}'
         
-        formatted_data = {}
-        for item in monthly_data:
-            month_key = item['month'].strftime('%Y-%m')
-            
-            if month_key not in formatted_data:
-                formatted_data[month_key] = {
-                    'month': month_key,
-                    'income': 0,
-                    'expenses': 0,
-                    'net': 0
-                }
-            
-            if item['type'] == 'income':
-                formatted_data[month_key]['income'] = float(item['total'])
-            else:
-                formatted_data[month_key]['expenses'] = float(item['total'])
-            
-            formatted_data[month_key]['net'] = (
-                formatted_data[month_key]['income'] - 
-                formatted_data[month_key]['expenses']
+        if file_format == 'csv':
+            section = 'transactions' if not requested else sections[0]
+            stream = exporters.stream_csv(querysets[section], exporters.SECTIONS[section][1])
+            response = StreamingHttpResponse(stream, content_type='text/csv')
+            filename = f'{filename}-{section}.csv'
+        elif file_format == 'ndjson':
+            response = StreamingHttpResponse(
+                exporters.stream_ndjson(querysets, sections),
+                content_type='application/x-ndjson'
+            )
+            filename = f'{filename}.ndjson'
+        else:
+            response = StreamingHttpResponse(
+                exporters.stream_zip(querysets, sections),
+                content_type='application/zip'
             )
+            filename = f'{filename}.zip'
         
-        return Response({
-            'trends': list(formatted_data.values())
-        })
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
     
     @action(detail=False, methods=['get'])
+    @conditional_response('transactions-recent')
     def recent(self, request):
-        queryset = self.get_queryset()[:10]
-        serializer = self.get_serializer(queryset, many=True)
+        rows = TransactionReadSerializer.values(self.get_queryset())[:10]
+        serializer = TransactionReadSerializer(rows, context=self.get_serializer_context())
         return Response(serializer.data)
 
 
@@ -169,4 +291,20 @@ class RecurringTransactionViewSet(viewsets.ModelViewSet):
         return RecurringTransaction.objects.filter(user=self.request.user)
     
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user=self.request.user)
+
+
+class AsyncTransactionSummaryView(AsyncAPIView):
+    """
+    /transactions/summary/ for async deployments (ASYNC_VIEWS['ENABLED']).
+    """
+    permission_classes = [IsAuthenticated]
+    
+    @conditional_response('transactions-summary')
+    @cached_response('transactions-summary')
+    @admission_controlled('reports', 'transactions-summary')
+    @replica_reads
+    async def get(self, request):
+        start_date, end_date = summary_range(request.query_params)
+        stats = await aperiod_stats(request.user, start_date, end_date, **rollup_filters(request.query_params))
+        return Response(summary_payload(stats))
\ No newline at end of file
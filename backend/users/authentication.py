@@ -0,0 +1,160 @@
+"""
+JWT authentication with a narrow user query on the hot path.
+
+simplejwt's JWTAuthentication loads the whole user row on every request.
+CachedJWTAuthentication keeps the user object (identity, permissions) in
+the AUTH_CACHE cache for up to AUTH_CACHE['USER_TIMEOUT'] seconds and
+reads only what must never be stale from the database, in one indexed
+query per request:
+
+- data_version / data_updated_at, which the response cache, ETags and
+  replica stickiness key on, and category_version for the category
+  registry;
+- is_active, so deactivation takes effect immediately;
+- whether the access token was revoked at logout (blacklisted in
+  simplejwt's token_blacklist tables, alongside the refresh tokens).
+
+Those are correct whichever process made the change, so the per-process
+local-memory default is safe with any number of workers. The cached
+object itself is invalidated by saving or deleting the user (signals.py)
+and by the data version bumps (versioning.py); other processes see
+profile changes (name, email, staff flags) after at most the timeout, or
+at once when AUTH_CACHE_BACKEND is shared. Invalidation bumps a per-user
+epoch rather than deleting the entry, so a request that loaded the user
+just before a change can't cache the old row after it.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models import Exists, Value
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+GENERATION_KEY = 'user-generation'
+
+
+def get_auth_cache():
+    return caches[settings.AUTH_CACHE['ALIAS']]
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+def epoch_key(user_id):
+    return f'user-epoch:{user_id}'
+
+
+def cache_user(user, generation=None, epoch=None):
+    """
+    Cache a user loaded from the database. Pass the generation and epoch
+    read before loading it, so a change that lands in between leaves the
+    entry stale rather than current.
+    """
+    cache = get_auth_cache()
+    if generation is None or epoch is None:
+        found = cache.get_many([GENERATION_KEY, epoch_key(user.pk)])
+        generation = found.get(GENERATION_KEY, 0)
+        epoch = found.get(epoch_key(user.pk), 0)
+    cache.set(user_key(user.pk), (generation, epoch, user), settings.AUTH_CACHE['USER_TIMEOUT'])
+
+
+def fresh_state(user_id, jti):
+    """
+    (is_active, data_version, data_updated_at, category_version, revoked)
+    from the primary, or None for an unknown user.
+    """
+    revoked = Exists(BlacklistedToken.objects.filter(token__jti=jti)) if jti is not None else Value(False)
+    return get_user_model().objects.using('default').filter(
+        **{api_settings.USER_ID_FIELD: user_id}
+    ).annotate(revoked=revoked).values_list(
+        'is_active', 'data_version', 'data_updated_at', 'category_version', 'revoked'
+    ).first()
+
+
+def _bump(cache, key):
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); a fresh counter is just as new
+        cache.set(key, 1, None)
+
+
+def invalidate_users(*user_ids):
+    """
+    Make cached users stale so their next request reloads them.
+    """
+    cache = get_auth_cache()
+    for user_id in user_ids:
+        _bump(cache, epoch_key(user_id))
+
+
+def invalidate_all_users():
+    _bump(get_auth_cache(), GENERATION_KEY)
+
+
+def revoke_token(token):
+    """
+    Blacklist an access token until it expires (used at logout).
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if jti is None or user_id is None:
+        return
+    outstanding, _ = OutstandingToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            'user_id': user_id,
+            'created_at': token.current_time,
+            'token': str(token),
+            'expires_at': datetime_from_epoch(token['exp']),
+        },
+    )
+    BlacklistedToken.objects.get_or_create(token=outstanding)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if not settings.AUTH_CACHE['ENABLED']:
+            user = super().get_user(validated_token)
+            if jti is not None and BlacklistedToken.objects.filter(token__jti=jti).exists():
+                raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+            return user
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        state = fresh_state(user_id, jti)
+        if state is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        is_active, data_version, data_updated_at, category_version, revoked = state
+        if not is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if revoked:
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+        # One cache round trip: the user, the generation and the user's epoch
+        found = get_auth_cache().get_many([user_key(user_id), GENERATION_KEY, epoch_key(user_id)])
+        generation = found.get(GENERATION_KEY, 0)
+        epoch = found.get(epoch_key(user_id), 0)
+        cached = found.get(user_key(user_id))
+        if cached is not None and cached[:2] == (generation, epoch):
+            user = cached[2]
+        else:
+            user = super().get_user(validated_token)
+            cache_user(user, generation, epoch)
+
+        # Whatever the cached copy says, these come from the query above
+        user.data_version = data_version
+        user.data_updated_at = data_updated_at
+        user.category_version = category_version
+        return user
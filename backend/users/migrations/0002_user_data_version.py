@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='data_version',
+            field=models.PositiveIntegerField(default=0, help_text="Bumped whenever the user's transactions, budgets or categories change"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='data_updated_at',
+            field=models.DateTimeField(blank=True, help_text='When data_version was last bumped (sent as Last-Modified)', null=True),
+        ),
+    ]
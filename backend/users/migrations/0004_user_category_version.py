@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_data_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='category_version',
+            field=models.PositiveIntegerField(default=0, help_text="Bumped whenever the user's categories (or the defaults) change"),
+        ),
+    ]
@@ -19,6 +19,19 @@ class CustomUser(AbstractUser):
         default='USD',
         help_text="Currency code (USD, EUR, INR, etc.)"
     )
+    data_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped whenever the user's transactions, budgets or categories change"
+    )
+    data_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When data_version was last bumped (sent as Last-Modified)"
+    )
+    category_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Bumped whenever the user's categories (or the defaults) change"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .authentication import invalidate_users
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Profile updates, deactivation, password changes and deletion all go
+    through save()/delete(), so the next request reloads the user.
+    """
+    db_transaction.on_commit(lambda: invalidate_users(instance.pk))
@@ -1,3 +1,122 @@
+"""
+Users app tests.
+"""
+from django.conf import settings
 from django.test import TestCase
+from django.test.utils import override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
-# Create your tests here.
+from finance_tracker.db_router import wrote_recently
+from .authentication import CachedJWTAuthentication, cache_user, get_auth_cache, invalidate_users, revoke_token
+from .models import CustomUser
+from .versioning import bump_all_data_versions, bump_data_version
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            email='auth@example.com', username='auth', password='auth-password'
+        )
+
+    def setUp(self):
+        get_auth_cache().clear()
+        self.authentication = CachedJWTAuthentication()
+        self.token = AccessToken.for_user(self.user)
+
+    def authenticate(self, token=None):
+        return self.authentication.get_user(token or self.token)
+
+    def test_cached_user_needs_one_narrow_query(self):
+        with self.assertNumQueries(2):
+            self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate(), self.user)
+
+    def test_writes_invalidate_the_cached_user(self):
+        self.assertEqual(self.authenticate().data_version, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(self.user.pk)
+        self.assertEqual(self.authenticate().data_version, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_all_data_versions()
+        self.assertEqual(self.authenticate().data_version, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CustomUser.objects.filter(pk=self.user.pk).update(first_name='Renamed')
+            user = CustomUser.objects.get(pk=self.user.pk)
+            user.save()
+        self.assertEqual(self.authenticate().first_name, 'Renamed')
+
+    def test_committed_write_keeps_the_user_on_the_primary(self):
+        self.assertFalse(wrote_recently(self.authenticate()))
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(self.user.pk)
+        self.assertTrue(wrote_recently(self.authenticate()))
+
+    def test_user_loaded_before_a_change_is_not_served(self):
+        # Another worker loaded the row, then this change committed before it cached it
+        stale = CustomUser.objects.get(pk=self.user.pk)
+        CustomUser.objects.filter(pk=self.user.pk).update(data_version=5)
+        invalidate_users(self.user.pk)
+        cache_user(stale, 0, 0)
+
+        self.assertEqual(self.authenticate().data_version, 5)
+
+    def test_logout_revokes_the_access_token(self):
+        refresh = RefreshToken.for_user(self.user)
+        other = AccessToken.for_user(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(client.get('/api/auth/profile/').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/auth/logout/', {'refresh': str(refresh)}, format='json')
+        self.assertEqual(response.status_code, 205)
+        self.assertEqual(client.get('/api/auth/profile/').status_code, 401)
+
+        # Kept in the database, so an evicted or restarted cache still rejects it
+        get_auth_cache().clear()
+        self.assertEqual(client.get('/api/auth/profile/').status_code, 401)
+        with override_settings(AUTH_CACHE=dict(settings.AUTH_CACHE, ENABLED=False)):
+            self.assertEqual(client.get('/api/auth/profile/').status_code, 401)
+
+        self.assertEqual(self.authenticate(other), self.user)
+
+    def test_write_through_one_worker_reaches_another(self):
+        # Two processes with their own local-memory auth caches
+        caches = dict(settings.CACHES, **{
+            'worker-1': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-1'},
+            'worker-2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'worker-2'},
+        })
+
+        def worker(alias):
+            return override_settings(AUTH_CACHE=dict(settings.AUTH_CACHE, ALIAS=alias))
+
+        with override_settings(CACHES=caches):
+            for alias in ('worker-1', 'worker-2'):
+                with worker(alias):
+                    self.assertEqual(self.authenticate().data_version, 0)
+
+            with worker('worker-1'), self.captureOnCommitCallbacks(execute=True):
+                bump_data_version(self.user.pk)
+            with worker('worker-2'):
+                user = self.authenticate()
+                self.assertEqual(user.data_version, 1)
+                self.assertTrue(wrote_recently(user))
+
+            with worker('worker-1'):
+                revoke_token(self.token)
+            with worker('worker-2'), self.assertRaisesMessage(AuthenticationFailed, 'revoked'):
+                self.authenticate()
+
+            with worker('worker-1'), self.captureOnCommitCallbacks(execute=True):
+                user = CustomUser.objects.get(pk=self.user.pk)
+                user.is_active = False
+                user.save()
+            with worker('worker-2'), self.assertRaisesMessage(AuthenticationFailed, 'inactive'):
+                self.authenticate(AccessToken.for_user(self.user))
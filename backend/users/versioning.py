@@ -0,0 +1,39 @@
+"""
+Per-user data version used to invalidate cached responses.
+
+The version lives on the user row, which authentication already reads
+on every request, so reading it costs nothing; writes bump it with an
+F() update and invalidate the cached users once committed.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .authentication import invalidate_all_users, invalidate_users
+
+
+def _bumps(categories):
+    bumps = {'data_version': F('data_version') + 1, 'data_updated_at': timezone.now()}
+    if categories:
+        bumps['category_version'] = F('category_version') + 1
+    return bumps
+
+
+def bump_data_version(*user_ids, categories=False):
+    """
+    Invalidate everything cached for these users; `categories` also
+    invalidates their entries in the category registry.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        get_user_model().objects.filter(pk__in=user_ids).update(**_bumps(categories))
+        db_transaction.on_commit(lambda: invalidate_users(*user_ids))
+
+
+def bump_all_data_versions(categories=False):
+    """
+    Invalidate everything cached for every user (e.g. a default category changed).
+    """
+    get_user_model().objects.update(**_bumps(categories))
+    db_transaction.on_commit(invalidate_all_users)
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import revoke_token
 from .serializers import UserRegistrationSerializer, UserSerializer, UserProfileUpdateSerializer
 
 class RegisterView(generics.CreateAPIView):
@@ -55,6 +56,7 @@ class LogoutView(APIView):
             refresh_token = request.data["refresh"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+            revoke_token(request.auth)
             
             return Response(
                 {"message": "Logout successful"}, 
@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import transactionService from '../services/transactionService';
-import { formatCurrency, getCurrentMonthRange, formatDate } from '../utils/formatters';
+import { formatCurrency, formatDate } from '../utils/formatters';
 import TransactionForm from '../components/TransactionForm';
 
 const Dashboard = () => {
@@ -19,19 +19,9 @@ const Dashboard = () => {
 
   const fetchData = async () => {
     try {
-      const { startDate, endDate } = getCurrentMonthRange();
-      const summaryData = await transactionService.getSummary(startDate, endDate);
-      setSummary(summaryData);
-      
-      // Fetch recent transactions
-      try {
-        const recentData = await transactionService.getTransactions();
-        const transactions = recentData.results || recentData;
-        setRecentTransactions(Array.isArray(transactions) ? transactions.slice(0, 5) : []);
-      } catch (error) {
-        console.error('Error fetching recent transactions:', error);
-        setRecentTransactions([]);
-      }
+      const data = await transactionService.getDashboard(['summary', 'recent']);
+      setSummary(data.summary);
+      setRecentTransactions(data.recent || []);
     } catch (error) {
       console.error('Error fetching data:', error);
     } finally {
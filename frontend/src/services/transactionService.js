@@ -27,6 +27,12 @@ const transactionService = {
     return response.data;
   },
 
+  getDashboard: async (sections = []) => {
+    const params = new URLSearchParams(sections.length ? { sections: sections.join(',') } : {}).toString();
+    const response = await api.get(`/dashboard/?${params}`);
+    return response.data;
+  },
+
   getTrends: async () => {
     const response = await api.get('/transactions/transactions/trends/');
     return response.data;